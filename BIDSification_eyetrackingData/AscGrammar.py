@@ -0,0 +1,208 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import re
+
+
+def line_key(line):
+
+    '''
+    Key of a line of an asc file, used to find the rules of the grammar that
+    apply to this line without looking at the rest of the line:
+
+    - 'SAMPLE' for the sample lines (starting with their timestamp),
+    - 'MSG <keyword>' for the messages, where ``keyword`` is the first word
+      of the message after its timestamp (and its optional time offset),
+    - the first word of the line otherwise (for example '**', 'SAMPLES',
+      'EFIX').
+
+    Parameters
+    ----------
+    line: str
+        Line of the asc file
+
+    Returns
+    -------
+    key: str
+        Key of the line
+    '''
+
+    if line[:1].isdigit():
+        return 'SAMPLE'
+
+    key = line.partition('\t')[0].partition(' ')[0]
+
+    if key=='MSG':
+        # MSG <timestamp> [<offset>] <keyword> ...
+        words = line[4:].split(None, 3)
+        if len(words)>2 and words[1].lstrip('-').isdigit():
+            return 'MSG '+words[2]
+        if len(words)>1:
+            return 'MSG '+words[1]
+
+    return key
+
+
+class AscGrammar:
+
+    '''
+    Table-driven grammar of the lines of an asc file
+
+    Each rule is a compiled regular expression and an extractor called with
+    the match and the object to be filled. The rules of a line are found in
+    constant time from its key (see :func:`line_key`), and only these rules
+    are matched against the line.
+
+    Parameters
+    ----------
+    rules: dict
+        Dictionary ``{key: [(regex, extractor), ...]}`` of the rules matched
+        at the start of the lines of a key
+    '''
+
+    def __init__(self, rules):
+
+        self.rules = rules
+
+    def parse_line(self, line, target, key=None):
+
+        '''
+        Apply the rules of the grammar to a line
+
+        Parameters
+        ----------
+        line: str
+            Line of the asc file
+        target: dict
+            Object filled by the extractors
+        key: str or None (default None)
+            Key of the line if it is already known
+
+        Returns
+        -------
+        key: str
+            Key of the line
+        '''
+
+        if key is None:
+            key = line_key(line)
+
+        for regex, extractor in self.rules.get(key, ()):
+            m = regex.match(line)
+            if m:
+                extractor(m, target)
+
+        return key
+
+
+#------------------------------------------------------------------------------
+# Grammar of the settings of the eyelink recordings
+#------------------------------------------------------------------------------
+def set_setting(k, convert=None):
+
+    '''
+    Extractor setting ``k`` to the first group of the match, the values that
+    cannot be converted are ignored
+
+    Parameters
+    ----------
+    k: str
+        Name of the setting
+    convert: function or None (default None)
+        Function converting the value
+
+    Returns
+    -------
+    extractor: function
+    '''
+
+    def extractor(m, settings):
+        try:
+            settings[k] = convert(m[1]) if convert else m[1]
+        except ValueError:
+            pass
+
+    return extractor
+
+def set_ScreenResolution(m, settings):
+    try:
+        settings['ScreenResolution'] = [float(m[1]) +1, float(m[2]) +1]
+    except ValueError:
+        pass
+
+def set_RawDataFilters(m, settings):
+    try:
+        num_filter = int(m[1])
+    except ValueError:
+        return
+    if num_filter==0: settings['RawDataFilters'] = 'off'
+    elif num_filter==1: settings['RawDataFilters'] = 'standard'
+    elif num_filter==2: settings['RawDataFilters'] = 'extra'
+
+def set_Samples(m, settings):
+
+    l = m.string
+
+    k = ['SampleCoordinateSystem', 'SampleCoordinateUnit']
+    v = None
+    if 'GAZE' in l: v = ['gaze-on-screen', 'pixels']
+    elif 'HREF' in l: v = ['eye-in-head', 'degree']
+    elif 'PUPIL' in l: v = ['eye-in-camera', 'data raw']
+    if v:
+        for k_, v_ in zip(k, v): settings[k_] = v_
+
+    k = 'RecordedEye'
+    if 'LEFT' in l and 'RIGHT' in l: settings[k] = 'Both'
+    elif 'LEFT' in l: settings[k] = 'Left'
+    elif 'RIGHT' in l: settings[k] = 'Right'
+
+EYE_MOVEMENT_EVENTS = {'SFIX': "Start of fixation",
+                       'EFIX': "End of fixation",
+                       'SSACC': "Start of saccade",
+                       'ESACC': "End of saccade",
+                       'SBLINK': "Start of blink",
+                       'EBLINK': "End of blink"}
+
+def set_IncludedEyeMovementEvents(m, settings):
+
+    k = 'IncludedEyeMovementEvents'
+    if not settings[k]: settings[k] = []
+
+    event = m[1]
+    if event not in [e[1] for e in settings[k]]:
+        settings[k].append([EYE_MOVEMENT_EVENTS[event], event])
+
+# The settings are read from the lines of their key only: the header of the
+#  file ('**'), the SAMPLES and EVENTS lines, the messages of the display
+#  and of the calibrations, and the titles of the calibrations ('>>>>>>>').
+#  The last line of a setting gives its value, so the calibration type is
+#  '(HV9,P-CR)' of '>>>>>>> CALIBRATION (HV9,P-CR) FOR RIGHT: <<<<<<<<<'
+#  rather than 'HV9' of the 'MSG 9051500 !CAL CALIBRATION HV9 R RIGHT GOOD'
+#  message before it.
+RECORDING_RULES = [
+    (re.compile(r'.*?\tRATE[^\t]*\t([^\t]*)'),
+     set_setting('SamplingFrequency', float)),
+    (re.compile(r'.*?\tFILTER[^\t]*\t([^\t]*)'), set_RawDataFilters)]
+
+SETTINGS_GRAMMAR = AscGrammar(
+    {'**': [(re.compile(r'\*\* (EYELINK.*)', re.S),
+             set_setting('ManufacturersModelName')),
+            (re.compile(r'\*\* VERSION: (.*)', re.S),
+             set_setting('SoftwareVersion')),
+            (re.compile(r'\*\* SERIAL NUMBER: (.*)', re.S),
+             set_setting('DeviceSerialNumber')),
+            (re.compile(r'\*\* CAMERA: (.*)', re.S),
+             set_setting('EyeCameraSettings'))],
+     'SAMPLES': [(re.compile(r'SAMPLES(?:\t|\Z)'), set_Samples)]+
+                RECORDING_RULES,
+     'EVENTS': RECORDING_RULES,
+     'MSG GAZE_COORDS': [(re.compile(r'.* ([^ ]*) ([^ ]*)\Z', re.S),
+                          set_ScreenResolution)],
+     'MSG ELCL_PROC': [(re.compile(r'.*ELCL_PROC (.*)\Z', re.S),
+                        set_setting('PupilFitMethod'))],
+     'MSG !CAL': [(re.compile(r'.*?!CAL CALIBRATION ([^ ]*)'),
+                   set_setting('CalibrationType'))],
+     '>>>>>>>': [(re.compile(r'>>>>>>> CALIBRATION ([^ ]*)'),
+                  set_setting('CalibrationType'))],
+     **{e: [(re.compile(r'(%s)(?: |\Z)'%e), set_IncludedEyeMovementEvents)]
+        for e in EYE_MOVEMENT_EVENTS}})
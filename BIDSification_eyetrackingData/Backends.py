@@ -0,0 +1,222 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# registry of the eyetracker backends {eyetracktype: class of the backend}
+BACKENDS = {}
+
+# backend used for the eyetracker types that are not registered
+DEFAULT_BACKEND = 'generic'
+
+
+def register_backend(eyetracktype, capabilities=()):
+
+    '''
+    Class decorator registering a backend for a type of eyetracker
+
+    Parameters
+    ----------
+    eyetracktype: str
+        Name of the type of eyetracker (``eyetracktype`` parameter of
+        ``DataStandardisation``)
+    capabilities: list (default ())
+        Capabilities of the backend, among:
+
+        - 'settings': extracts settings from the data files,
+        - 'events': extracts events from the data files,
+        - 'eyeMovementEvents': extracts the eye movement events,
+        - 'sourcefile': the data files are copied in the BIDS directory,
+        - 'indexable': the samples have a timestamp column, which is
+          recorded in the index of the ``*_eyetrack.tsv.gz`` files,
+        - 'chunkable': the samples can be read by chunks with
+          ``iter_samples``
+
+    Returns
+    -------
+    decorator: function
+    '''
+
+    def decorator(cls):
+        cls.eyetracktype = eyetracktype
+        cls.capabilities = frozenset(capabilities)
+        BACKENDS[eyetracktype] = cls
+        return cls
+
+    return decorator
+
+def get_backend(eyetracktype):
+
+    '''
+    Class of the backend of a type of eyetracker
+
+    Parameters
+    ----------
+    eyetracktype: str
+        Name of the type of eyetracker
+
+    Returns
+    -------
+    backend: class
+        The backend registered for ``eyetracktype``, or the default backend
+    '''
+
+    # the modules of the backends provided with the package register them
+    from . import StandardisationProcessDataEyelink
+    from . import StandardisationProcessDataGeneric
+
+    return BACKENDS.get(eyetracktype, BACKENDS[DEFAULT_BACKEND])
+
+
+class Backend:
+
+    '''
+    Base class of the eyetracker backends
+
+    A backend reads the data files of a type of eyetracker. The methods of
+    the capabilities it does not declare keep their default behaviour.
+
+    Parameters
+    ----------
+    dirpath: str
+        Path of the data directory to BIDSified
+    StartMessage: str
+        Message marking the start of the trial
+    EndMessage: str
+        Message marking the end of the trial
+    '''
+
+    eyetracktype = None
+    capabilities = frozenset()
+
+    # name of the column of the timestamps of the samples
+    timestamp = 'eye_timestamp'
+
+    # on-disk cache of the parsed data files (see ParseCache), used by the
+    #  backends that support it
+    cache = None
+
+    def __init__(self, dirpath, StartMessage=None, EndMessage=None):
+
+        # global variables
+        self.dirpath = dirpath
+        self.StartMessage = StartMessage
+        self.EndMessage = EndMessage
+
+    def extract_settings(self, filename, filepath, settings):
+
+        '''
+        Extract the settings from a data file
+
+        Parameters
+        ----------
+        filename: str
+            Name of the data file to be BIDSified
+        filepath: str
+            Path of the data file to be BIDSified
+        settings: dict
+            A dictionary containing the settings of the experiment
+
+        Returns
+        -------
+        settings: dict
+            A dictionary containing the settings of the experiment
+        '''
+
+        return settings
+
+    def extract_samples(self, filename, filepath):
+
+        '''
+        Extract the samples from a data file
+
+        Parameters
+        ----------
+        filename: str
+            Name of the data file to be BIDSified
+        filepath: str
+            Path of the data file to be BIDSified
+
+        Returns
+        -------
+        line_formats, columns: list, dict
+            ``line_formats`` is the list of the names of the columns.
+            ``columns`` is a mapping ``{name: array}`` of the columns of
+            the samples (a dictionary or a :class:`Recording.Recording`)
+        '''
+
+        raise NotImplementedError
+
+    def iter_samples(self, filename, filepath, chunksize=None):
+
+        '''
+        Extract the samples from a data file by chunks
+
+        Parameters
+        ----------
+        filename: str
+            Name of the data file to be BIDSified
+        filepath: str
+            Path of the data file to be BIDSified
+        chunksize: int or None (default None)
+            Number of samples per chunk
+
+        Yields
+        ------
+        line_formats, columns: list, dict
+            The samples of a chunk (see :meth:`extract_samples`), all the
+            samples in one chunk if the backend is not 'chunkable'
+        '''
+
+        yield self.extract_samples(filename, filepath)
+
+    def extract_events(self, filename, filepath, saved_events, settings=None,
+                       events=None):
+
+        '''
+        Extract the trial events from a data file
+
+        Parameters
+        ----------
+        filename: str
+            Name of the data file to be BIDSified
+        filepath: str
+            Path of the data file to be BIDSified
+        saved_events: dict
+            Dictionary of events to be extracted from trials and their
+            descriptions
+        settings: dict or None (default None)
+            A dictionary containing the settings of the experiment
+        events: list or None (default None)
+            A dictionary list for each trial containing the events of
+            those trials
+
+        Returns
+        -------
+        events, settingsEvents: list, dict
+            ``events`` is a dictionary list for each trial containing the
+            events of those trials.
+            ``settingsEvents`` is a dictionary containing the settings for the
+            events in the experiment
+        '''
+
+        return events if events else [], {}
+
+    def extract_eyeMovementEvents(self, filename, filepath):
+
+        '''
+        Extract the eye movement events from a data file
+
+        Parameters
+        ----------
+        filename: str
+            Name of the data file to be BIDSified
+        filepath: str
+            Path of the data file to be BIDSified
+
+        Returns
+        -------
+        columns: dict or None
+            Dictionary ``{name: array}`` of the columns of the table of the
+            eye movement events
+        '''
+
+        return None
@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import re
+import numpy as np
+from .AscGrammar import line_key
+
+
+# Reminder for the validations in eyelink recordings
+'''
+|-----------------------------------------------------------------------------|
+| Lines                                                                       |
+|-----------------------------------------------------------------------------|
+| one line per point of the validation and per eye:                           |
+| MSG     9051590 VALIDATE R POINT 0  RIGHT  at 640,512  OFFSET 0.21 deg.     |
+|     4.3,-7.2 pix.                                                           |
+|                                                                             |
+| then one line per eye for the result of the validation:                     |
+| MSG     9051600 !CAL VALIDATION HV9 R RIGHT GOOD ERROR 0.32 avg. 0.64 max   |
+|     OFFSET 0.15 deg. -2.1,5.3 pix.                                          |
+|                                                                             |
+| or, for a validation interrupted by the operator, without its errors:       |
+| MSG     9051600 !CAL VALIDATION HV9 R RIGHT ABORTED                         |
+|-----------------------------------------------------------------------------|
+'''
+
+VALIDATION = re.compile(r'^MSG\t(?P<timestamp>\d+)\s.*?!CAL VALIDATION\s+'
+                        r'(?P<type>\S+)\s+(?P<mode>\S+)\s+'
+                        r'(?P<eye>LEFT|RIGHT)\s+(?P<result>\S+)'
+                        r'(?:\s+ERROR\s+(?P<avg>[-\d.]+)\s+avg\.\s+'
+                        r'(?P<max>[-\d.]+)\s+max'
+                        r'(?:\s+OFFSET\s+(?P<offset_deg>[-\d.]+)\s+deg\.\s+'
+                        r'(?P<offset_x>[-\d.]+),(?P<offset_y>[-\d.]+)'
+                        r'\s+pix\.)?)?')
+
+POINT = re.compile(r'^MSG\t(?P<timestamp>\d+)\s.*?VALIDATE\s+'
+                   r'(?P<mode>\S+)\s+'
+                   r'POINT\s+(?P<point>\d+)\s+(?P<eye>LEFT|RIGHT)\s+'
+                   r'at\s+(?P<x>[-\d.]+),(?P<y>[-\d.]+)\s+'
+                   r'OFFSET\s+(?P<offset_deg>[-\d.]+)\s+deg\.\s+'
+                   r'(?P<offset_x>[-\d.]+),(?P<offset_y>[-\d.]+)\s+pix\.')
+
+
+def is_calibration_line(line, key=None):
+
+    '''
+    Check if a line of an asc file is a line of a validation
+
+    Parameters
+    ----------
+    line: str
+        Line of the asc file
+    key: str or None (default None)
+        Key of the line (see :func:`AscGrammar.line_key`) if it is already
+        known
+
+    Returns
+    -------
+    bool
+    '''
+
+    if key is None:
+        key = line_key(line)
+
+    return key in ['MSG !CAL', 'MSG VALIDATE']
+
+def extract_calibrations(lines, trial_starts=None):
+
+    '''
+    Extract the validations of the calibrations from the lines of an asc file
+
+    Parameters
+    ----------
+    lines: list
+        Lines of the asc file containing the validations (the other lines
+        are ignored), in the order of the file
+    trial_starts: list or None (default None)
+        Timestamps of the messages marking the start of the trials
+
+    Returns
+    -------
+    calibrations: list
+        A dictionary list for each validation and each eye containing:
+        'timestamp', 'type' (for example 'HV9'), 'mode', 'eye' ('LEFT' or
+        'RIGHT'), 'result' (for example 'GOOD' or 'ABORTED'),
+        'AverageCalibrationError' and 'MaximalCalibrationError' (in degree),
+        'offset_deg', 'offset_pix' ([x, y]), 'points' (a dictionary list for
+        each point of the validation: 'point', 'position' ([x, y]),
+        'offset_deg', 'offset_pix') and 'trial' (number of trials started
+        before the validation). The errors and offsets of the aborted
+        validations are None
+    '''
+
+    def to_float(v):
+        return float(v) if v is not None else None
+
+    calibrations = []
+    # points of the validation in progress for each eye
+    points = {}
+
+    for line in lines:
+
+        m = POINT.match(line)
+        if m:
+            points.setdefault(m['eye'], []).append(dict(
+                        point=int(m['point']),
+                        position=[float(m['x']), float(m['y'])],
+                        offset_deg=float(m['offset_deg']),
+                        offset_pix=[float(m['offset_x']),
+                                    float(m['offset_y'])]))
+            continue
+
+        m = VALIDATION.match(line)
+        if m:
+            offset_pix = None
+            if m['offset_x'] is not None:
+                offset_pix = [float(m['offset_x']), float(m['offset_y'])]
+
+            calibrations.append(dict(timestamp=int(m['timestamp']),
+                                     type=m['type'],
+                                     mode=m['mode'],
+                                     eye=m['eye'],
+                                     result=m['result'],
+                                     AverageCalibrationError=to_float(
+                                                                m['avg']),
+                                     MaximalCalibrationError=to_float(
+                                                                m['max']),
+                                     offset_deg=to_float(m['offset_deg']),
+                                     offset_pix=offset_pix,
+                                     points=points.pop(m['eye'], []),
+                                     trial=0))
+
+    #--------------------------------------------------------------------------
+    # number of trials started before each validation
+    #--------------------------------------------------------------------------
+    if trial_starts is not None and len(trial_starts) and calibrations:
+        timestamps = np.array([c['timestamp'] for c in calibrations])
+        trials = np.searchsorted(np.sort(np.asarray(trial_starts)),
+                                 timestamps, side='right')
+        for c, t in zip(calibrations, trials.tolist()):
+            c['trial'] = t
+
+    return calibrations
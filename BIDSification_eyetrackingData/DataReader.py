@@ -0,0 +1,582 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import csv
+import glob
+import gzip
+from collections import OrderedDict
+import numpy as np
+from .File import open_file, to_dtype, read_gz_index, read_gz_blocks, \
+                   NPY_COLUMNS
+from .Epochs import event_onsets, epoch_data
+from .Recording import Recording
+
+
+class DataReader:
+
+    '''
+    Reader of the data of a BIDSified directory
+
+    The samples of the ``*_eyetrack`` files are decoded into arrays which are
+    kept in a LRU cache, so reading the same recording again does not parse
+    its file again. The columns are read from the ``*_eyetrack.npy``
+    directory if it exists (only the selected columns are loaded, as
+    memory-mapped arrays), from the ``*_eyetrack.parquet`` file if it exists
+    and pyarrow is installed, otherwise from the ``*_eyetrack.tsv.gz`` file.
+
+    The arrays returned are read-only views on the arrays of the cache.
+
+    Parameters
+    ----------
+    path: str
+        Path of the BIDS data directory
+    cache_size: int (default 8)
+        Maximum number of recordings kept in the cache
+    timestamp: str (default 'eye_timestamp')
+        Name of the column containing the timestamps of the samples
+    '''
+
+    def __init__(self, path, cache_size=8, timestamp='eye_timestamp'):
+
+        # checks if the BIDS data directory exists
+        if not os.path.isdir(path):
+            raise ValueError("Directory '%s' does not exist"%path)
+
+        # global variables
+        self.path = path
+        self.cache_size = cache_size
+        self.timestamp = timestamp
+        self.cache = OrderedDict()
+
+        # dictionary {recording: path of the directory of the recording}
+        self.recordings = self.find_recordings()
+
+    def find_recordings(self):
+
+        '''
+        Search for the recordings of the BIDS data directory
+
+        Returns
+        -------
+        recordings: dict
+            Dictionary ``{recording: filepath}`` where ``recording`` is the
+            name of the files of the recording without the ``_eyetrack``
+            suffix (for example 'sub-002_ses-001') and ``filepath`` the path
+            of its directory
+        '''
+
+        recordings = {}
+        for tree in [['sub-*'], ['sub-*', 'ses-*']]:
+            pattern = os.path.join(self.path, *tree, 'eyetrack',
+                                   '*_eyetrack.*')
+            for f in glob.glob(pattern):
+                recording = os.path.basename(f).split('_eyetrack.')[0]
+                recordings[recording] = os.path.dirname(f)
+
+        return dict(sorted(recordings.items()))
+
+    def filepath(self, recording):
+
+        '''
+        Path of the directory of a recording
+
+        Parameters
+        ----------
+        recording: str
+            Name of the recording (for example 'sub-002_ses-001')
+
+        Returns
+        -------
+        filepath: str
+            Path of the directory of the recording
+        '''
+
+        if recording not in self.recordings:
+            # the directory may have been completed since the reader was
+            #  created
+            self.recordings = self.find_recordings()
+            if recording not in self.recordings:
+                raise ValueError("Recording '%s' does not exist in '%s'"%(
+                                 recording, self.path))
+
+        return self.recordings[recording]
+
+    #--------------------------------------------------------------------------
+    # Settings and events
+    #--------------------------------------------------------------------------
+    def read_settings(self, recording):
+
+        '''
+        Read the ``*_eyetrack.json`` file of a recording, merged with the
+        files it inherits from (see :meth:`read_sidecar`)
+
+        Parameters
+        ----------
+        recording: str
+            Name of the recording
+
+        Returns
+        -------
+        settings: dict
+            A dictionary containing the settings of the recording
+        '''
+
+        return self.read_sidecar(recording, 'eyetrack')
+
+    def read_sidecar(self, recording, suffix):
+
+        '''
+        Read the sidecar json file of a recording following the BIDS
+        inheritance principle: the ``[<entities>_]<suffix>.json`` files of
+        the root of the dataset and of the directories of the recording,
+        whose entities are a subset of the entities of the recording, are
+        merged from the root to the directory of the recording (and from the
+        less to the more specific file in a directory)
+
+        Parameters
+        ----------
+        recording: str
+            Name of the recording
+        suffix: str
+            Suffix of the sidecar file (for example 'eyetrack' or 'events')
+
+        Returns
+        -------
+        sidecar: dict
+            The merged sidecar file
+        '''
+
+        filepath = self.filepath(recording)
+        entities = set(recording.split('_'))
+
+        dirpaths = [self.path]
+        for d in os.path.relpath(filepath, self.path).split(os.sep):
+            dirpaths.append(os.path.join(dirpaths[-1], d))
+
+        sidecar = {}
+        found = False
+        for dirpath in dirpaths:
+
+            files = []
+            for f in os.listdir(dirpath):
+                if f==suffix+'.json':
+                    files.append((0, f))
+                elif f.endswith('_'+suffix+'.json'):
+                    e = f[:-len('_'+suffix+'.json')].split('_')
+                    if set(e)<=entities:
+                        files.append((len(e), f))
+
+            for _, f in sorted(files):
+                sidecar.update(open_file(f, dirpath))
+                found = True
+
+        if not found:
+            raise FileNotFoundError("No %s.json file for recording '%s'"%(
+                                    suffix, recording))
+
+        return sidecar
+
+    def read_events(self, recording):
+
+        '''
+        Read the ``*_events.tsv`` file of a recording
+
+        Parameters
+        ----------
+        recording: str
+            Name of the recording
+
+        Returns
+        -------
+        events: list
+            A dictionary list for each trial containing the events of
+            those trials, empty if the recording has no events file
+        '''
+
+        filepath = self.filepath(recording)
+        if not os.path.isfile(os.path.join(filepath, recording+'_events.tsv')):
+            return []
+
+        return open_file(recording+'_events.tsv', filepath)
+
+    #--------------------------------------------------------------------------
+    # Data
+    #--------------------------------------------------------------------------
+    def read_data(self, recording, columns=None, t0=None, t1=None):
+
+        '''
+        Read the samples of a recording
+
+        Parameters
+        ----------
+        recording: str
+            Name of the recording
+        columns: list or None (default None)
+            Names of the columns to be read, all the columns if None
+        t0: float or None (default None)
+            First timestamp of the samples to be read (included)
+        t1: float or None (default None)
+            Last timestamp of the samples to be read (included)
+
+        Returns
+        -------
+        data: dict
+            Dictionary ``{name: array}`` of the selected columns, the missing
+            values are NaN
+        '''
+
+        if columns is None:
+            columns = self.columns(recording)
+
+        load = list(columns)
+        if (t0 is not None or t1 is not None) and self.timestamp not in load:
+            load.append(self.timestamp)
+
+        data = self.load(recording, load)
+
+        # selection of the time range
+        start, stop = 0, None
+        if t0 is not None or t1 is not None:
+            timestamps = data[self.timestamp]
+            if t0 is not None:
+                start = np.searchsorted(timestamps, t0, side='left')
+            if t1 is not None:
+                stop = np.searchsorted(timestamps, t1, side='right')
+
+        return {k: data[k][start:stop] for k in columns}
+
+    def read_window(self, recording, t0, t1, columns=None):
+
+        '''
+        Read the samples of a recording between two timestamps
+
+        If the recording is read from a ``*_eyetrack.tsv.gz`` file which is
+        not in the cache, only the compressed blocks of the file containing
+        the timestamps between ``t0`` and ``t1`` are decompressed, using the
+        index embedded in the file. The result is not added to the cache.
+
+        Parameters
+        ----------
+        recording: str
+            Name of the recording
+        t0: float
+            First timestamp of the samples to be read (included)
+        t1: float
+            Last timestamp of the samples to be read (included)
+        columns: list or None (default None)
+            Names of the columns to be read, all the columns if None
+
+        Returns
+        -------
+        data: dict
+            Dictionary ``{name: array}`` of the selected columns, the missing
+            values are NaN
+        '''
+
+        fileformat, filename = self.source(recording)
+
+        entry = self.cache.get(recording)
+        key = (filename, os.stat(filename).st_mtime_ns)
+        cached = entry is not None and entry['key']==key
+
+        gz_index = None
+        if fileformat=='tsv.gz' and not cached:
+            gz_index = read_gz_index(filename)
+
+        if not gz_index or not gz_index['timestamp']:
+            return self.read_data(recording, columns, t0, t1)
+
+        names = gz_index['columns']
+        if columns is None:
+            columns = names
+        unknown = [k for k in columns if k not in names]
+        if unknown:
+            raise ValueError("Recording '%s' has no columns %s"%(recording,
+                                                                 unknown))
+
+        # blocks containing timestamps between t0 and t1
+        blocks = gz_index['blocks']
+        first = np.array(blocks['first'])
+        last = np.array(blocks['last'])
+        b = np.flatnonzero((last>=t0) & (first<=t1))
+
+        text = read_gz_blocks(filename,
+                              [blocks['offset'][i] for i in b],
+                              [blocks['length'][i] for i in b])
+        data = self.decode_lines(text.splitlines(), names,
+                                 dict(zip(names, gz_index.get('dtypes', []))))
+
+        timestamps = data[gz_index['timestamp']]
+        keep = (timestamps>=t0) & (timestamps<=t1)
+
+        return {k: data[k][keep] for k in columns}
+
+    def read_epochs(self, recording, event, tmin, tmax, columns=None,
+                    step=None):
+
+        '''
+        Read the samples of a recording in epochs aligned on an event of the
+        ``*_events.tsv`` file (see :func:`epoch_data`)
+
+        Parameters
+        ----------
+        recording: str
+            Name of the recording
+        event: str
+            Name of the event on which the epochs are aligned (for example
+            'sample' for the start of the trials)
+        tmin: float
+            Start of the epochs relative to the event, in the unit of the
+            timestamps
+        tmax: float
+            End of the epochs relative to the event (included)
+        columns: list or None (default None)
+            Names of the columns to be epoched, all the columns except the
+            timestamps if None
+        step: float or None (default None)
+            Interval between two points of the epochs, by default the median
+            interval between two samples
+
+        Returns
+        -------
+        epochs, times, channels: numpy.ndarray, numpy.ndarray, list
+            ``epochs`` is an array of shape (trials, times, channels).
+            ``times`` the times of the points of the epochs relative to the
+            event, ``channels`` the names of the channels
+        '''
+
+        if columns is None:
+            columns = [k for k in self.columns(recording)
+                       if k!=self.timestamp]
+
+        onsets = event_onsets(self.read_events(recording), event)
+        data = self.read_data(recording, columns+[self.timestamp])
+        timestamps = data.pop(self.timestamp)
+
+        return epoch_data(timestamps, data, onsets, tmin, tmax, step)
+
+    def columns(self, recording):
+
+        '''
+        Names of the columns of the samples of a recording
+
+        Parameters
+        ----------
+        recording: str
+            Name of the recording
+
+        Returns
+        -------
+        columns: list
+            Names of the columns
+        '''
+
+        return list(self.cache_entry(recording)['columns'])
+
+    def clear_cache(self):
+
+        '''
+        Empty the cache of the decoded recordings
+        '''
+
+        self.cache.clear()
+
+    def source(self, recording):
+
+        '''
+        File from which the samples of a recording are read
+
+        Parameters
+        ----------
+        recording: str
+            Name of the recording
+
+        Returns
+        -------
+        fileformat, filename: str, str
+            Format ('npy', 'parquet' or 'tsv.gz') and full name of the file
+        '''
+
+        filepath = self.filepath(recording)
+
+        for fileformat in ['npy', 'parquet', 'tsv.gz']:
+            filename = os.path.join(filepath,
+                                    recording+'_eyetrack.'+fileformat)
+            if os.path.exists(filename):
+                if fileformat=='parquet':
+                    try:
+                        import pyarrow.parquet
+                    except ImportError:
+                        continue
+                return fileformat, filename
+
+        raise ValueError("Recording '%s' has no data file"%recording)
+
+    def cache_entry(self, recording):
+
+        '''
+        Entry of the cache of a recording, created if the recording is not in
+        the cache or if its file has been modified since it was decoded
+
+        Parameters
+        ----------
+        recording: str
+            Name of the recording
+
+        Returns
+        -------
+        entry: dict
+            ``{'key': (filename, mtime), 'format': fileformat,
+            'columns': {name: array or None}}``, the columns not yet loaded
+            are None
+        '''
+
+        fileformat, filename = self.source(recording)
+        key = (filename, os.stat(filename).st_mtime_ns)
+
+        entry = self.cache.get(recording)
+        if entry is None or entry['key']!=key:
+
+            if fileformat=='npy':
+                # the order of the columns is not recorded in the
+                #  directories written before it was
+                if os.path.isfile(os.path.join(filename, NPY_COLUMNS)):
+                    names = open_file(NPY_COLUMNS, filename)
+                else:
+                    names = sorted(f[:-4] for f in os.listdir(filename)
+                                   if f.endswith('.npy'))
+                columns = {k: None for k in names}
+
+            elif fileformat=='parquet':
+                import pyarrow.parquet
+                names = pyarrow.parquet.read_schema(filename).names
+                columns = {k: None for k in names}
+
+            else:
+                columns = self.decode_tsv(filename)
+
+            entry = dict(key=key, format=fileformat, columns=columns)
+            self.cache[recording] = entry
+
+            # LRU eviction
+            while len(self.cache)>self.cache_size:
+                self.cache.popitem(last=False)
+
+        self.cache.move_to_end(recording)
+
+        return entry
+
+    def load(self, recording, columns):
+
+        '''
+        Load columns of a recording in the cache
+
+        Parameters
+        ----------
+        recording: str
+            Name of the recording
+        columns: list
+            Names of the columns to be loaded
+
+        Returns
+        -------
+        data: dict
+            Dictionary ``{name: array}`` of the columns of the cache
+        '''
+
+        entry = self.cache_entry(recording)
+        filename, _ = entry['key']
+
+        unknown = [k for k in columns if k not in entry['columns']]
+        if unknown:
+            raise ValueError("Recording '%s' has no columns %s"%(recording,
+                                                                 unknown))
+
+        missing = [k for k in columns if entry['columns'][k] is None]
+
+        if missing and entry['format']=='npy':
+            for k in missing:
+                entry['columns'][k] = np.load(os.path.join(filename, k+'.npy'),
+                                              mmap_mode='r')
+
+        elif missing and entry['format']=='parquet':
+            import pyarrow.parquet
+            table = pyarrow.parquet.read_table(filename, columns=missing)
+            for k in missing:
+                values = table.column(k).to_numpy()
+                values.flags.writeable = False
+                entry['columns'][k] = values
+
+        return {k: entry['columns'][k] for k in columns}
+
+    @staticmethod
+    def decode_tsv(filename):
+
+        '''
+        Decode a ``*_eyetrack.tsv.gz`` file into arrays, with the types of
+        the columns recorded in the index of the file (see
+        :func:`File.read_gz_index`)
+
+        Parameters
+        ----------
+        filename: str
+            Full name of the file
+
+        Returns
+        -------
+        columns: Recording
+            Mapping ``{name: array}`` of the columns, the arrays are
+            contiguous read-only views on a single buffer
+        '''
+
+        with gzip.open(filename, 'rt', newline='') as f:
+            names = next(csv.reader([f.readline()], delimiter=' '), [])
+            lines = f.read().splitlines()
+
+        gz_index = read_gz_index(filename) or {}
+        dtypes = dict(zip(gz_index.get('columns', []),
+                          gz_index.get('dtypes', [])))
+
+        return DataReader.decode_lines(lines, names, dtypes)
+
+    @staticmethod
+    def decode_lines(lines, names, dtypes=None):
+
+        '''
+        Decode the lines of a ``*_eyetrack.tsv.gz`` file into arrays
+
+        The fields of the lines are separated by a space, and the fields
+        containing spaces are quoted (see :func:`File.format_lines`). The
+        empty fields are missing values.
+
+        Parameters
+        ----------
+        lines: list
+            Lines of the file, without the header
+        names: list
+            Names of the columns
+        dtypes: dict or None (default None)
+            Dictionary ``{name: dtype}`` of the types of the columns (see
+            :func:`File.to_dtype`), the columns without type are floats if
+            all their values are numbers, otherwise strings
+
+        Returns
+        -------
+        columns: Recording
+            Mapping ``{name: array}`` of the columns, the arrays are
+            contiguous read-only views on a single buffer
+        '''
+
+        if dtypes is None:
+            dtypes = {}
+
+        rows = csv.reader(lines, delimiter=' ')
+
+        n = len(names)
+        rows = [r[:n] if len(r)>=n else r+['']*(n-len(r)) for r in rows]
+        values = np.array(rows, dtype=str).reshape(-1, n)
+
+        return Recording.from_columns({k: to_dtype(values[:, i], dtypes.get(k))
+                                       for i, k in enumerate(names)},
+                                      writeable=False)
@@ -2,9 +2,25 @@
 # -*- coding: utf-8 -*-
 
 import os
-from .File import open_file, save_file
+import json
+import shutil
+from .File import open_file, save_file, save_columns, save_chunks, \
+                  copy_file, to_typed
 from .StandardisationProcess import *
 from .StandardisationProcessDataEyelink import *
+from .Backends import get_backend
+from .Scheduler import estimate_cost, run_largest_first
+from .ParseCache import ParseCache
+from .Masks import sample_flags, FLAGS_COLUMN
+from .Recording import Recording
+
+# directory of the new BIDS data directory containing the results of the
+#  shards until they are merged
+SHARDS_DIRECTORY = '.shards'
+
+# file of the new BIDS data directory containing the options of its last
+#  conversion
+OPTIONS_FILENAME = '.options.json'
 
 class DataStandardisation:
 
@@ -31,9 +47,10 @@ class DataStandardisation:
         Name of the file describing the dataset
 
     eyetracktype: str
-        Name of the type of eyetackeur used
+        Name of the type of eyetackeur used, which selects the backend
+        reading the data files (see :func:`Backends.register_backend`)
     dataformat: str
-        Data format
+        Data format, for example '.asc'
     saved_events: dict
         dictionary of events to be extracted from trials and their
         descriptions:
@@ -44,12 +61,86 @@ class DataStandardisation:
         Message marking the start of the trial
     EndMessage: str
         Message marking the end of the trial
+
+    fsync: bool (default False)
+        If True, each BIDSified file is synchronised to disk after being
+        written
+    output_formats: list or None (default None)
+        Additional formats in which the data files are saved alongside the
+        ``*_eyetrack.tsv.gz`` files: 'npy' (a ``*_eyetrack.npy`` directory
+        with one .npy file per column) and/or 'parquet'
+    eyeMovementEvents: bool (default False)
+        If True, the eye movement events (fixations, saccades and blinks) of
+        each data file are saved in a ``*_eyemovements.tsv.gz`` table
+    summary: bool (default False)
+        If True, summary statistics of each trial (number of samples, fraction
+        of missing samples, mean pupil size and number of blinks) are saved
+        in the ``derivatives/summary`` directory of the new BIDS data
+        directory
+    inheritance: bool (default False)
+        If True, the sidecar files ``*_eyetrack.json`` and ``*_events.json``
+        follow the BIDS inheritance principle: the fields common to all the
+        recordings are saved once at the dataset level, the fields common to
+        the recordings of a subject at the subject level, and only the other
+        fields in the sidecar file of each recording
+    compresslevel: int (default 9)
+        Compression level of the ``*.tsv.gz`` files
+    workers: int (default 1)
+        Number of processes converting the data files in parallel, the data
+        files with the most lines first (see
+        :func:`Scheduler.run_largest_first`). The utilization of the
+        processes is printed at the end, and their schedule is kept in the
+        ``schedule`` attribute
+    incremental: bool (default False)
+        If True, the data files whose ``*_eyetrack.tsv.gz`` file is newer
+        than the data file, its events file, the information file and the
+        settings files are not converted again (this file is written after
+        the other files of the recording). With ``inheritance``, the sidecar
+        files of these data files are extracted again, the inherited files
+        are computed over all the recordings
+    dry_run: bool (default False)
+        If True, the files to be BIDSified are only checked (see
+        :meth:`preflight`) and nothing is written in the new BIDS data
+        directory
+    shard: tuple or None (default None)
+        ``(i, N)``: only the data files of the shard ``i`` (from 0 to N-1) of
+        a partition of infoFiles in N shards balanced by the size of the data
+        files are BIDSified (see
+        :meth:`StandardisationProcess.shard_infoFiles`). The participants and
+        the sidecar files kept with ``inheritance`` are saved in the
+        ``.shards`` directory of the new BIDS data directory, to be merged by
+        the finalize step
+    finalize: bool (default False)
+        If True, no data file is BIDSified: the results of all the shards
+        are merged in the participants file, the inherited sidecar files are
+        saved, the dataset_description file is copied and the ``.shards``
+        directory is removed (see :meth:`finalize_shards`)
+    cache_dir: str or None (default None)
+        Path of the directory of an on-disk cache of the parsed data files
+        (see :class:`ParseCache.ParseCache`), shared by the runs on the same
+        data files: the samples of a data file already in the cache are not
+        parsed again, for example when only the events settings change
+    cache_size: int (default 1 GiB)
+        Maximal size of the cache in bytes
+    precision: int or None (default None)
+        Number of decimals of the floats in the ``*_eyetrack.tsv.gz`` and
+        ``*_eyemovements.tsv.gz`` files, by default the floats are written as
+        they were recorded (see :func:`File.format_lines`)
+    masks: bool (default False)
+        If True, a ``sample_flags`` column is added to the data files: the
+        bitmask of the samples of tracking loss, in a blink or outside the
+        screen (see :func:`Masks.sample_flags`)
     '''
 
     def __init__(self, path_oldData, path_newData, infofilesname,
                  settingsfilename, settingsEventsfilename,
                  datasetdescriptionfilename, eyetracktype,
-                 dataformat, saved_events, StartMessage, EndMessage):
+                 dataformat, saved_events, StartMessage, EndMessage,
+                 fsync=False, output_formats=None, eyeMovementEvents=False,
+                 summary=False, inheritance=False, compresslevel=9,
+                 workers=1, incremental=False, dry_run=False, shard=None,
+                 finalize=False, cache_dir=None, cache_size=1024**3,
+                 precision=None, masks=False):
 
         # checks if the directory of the data to be BISDified exists
         if not os.path.isdir(path_oldData):
@@ -60,6 +151,22 @@ class DataStandardisation:
         self.eyetracktype = eyetracktype
         self.saved_events = saved_events
         self.settings = None
+        self.fsync = fsync
+        self.output_formats = output_formats or []
+        self.eyeMovementEvents = eyeMovementEvents
+        self.summary = summary
+        self.inheritance = inheritance
+        self.compresslevel = compresslevel
+        self.precision = precision
+        self.masks = masks
+        self.workers = workers
+        self.incremental = incremental
+        self.sidecars = []
+        self.samples = None
+        self.eyeMovements = None
+        self.events = None
+        self.report = None
+        self.schedule = None
 
 
         # Standard process
@@ -79,13 +186,35 @@ class DataStandardisation:
                                           infofilesname)
         settingsEventsfilename = self.process.settingsEventsfilename
 
+        # files of the data directory used for all the data files
+        self.path_oldData = path_oldData
+        self.path_newData = path_newData
+        self.infofilesname = infofilesname
+        self.settingsfilename = settingsfilename
+        self.settingsEventsfilename = settingsEventsfilename
+        self.infos = infos
+
+        # options of the conversion, the files converted with other options
+        #  are not up to date (see is_uptodate)
+        self.options = json.loads(json.dumps(dict(
+                        infofilesname=infofilesname,
+                        settingsfilename=settingsfilename,
+                        settingsEventsfilename=settingsEventsfilename,
+                        eyetracktype=eyetracktype, dataformat=dataformat,
+                        saved_events=saved_events, StartMessage=StartMessage,
+                        EndMessage=EndMessage,
+                        output_formats=self.output_formats,
+                        eyeMovementEvents=eyeMovementEvents, summary=summary,
+                        inheritance=inheritance, compresslevel=compresslevel,
+                        precision=precision, masks=masks)))
+        self.same_options = self.read_options()==self.options
+
         # Eyetracking process
         #----------------------------------------------------------------------
-        self.process_ET = None
-        if self.eyetracktype=='Eyelink':
-            self.process_ET = StandardisationProcessDataEyelink(path_oldData,
-                                                                StartMessage,
-                                                                EndMessage)
+        backend = get_backend(self.eyetracktype)
+        self.process_ET = backend(path_oldData, StartMessage, EndMessage)
+        if cache_dir:
+            self.process_ET.cache = ParseCache(cache_dir, cache_size)
 
         #######################################################################
         #  BIDSification of all files in infoFiles
@@ -94,59 +223,425 @@ class DataStandardisation:
         # Open the information file
         infoFiles = open_file(infofilesname, path_oldData)
 
-        for f in infoFiles:
+        if finalize:
+            infoFiles, self.sidecars = self.finalize_shards()
 
-            print(f['participant_id'])
+        else:
+            # lines of infoFiles to be BIDSified
+            indices = list(range(len(infoFiles)))
+            if shard:
+                indices = self.process.shard_infoFiles(infoFiles, shard)
+            infoFiles_shard = [infoFiles[k] for k in indices]
+
+            if dry_run:
+                self.report = self.preflight(infoFiles_shard)
+                return
+
+            # the options of the previous conversion are removed until this
+            #  one is done, so the files of an interrupted conversion are not
+            #  taken as up to date with these options
+            options_file = os.path.join(path_newData, OPTIONS_FILENAME)
+            if not self.same_options and os.path.isfile(options_file):
+                os.remove(options_file)
+
+            sidecars = []
+            if self.workers>1 and len(infoFiles_shard)>1:
+                # the largest data files are converted first
+                costs = [estimate_cost(f['filename'],
+                                       os.path.join(path_oldData,
+                                                    f['filepath']))
+                         for f in infoFiles_shard]
+                sidecars, self.schedule = run_largest_first(self.create_Files,
+                                                            infoFiles_shard,
+                                                            costs,
+                                                            self.workers)
+                print("Utilization of the %d workers: %.0f%% over %.1f s"%(
+                      self.workers, 100*self.schedule['utilization'],
+                      self.schedule['makespan']))
+            else:
+                for f in infoFiles_shard:
+                    sidecars.append(self.create_Files(f))
+
+            if shard:
+                self.save_shard(shard, infoFiles, indices, sidecars)
+                self.save_options()
+                return
+
+            self.sidecars = [s for s_file in sidecars for s in s_file]
+
+        # FILES *_eyetrack.json and *_events.json inherited
+        #----------------------------------------------------------------------
+        if self.inheritance:
+            self.create_InheritedSidecars(path=path_newData)
 
-            # creation of the path to the old data
-            #------------------------------------------------------------------
-            filepath = os.path.join(path_oldData, f['filepath'])
+        # FILE *_participant.tsv
+        #----------------------------------------------------------------------
+        self.create_InfoParticipantsFile(infofilesname=infofilesname,
+                                         list_settings=infos['participant'],
+                                         path=path_newData,
+                                         infoFiles=infoFiles)
 
-            # creation of the directory that will contain the data to be
-            #  BIDSified if it does not already exist
-            #------------------------------------------------------------------
-            new_filepath = self.create_filepath(infoFile=f, path=path_newData)
 
+        # FILE dataset_description.json
+        #----------------------------------------------------------------------
+        copy_file(os.path.join(path_oldData, datasetdescriptionfilename),
+                  'dataset_description.json', path_newData, fsync=self.fsync)
 
-            # creation of the file names of the BIDSified data
-            #------------------------------------------------------------------
-            new_filename = self.create_filename(infoFile=f)
+        # the results of the shards are merged
+        if finalize:
+            shutil.rmtree(os.path.join(path_newData, SHARDS_DIRECTORY))
 
-            ###################################################################
-            #  CREATION OF THE FILES
-            ###################################################################
-            arg = dict(filename=f['filename'], filepath=filepath,
-                       new_filename=new_filename, new_filepath=new_filepath)
+        self.save_options()
+        #----------------------------------------------------------------------
+        #######################################################################
 
-            # FILES *_eyetrack
-            #------------------------------------------------------------------
-            self.create_SettingsFile(settingsfilename=settingsfilename,
-                                     infofilesname=infofilesname,
-                                     list_settings=infos['file'], **arg)
-            self.create_DataFile(**arg)
+    def create_Files(self, infoFile):
 
-            # FILE *_events
-            #------------------------------------------------------------------
-            self.create_EventsFile(eventsfilename=f['eventsfilename'],
-                                 settingsEventsfilename=settingsEventsfilename,
-                                 **arg)
+        '''
+        BIDSification of a data file of infoFiles
 
-        # FILE *_participant.tsv
-        #----------------------------------------------------------------------
-        self.create_InfoParticipantsFile(infofilesname=infofilesname,
-                                         list_settings=infos['participant'],
-                                         path=path_newData)
+        Parameters
+        ----------
+        infoFile: dict
+            Dictionary containing the information on the data to be BIDSified
 
+        Returns
+        -------
+        sidecars: list
+            Sidecar files kept to be saved with the inheritance principle
+            (see :meth:`save_sidecar`)
+        '''
 
-        # FILE dataset_description.json
+        f = infoFile
+        self.sidecars = []
+
+        # creation of the path to the old data
+        #----------------------------------------------------------------------
+        filepath = os.path.join(self.path_oldData, f['filepath'])
+
+        # creation of the directory that will contain the data to be
+        #  BIDSified if it does not already exist
         #----------------------------------------------------------------------
-        import shutil
-        shutil.copy2(os.path.join(path_oldData, datasetdescriptionfilename),
-                     os.path.join(path_newData, 'dataset_description.json'))
+        new_filepath = self.create_filepath(infoFile=f, path=self.path_newData)
+
+
+        # creation of the file names of the BIDSified data
         #----------------------------------------------------------------------
+        new_filename = self.create_filename(infoFile=f)
+
+        arg = dict(filename=f['filename'], filepath=filepath,
+                   new_filename=new_filename, new_filepath=new_filepath)
+
+        if self.incremental and self.is_uptodate(f, new_filename,
+                                                 new_filepath):
+            # the sidecar files of all the recordings give the inherited
+            #  files
+            if self.inheritance:
+                self.create_Sidecars(eventsfilename=f['eventsfilename'],
+                                     **arg)
+            return self.sidecars
+
+        print(f['participant_id'])
+
         #######################################################################
+        #  CREATION OF THE FILES
+        #######################################################################
+
+        # FILE *_eyetrack.json
+        #----------------------------------------------------------------------
+        self.create_SettingsFile(settingsfilename=self.settingsfilename,
+                                 infofilesname=self.infofilesname,
+                                 list_settings=self.infos['file'], **arg)
+
+        # FILE *_events
+        #----------------------------------------------------------------------
+        self.create_EventsFile(eventsfilename=f['eventsfilename'],
+                            settingsEventsfilename=self.settingsEventsfilename,
+                            **arg)
+
+        # FILE *_eyemovements
+        #----------------------------------------------------------------------
+        if self.eyeMovementEvents and \
+           'eyeMovementEvents' in self.process_ET.capabilities:
+            self.create_EyeMovementEventsFile(**arg)
 
-    def create_filepath(self, infoFile, path):
+        # FILE *_eyetrack.tsv.gz
+        #----------------------------------------------------------------------
+        self.create_DataFile(**arg)
+
+        # FILE derivatives/summary *_desc-summary_eyetrack
+        #----------------------------------------------------------------------
+        if self.summary:
+            self.create_SummaryFile(infoFile=f, path=self.path_newData,
+                                    new_filename=new_filename)
+
+        self.samples = None
+        self.eyeMovements = None
+
+        return self.sidecars
+
+    def create_Sidecars(self, filename, filepath, eventsfilename,
+                        new_filename, new_filepath):
+
+        '''
+        Extraction of the sidecar files of a data file whose other files are
+        up to date, kept to be saved with the inheritance principle (see
+        :meth:`save_sidecar`)
+
+        Parameters
+        ----------
+        filename: str
+            Name of the data file to be BIDSified
+        filepath: str
+            Path of the data file to be BIDSified
+        eventsfilename: str
+            Name of the events file to be BIDSified
+        new_filename: str
+            New name of the data file to be BIDSified
+        new_filepath: str
+            New path of the data file to be BIDSified
+        '''
+
+        self.create_SettingsFile(filename, filepath, new_filename,
+                                 new_filepath, self.settingsfilename,
+                                 self.infofilesname, self.infos['file'])
+
+        settingsEvents = self.extract_Events(filename, eventsfilename,
+                                             filepath,
+                                             self.settingsEventsfilename)[1]
+        if settingsEvents!={}:
+            self.save_sidecar(settingsEvents, new_filename+'_events.json',
+                              new_filepath)
+
+    def source_files(self, infoFile):
+
+        '''
+        Files of the data directory from which the files of a data file are
+        BIDSified
+
+        Parameters
+        ----------
+        infoFile: dict
+            Dictionary containing the information on the data to be BIDSified
+
+        Returns
+        -------
+        files: list
+            Paths of the data file, of its events file, of the information
+            file and of the settings files
+        '''
+
+        filepath = os.path.join(self.path_oldData, infoFile['filepath'])
+
+        files = [os.path.join(filepath, infoFile['filename'])]
+        if infoFile['eventsfilename']:
+            files.append(os.path.join(filepath, infoFile['eventsfilename']))
+        for filename in [self.infofilesname, self.settingsfilename,
+                         self.settingsEventsfilename]:
+            if filename:
+                files.append(os.path.join(self.path_oldData, filename))
+
+        return files
+
+    def is_uptodate(self, infoFile, new_filename, new_filepath):
+
+        '''
+        Check if the files of a data file are newer than its source files
+        (see :meth:`source_files`) and were converted with the same options
+        (see :meth:`read_options`)
+
+        Parameters
+        ----------
+        infoFile: dict
+            Dictionary containing the information on the data to be BIDSified
+        new_filename: str
+            New name of the data file
+        new_filepath: str
+            New path of the data file
+
+        Returns
+        -------
+        bool
+        '''
+
+        if not self.same_options:
+            return False
+
+        target = os.path.join(new_filepath, new_filename+'_eyetrack.tsv.gz')
+        if not os.path.isfile(target):
+            return False
+
+        mtime = os.stat(target).st_mtime_ns
+        for f in self.source_files(infoFile):
+            if os.path.isfile(f) and os.stat(f).st_mtime_ns>mtime:
+                return False
+
+        return True
+
+    def read_options(self):
+
+        '''
+        Options of the last conversion of the new BIDS data directory
+
+        Returns
+        -------
+        options: dict or None
+            The options saved by :meth:`save_options`, None if the directory
+            has not been converted or if its conversion was interrupted
+        '''
+
+        try:
+            return open_file(OPTIONS_FILENAME, self.path_newData)
+        except (OSError, ValueError):
+            return None
+
+    def save_options(self):
+
+        '''
+        Save the options of the conversion in the new BIDS data directory,
+        once the data files are converted
+        '''
+
+        save_file(self.options, OPTIONS_FILENAME, self.path_newData,
+                  fsync=self.fsync)
+        self.same_options = True
+
+    def preflight(self, infoFiles):
+
+        '''
+        Check the data files to be BIDSified without writing anything
+
+        For each data file, a line is printed with its status ('missing' if
+        one of its source files does not exist, 'uptodate' if it would not
+        be converted again in incremental mode, 'todo' otherwise), its path
+        and the path of its new ``*_eyetrack.tsv.gz`` file.
+
+        Parameters
+        ----------
+        infoFiles: list
+            A dictionary list for each data file to be BIDSified
+
+        Returns
+        -------
+        report: list
+            A dictionary list for each data file containing its 'status',
+            'source' and 'target' paths
+        '''
+
+        report = []
+
+        for f in infoFiles:
+
+            source = os.path.join(self.path_oldData, f['filepath'],
+                                  f['filename'])
+            new_filepath = self.create_filepath(infoFile=f,
+                                                path=self.path_newData,
+                                                create=False)
+            new_filename = self.create_filename(infoFile=f)
+            target = os.path.join(new_filepath,
+                                  new_filename+'_eyetrack.tsv.gz')
+
+            if not all(os.path.isfile(x) for x in self.source_files(f)):
+                status = 'missing'
+            elif self.incremental and self.is_uptodate(f, new_filename,
+                                                       new_filepath):
+                status = 'uptodate'
+            else:
+                status = 'todo'
+
+            print(status, source, '->', target)
+            report.append(dict(status=status, source=source, target=target))
+
+        return report
+
+    def save_shard(self, shard, infoFiles, indices, sidecars):
+
+        '''
+        Save the results of a shard needed by the finalize step: the
+        participant information of its lines of infoFiles and the sidecar
+        files kept with the inheritance principle
+
+        Parameters
+        ----------
+        shard: tuple
+            ``(i, N)``: index of the shard and number of shards
+        infoFiles: list
+            A dictionary list for each line of the information file
+        indices: list
+            Indices of the lines of infoFiles of the shard
+        sidecars: list
+            Sidecar files kept for each line of the shard (see
+            :meth:`create_Files`)
+        '''
+
+        list_settings = self.infos['participant']
+        if 'participant_id' not in list_settings:
+            list_settings = list_settings+['participant_id']
+
+        participants = []
+        for k in indices:
+            participants.append([k, {s: infoFiles[k][s]
+                                     for s in list_settings}])
+
+        # paths relative to the new BIDS data directory
+        sidecars_shard = []
+        for k, s_file in zip(indices, sidecars):
+            for data, filename, filepath in s_file:
+                sidecars_shard.append([k, data, filename,
+                                       os.path.relpath(filepath,
+                                                       self.path_newData)])
+
+        dirpath = os.path.join(self.path_newData, SHARDS_DIRECTORY)
+        os.makedirs(dirpath, exist_ok=True)
+
+        save_file({'shard': list(shard), 'participants': participants,
+                   'sidecars': sidecars_shard},
+                  'shard-%d-of-%d.json'%tuple(shard), dirpath,
+                  fsync=self.fsync)
+
+    def finalize_shards(self):
+
+        '''
+        Merge the results of the shards saved by :meth:`save_shard`, in the
+        order of infoFiles
+
+        Returns
+        -------
+        infoFiles, sidecars: list, list
+            ``infoFiles`` are the participant information of each line of
+            the information file, ``sidecars`` the sidecar files kept with
+            the inheritance principle
+        '''
+
+        dirpath = os.path.join(self.path_newData, SHARDS_DIRECTORY)
+        if not os.path.isdir(dirpath):
+            raise ValueError("Directory '%s' does not exist"%dirpath)
+
+        shards = [open_file(f, dirpath) for f in sorted(os.listdir(dirpath))
+                  if f.startswith('shard-') and f.endswith('.json')]
+
+        # check that all the shards are done
+        n = set(s['shard'][1] for s in shards)
+        done = set(s['shard'][0] for s in shards)
+        if len(n)!=1 or done!=set(range(n.pop())):
+            raise ValueError("Missing shards in '%s', shards done: %s"%(
+                             dirpath, sorted(done)))
+
+        participants, sidecars = [], []
+        for s in shards:
+            participants += s['participants']
+            sidecars += s['sidecars']
+
+        participants.sort(key=lambda p: p[0])
+        sidecars.sort(key=lambda s: s[0])
+
+        infoFiles = [p[1] for p in participants]
+        sidecars = [(data, filename, os.path.join(self.path_newData, path))
+                    for _, data, filename, path in sidecars]
+
+        return infoFiles, sidecars
+
+    def create_filepath(self, infoFile, path, create=True):
 
         '''
         Creation of the directory that will contain the data to be BIDSified if
@@ -158,6 +653,8 @@ class DataStandardisation:
             Dictionary containing the information on the data to be BIDSified
         path: str
             Path of the new BIDS data directory
+        create: bool (default True)
+            If False, the directory is not created
 
         Returns
         -------
@@ -172,8 +669,8 @@ class DataStandardisation:
         filepath = os.path.join(filepath, 'eyetrack')
 
         # Creation of the directory if not exist
-        if not os.path.isdir(filepath):
-            os.makedirs(filepath)
+        if create:
+            os.makedirs(filepath, exist_ok=True)
 
         return filepath
 
@@ -239,24 +736,16 @@ class DataStandardisation:
             List of settings to be extracted
         '''
 
-        settings = self.process.settings_init()
-
-        # Extract settings in asc files
-        if self.process_ET:
-            settings = self.process_ET.extract_settings_ascFile(filename,
-                                                                filepath,
-                                                                settings)
+        # Extract settings in data files (asc files)
+        extract = None
+        if 'settings' in self.process_ET.capabilities:
+            def extract(settings):
+                self.process_ET.extract_settings(filename, filepath, settings)
 
-        # Extract settings in json files
-        if settingsfilename:
-            settings = self.process.extract_settings_jsonFile(settingsfilename,
-                                                              settings)
-
-        # Extract settings in tsv files
-        settings = self.process.extract_settings_infoFiles(filename,
-                                                           infofilesname,
-                                                           list_settings,
-                                                           settings)
+        # Extract settings in json files and tsv files, which are loaded once
+        settings = self.process.resolve_settings(filename, settingsfilename,
+                                                 infofilesname, list_settings,
+                                                 extract)
 
         # Check that all the required settings are filled
         self.process.check_required_settings(settings)
@@ -264,7 +753,8 @@ class DataStandardisation:
         self.settings = settings
 
         # save settings
-        save_file(self.settings, new_filename+'_eyetrack.json', new_filepath)
+        self.save_sidecar(self.settings, new_filename+'_eyetrack.json',
+                          new_filepath)
 
 
     def create_DataFile(self, filename, filepath, new_filename, new_filepath):
@@ -287,22 +777,104 @@ class DataStandardisation:
         new_filename = new_filename+'_eyetrack'
 
         # save file .asc
-        if self.eyetracktype=='Eyelink':
-            import shutil
-            shutil.copy2(os.path.join(filepath, filename),
-                         os.path.join(new_filepath, new_filename+'.asc'))
+        if 'sourcefile' in self.process_ET.capabilities:
+            copy_file(os.path.join(filepath, filename), new_filename+'.asc',
+                      new_filepath, fsync=self.fsync)
+
+        index = None
+        if 'indexable' in self.process_ET.capabilities:
+            index = self.process_ET.timestamp
+
+        # the samples are streamed to the tsv.gz file when they are only
+        #  saved in this file
+        if 'chunkable' in self.process_ET.capabilities and \
+           not self.output_formats and not (self.summary and index) and \
+           not self.masks:
+            chunks = self.process_ET.iter_samples(filename, filepath)
+            save_chunks((columns for line_formats, columns in chunks),
+                        new_filename+'.tsv.gz', new_filepath,
+                        fsync=self.fsync, compresslevel=self.compresslevel,
+                        index=index, precision=self.precision)
+            self.samples = None
+            return
+
+        # Extract data in data file pour convertir les données en tsv
+        line_formats, columns = self.process_ET.extract_samples(filename,
+                                                                filepath)
+
+        # the samples extracted as strings (the fields of the tsv and csv
+        #  files) are copied as they are in the tsv.gz file, the other
+        #  formats and the processes use their values, typed over the whole
+        #  columns
+        typed, dtypes = columns, None
+        if any(c.dtype.kind=='U' for c in columns.values()):
+            typed = {k: to_typed(c)[0] if c.dtype.kind=='U' else c
+                     for k, c in columns.items()}
+            dtypes = {k: c.dtype for k, c in typed.items()}
+
+        # flags of the samples, kept with the samples in the buffer of a
+        #  recording and saved as a column of the data files
+        if self.masks:
+            flags = self.extract_sampleFlags(filename, filepath, typed, index)
+            if isinstance(typed, Recording):
+                typed = typed.add_columns({FLAGS_COLUMN: flags})
+            else:
+                typed = Recording.from_columns(dict(typed,
+                                                    **{FLAGS_COLUMN: flags}))
+            if dtypes:
+                columns = dict(columns)
+                columns[FLAGS_COLUMN] = flags
+                dtypes = dict(dtypes)
+                dtypes[FLAGS_COLUMN] = flags.dtype
+            else:
+                columns = typed
+
+        self.samples = typed
+
+        # save data
+        for fileformat in ['tsv.gz']+self.output_formats:
+            save_columns(columns if fileformat=='tsv.gz' else typed,
+                         new_filename+'.'+fileformat, new_filepath,
+                         fsync=self.fsync, compresslevel=self.compresslevel,
+                         index=index, precision=self.precision,
+                         dtypes=dtypes)
+
+    def extract_sampleFlags(self, filename, filepath, columns, timestamp):
 
-        else:
-            fileformat = filename.split('.')[-1]
-            for fileformat in ['tsv', 'csv']:
-                data = open_file(filename, filepath)
-                save_file(data, new_filename+'.tsv.gz', new_filepath)
+        '''
+        Flags of the samples of a data file (see :func:`Masks.sample_flags`)
+
+        The blinks are the eye movement events of the data file, they are
+        extracted if the eye movement events file was not created.
 
-        # Extract data in asc file pour convertir les données en tsv
-        if self.process_ET:
-            data = self.process_ET.extract_data_ascFile(filename, filepath)
-            # save data
-            save_file(data, new_filename+'.tsv.gz', new_filepath)
+        Parameters
+        ----------
+        filename: str
+            Name of the data file to be BIDSified
+        filepath: str
+            Path of the data file to be BIDSified
+        columns: dict
+            Dictionary ``{name: array}`` of the columns of the samples
+        timestamp: str or None
+            Name of the column of the timestamps of the samples
+
+        Returns
+        -------
+        flags: numpy.ndarray
+            Flags of the samples (uint8)
+        '''
+
+        blinks = self.eyeMovements
+        if blinks is None and timestamp and \
+           'eyeMovementEvents' in self.process_ET.capabilities:
+            blinks = self.process_ET.extract_eyeMovementEvents(filename,
+                                                               filepath)
+
+        ScreenResolution = None
+        if self.settings:
+            ScreenResolution = self.settings.get('ScreenResolution')
+
+        return sample_flags(columns, timestamp, blinks, ScreenResolution)
 
     def create_EventsFile(self, filename, eventsfilename, filepath,
                           settingsEventsfilename, new_filename, new_filepath):
@@ -327,12 +899,53 @@ class DataStandardisation:
             New path of the events file to be BIDSified
         '''
 
+        events, settingsEvents = self.extract_Events(filename, eventsfilename,
+                                                     filepath,
+                                                     settingsEventsfilename)
+
+        self.events = events
+
+        # save events
+        if events!=[]:
+            save_file(events, new_filename+'_events.tsv', new_filepath,
+                      fsync=self.fsync)
+        if settingsEvents!={}:
+            self.save_sidecar(settingsEvents, new_filename+'_events.json',
+                              new_filepath)
+
+    def extract_Events(self, filename, eventsfilename, filepath,
+                       settingsEventsfilename):
+
+        '''
+        Extraction of the events of a data file and of their settings
+
+        Parameters
+        ----------
+        filename: str
+            Name of the data file to be BIDSified
+        eventsfilename: str
+            Name of the events file to be BIDSified
+        filepath: str
+            Path of the data file to be BIDSified
+        settingsEventsfilename: str
+            Name of the file containing the events settings in the BIDSified
+            data
+
+        Returns
+        -------
+        events, settingsEvents: list, dict
+            ``events`` is a dictionary list for each trial containing the
+            events of those trials.
+            ``settingsEvents`` is a dictionary containing the settings for the
+            events in the experiment
+        '''
+
         events = self.process.events_init()
         settingsEvents = {}
 
-        # Extract Events in asc files
-        if self.process_ET:
-            events, settingsEvents = self.process_ET.extract_events_ascFile(
+        # Extract Events in data files (asc files)
+        if 'events' in self.process_ET.capabilities:
+            events, settingsEvents = self.process_ET.extract_events(
                                                             filename, filepath,
                                                             self.saved_events,
                                                             self.settings,
@@ -347,15 +960,209 @@ class DataStandardisation:
                                                         settingsEventsfilename,
                                                         settingsEvents)
 
-        # save events
-        if events!=[]:
-            save_file(events, new_filename+'_events.tsv', new_filepath)
-        if settingsEvents!={}:
-            save_file(settingsEvents, new_filename+'_events.json',
-                      new_filepath)
+        return events, settingsEvents
+
+
+    def create_EyeMovementEventsFile(self, filename, filepath, new_filename,
+                                     new_filepath):
+
+        '''
+        Creation of a table of the eye movement events
+
+        Parameters
+        ----------
+        filename: str
+            Name of the data file to be BIDSified
+        filepath: str
+            Path of the data file to be BIDSified
+        new_filename: str
+            New name of the eye movement events file
+        new_filepath: str
+            New path of the eye movement events file
+        '''
+
+        # Extract eye movement events in data files (asc files)
+        columns = self.process_ET.extract_eyeMovementEvents(filename,
+                                                            filepath)
+        self.eyeMovements = columns
+
+        # save eye movement events
+        if columns is not None:
+            save_columns(columns, new_filename+'_eyemovements.tsv.gz',
+                         new_filepath, fsync=self.fsync,
+                         compresslevel=self.compresslevel, index='start',
+                         precision=self.precision)
+
+    def create_SummaryFile(self, infoFile, path, new_filename):
+
+        '''
+        Creation of a derivative file of summary statistics of each trial,
+        computed from the samples and events of the data file that has just
+        been BIDSified
+
+        Parameters
+        ----------
+        infoFile: dict
+            Dictionary containing the information on the data BIDSified
+        path: str
+            Path of the new BIDS data directory
+        new_filename: str
+            New name of the data file BIDSified
+        '''
+
+        # the trials are found from the timestamps of the samples
+        if 'indexable' not in self.process_ET.capabilities:
+            return
+        if not self.samples or not self.events:
+            return
+
+        summary = self.process.extract_summaryTrials(self.samples,
+                                                     self.events,
+                                                     self.process_ET.timestamp)
+        if not summary:
+            return
+
+        path_derivatives = os.path.join(path, 'derivatives', 'summary')
+
+        # description of the derivative dataset
+        os.makedirs(path_derivatives, exist_ok=True)
+        if not os.path.isfile(os.path.join(path_derivatives,
+                                           'dataset_description.json')):
+            dataset_description = self.process.dataset_description_init()
+            dataset_description['Name'] = "Summary statistics of the trials"
+            dataset_description['DatasetType'] = "derivative"
+            dataset_description['GeneratedBy'] = [
+                                    {"Name": "BIDSification_eyetrackingData"}]
+            save_file(dataset_description, 'dataset_description.json',
+                      path_derivatives, fsync=self.fsync)
+
+        new_filepath = self.create_filepath(infoFile=infoFile,
+                                            path=path_derivatives)
+
+        # save summary
+        save_file(summary, new_filename+'_desc-summary_eyetrack.tsv',
+                  new_filepath, fsync=self.fsync)
+
+    def save_sidecar(self, data, filename, filepath):
+
+        '''
+        Save a sidecar json file, or keep it to be saved at the end with the
+        inheritance principle (see :meth:`create_InheritedSidecars`)
+
+        Parameters
+        ----------
+        data: dict
+            Content of the sidecar file
+        filename: str
+            Name of the sidecar file
+        filepath: str
+            Path of the sidecar file
+        '''
+
+        if self.inheritance:
+            self.sidecars.append((data, filename, filepath))
+        else:
+            save_file(data, filename, filepath, fsync=self.fsync)
+
+    def create_InheritedSidecars(self, path):
+
+        '''
+        Creation of the sidecar files kept by :meth:`save_sidecar` following
+        the BIDS inheritance principle
+
+        For each suffix ('eyetrack', 'events'), the fields with the same value
+        in all the recordings are saved in a ``[task-<label>_]<suffix>.json``
+        file at the root of the dataset, the fields with the same value in
+        all the recordings of a subject in a
+        ``sub-<label>/sub-<label>[_task-<label>]_<suffix>.json`` file, and
+        the other fields in the sidecar file of each recording. The files
+        with no field left are not saved (and are removed if a previous
+        conversion saved them).
+
+        Parameters
+        ----------
+        path: str
+            Path of the new BIDS data directory
+        '''
+
+        def key(v):
+            return json.dumps(v, sort_keys=True)
+
+        def common_fields(datas):
+            # fields of the first data with the same value in all the datas
+            common = {}
+            for k, v in datas[0].items():
+                if all(k in d and key(d[k])==key(v) for d in datas[1:]):
+                    common[k] = v
+            return common
+
+        def prefix(entities):
+            # task shared by the sidecar files
+            tasks = set(e.get('task') for e in entities)
+            if len(tasks)==1 and None not in tasks:
+                return 'task-'+tasks.pop()+'_'
+            return ''
+
+        def save(data, filename, filepath):
+            # the file of a previous conversion is removed if it has no field
+            #  left
+            if data:
+                save_file(data, filename, filepath, fsync=self.fsync)
+            elif os.path.isfile(os.path.join(filepath, filename)):
+                os.remove(os.path.join(filepath, filename))
+
+        sidecars = {}
+        for data, filename, filepath in self.sidecars:
+            name, suffix = filename[:-len('.json')].rsplit('_', 1)
+            entities = dict(e.split('-', 1) for e in name.split('_'))
+            sidecars.setdefault(suffix, []).append((entities, data, filename,
+                                                    filepath))
+
+        for suffix, files in sidecars.items():
+
+            inherited = {}
+
+            # dataset level
+            #------------------------------------------------------------------
+            common = {}
+            if len(files)>1:
+                common = common_fields([f[1] for f in files])
+            save(common, prefix([f[0] for f in files])+suffix+'.json', path)
+            if common:
+                for f in files:
+                    inherited[f[2]] = dict(common)
+
+            # subject level
+            #------------------------------------------------------------------
+            subjects = {}
+            for f in files:
+                subjects.setdefault(f[0]['sub'], []).append(f)
+
+            for sub, files_sub in subjects.items():
+                common = {}
+                if len(files_sub)>1:
+                    common = common_fields([f[1] for f in files_sub])
+                dataset = inherited.get(files_sub[0][2], {})
+                common = {k: v for k, v in common.items()
+                          if k not in dataset or key(dataset[k])!=key(v)}
+                name = 'sub-'+sub+'_'+prefix([f[0] for f in files_sub])
+                save(common, name+suffix+'.json',
+                     os.path.join(path, 'sub-'+sub))
+                for f in files_sub:
+                    inherited.setdefault(f[2], {}).update(common)
+
+            # file level
+            #------------------------------------------------------------------
+            for entities, data, filename, filepath in files:
+                parent = inherited.get(filename, {})
+                data = {k: v for k, v in data.items()
+                        if k not in parent or key(parent[k])!=key(v)}
+                save(data, filename, filepath)
 
+        self.sidecars = []
 
-    def create_InfoParticipantsFile(self, infofilesname, list_settings, path):
+    def create_InfoParticipantsFile(self, infofilesname, list_settings, path,
+                                    infoFiles=None):
 
         '''
         Creation of an information file on participants
@@ -369,6 +1176,9 @@ class DataStandardisation:
             List of settings to be extracted
         path: str
             Path of the new BIDS dara directory
+        infoFiles: list or None (default None)
+            A dictionary list for each line of the information file, read
+            from ``infofilesname`` if None
         '''
 
         # creation of file name
@@ -379,12 +1189,13 @@ class DataStandardisation:
 
         # extract info participants in infoFiles
         file_tsv = self.process.extract_infoParticipants(infofilesname,
-                                                            list_settings)
+                                                         list_settings,
+                                                         infoFiles)
         # save participant.tsv
-        save_file(file_tsv, filename+'.tsv', path)
+        save_file(file_tsv, filename+'.tsv', path, fsync=self.fsync)
 
         file_json = {}
         for k in list_settings:
             file_json[k] = {"Description": None}
         # save participant.json
-        save_file(file_json, filename+'.json', path)
+        save_file(file_json, filename+'.json', path, fsync=self.fsync)
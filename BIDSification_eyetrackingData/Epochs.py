@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+
+def event_onsets(events, event):
+
+    '''
+    Timestamps of an event in each trial
+
+    Parameters
+    ----------
+    events: list
+        A dictionary list for each trial containing the events of those
+        trials, as returned by ``extract_events_ascFile`` or read from an
+        ``*_events.tsv`` file
+    event: str
+        Name of the event (for example 'sample' for the start of the trials,
+        or one of the ``saved_events``)
+
+    Returns
+    -------
+    onsets: numpy.ndarray
+        Timestamp of the first occurrence of the event in each trial, NaN for
+        the trials where the event is missing
+    '''
+
+    onsets = np.full(len(events), np.nan)
+
+    for n, e in enumerate(events):
+
+        t = e.get(event)
+
+        # events read from the tsv files are strings, possibly lists
+        if isinstance(t, str):
+            t = t.strip('"[] ').split(',')[0]
+            try: t = float(t)
+            except ValueError: t = None
+
+        if isinstance(t, (list, tuple)):
+            t = t[0] if t else None
+
+        if t is not None:
+            onsets[n] = t
+
+    return onsets
+
+def epoch_data(timestamps, columns, onsets, tmin, tmax, step=None):
+
+    '''
+    Cut the samples in epochs aligned on the given onsets
+
+    The samples of each epoch are taken on a regular grid
+    ``onset + tmin, onset + tmin + step, ..., onset + tmax``, each point
+    takes the value of the nearest sample. The points of the grid without a
+    sample at less than half a sampling interval (before the start or after
+    the end of the recording, gaps in the recording, missing onsets) are
+    NaN.
+
+    Parameters
+    ----------
+    timestamps: numpy.ndarray
+        Sorted timestamps of the samples
+    columns: dict
+        Dictionary ``{name: array}`` of the channels to be epoched, of the
+        same length as ``timestamps``
+    onsets: numpy.ndarray
+        Timestamps on which the epochs are aligned (one per trial)
+    tmin: float
+        Start of the epochs relative to the onsets, in the unit of the
+        timestamps (for example -100 for 100 ms before the onsets of an
+        Eyelink recording)
+    tmax: float
+        End of the epochs relative to the onsets (included)
+    step: float or None (default None)
+        Interval between two points of the epochs, by default the median
+        interval between two samples
+
+    Returns
+    -------
+    epochs, times, channels: numpy.ndarray, numpy.ndarray, list
+        ``epochs`` is an array of shape (trials, times, channels).
+        ``times`` the times of the points of the epochs relative to the
+        onsets, ``channels`` the names of the channels
+    '''
+
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    onsets = np.asarray(onsets, dtype=np.float64)
+    channels = list(columns.keys())
+
+    # sampling interval
+    interval = np.median(np.diff(timestamps)) if len(timestamps)>1 else 1
+    if step is None:
+        step = interval
+
+    times = np.arange(round((tmax-tmin)/step)+1)*step + tmin
+
+    # timestamps of the points of all the epochs (trials, times)
+    targets = onsets[:, None] + times[None, :]
+
+    epochs = np.full(targets.shape+(len(channels),), np.nan)
+    if len(timestamps)==0:
+        return epochs, times, channels
+
+    # index of the sample nearest to each point, the points without a sample
+    #  at less than half a sampling interval are padded with NaN
+    idx = np.searchsorted(timestamps, targets)
+    before = np.maximum(idx-1, 0)
+    idx = np.minimum(idx, len(timestamps)-1)
+    closer = np.abs(timestamps[before]-targets)< \
+             np.abs(timestamps[idx]-targets)
+    idx = np.where(closer, before, idx)
+    valid = np.abs(timestamps[idx]-targets)<=interval/2
+
+    for c, k in enumerate(channels):
+        values = np.asarray(columns[k], dtype=np.float64)
+        epochs[..., c] = np.where(valid, values[idx], np.nan)
+
+    return epochs, times, channels
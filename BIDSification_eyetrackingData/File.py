@@ -2,9 +2,29 @@
 # -*- coding: utf-8 -*-
 
 import os
+import io
 import json
 import csv
 import gzip
+import itertools
+import shutil
+import struct
+import tempfile
+import zlib
+from contextlib import contextmanager, suppress
+import numpy as np
+
+# size of the write buffers used for the output files
+BUFFER_SIZE = 1024*1024
+# number of rows of the blocks of the .tsv.gz files
+BLOCK_SIZE = 8192
+# file of the names of the columns, in their order, of the .npy directories
+NPY_COLUMNS = 'columns.json'
+
+# umask of the process, read once: it can only be read by setting it, which
+#  is not thread-safe
+UMASK = os.umask(0)
+os.umask(UMASK)
 
 def dirtree(dirpath):
 
@@ -38,7 +58,7 @@ def dirtree(dirpath):
 def open_file(filename, filepath):
 
     '''
-    Open the files json, tsv or asc
+    Open the files json, tsv, tsv.gz or asc
 
     Parameters
     ----------
@@ -56,15 +76,22 @@ def open_file(filename, filepath):
     # file format
     fileformat = filename.split('.')[-1]
 
-    if fileformat in ['json', 'tsv', 'csv', 'asc']:
+    if fileformat in ['json', 'tsv', 'csv', 'asc', 'gz']:
 
         if filepath:
             filename = os.path.join(filepath, filename)
 
-        f = open(filename, 'r')
+        if fileformat=='gz':
+            f = gzip.open(filename, 'rt')
+        else:
+            f = open(filename, 'r')
+
+        # open file .tsv.gz
+        if fileformat=='gz':
+            file_ = list(csv.DictReader(f, delimiter=" "))
 
         # open file .json
-        if fileformat=='json':
+        elif fileformat=='json':
             file_ = json.load(f)
 
         # open file .tsv, .csv
@@ -83,10 +110,296 @@ def open_file(filename, filepath):
     else:
         return None
 
-def save_file(data, filename, filepath):
+@contextmanager
+def atomic_open(filename, filepath=None, mode='w', fsync=False,
+                compresslevel=None):
+
+    '''
+    Open an output file that is written with large buffers to a temporary
+    file in the same directory and atomically renamed to ``filename`` when it
+    is closed without error. If an error occurs, the temporary file is removed
+    and any previous ``filename`` is left untouched.
+
+    Parameters
+    ----------
+    filename: str
+        Name of the file
+    filepath: str or None (default None)
+        Path of the file
+    mode: str (default 'w')
+        'w' to write text, 'wb' to write bytes
+    fsync: bool (default False)
+        If True, the file and its directory are synchronised to disk before
+        returning
+    compresslevel: int or None (default None)
+        If not None, the file is compressed in gzip format with this
+        compression level
+
+    Yields
+    ------
+    file
+        File object to write to
+    '''
+
+    if filepath:
+        filename = os.path.join(filepath, filename)
+    dirname = os.path.dirname(os.path.abspath(filename))
+    basename = os.path.basename(filename)
+
+    fd, tmpname = tempfile.mkstemp(prefix='.'+basename+'.', suffix='.tmp',
+                                   dir=dirname)
+    raw = os.fdopen(fd, 'wb', buffering=BUFFER_SIZE)
+    f = raw
+    gz = None
+    try:
+        if compresslevel is not None:
+            gz = gzip.GzipFile(filename=basename[:-3], mode='wb', fileobj=raw,
+                               compresslevel=compresslevel)
+            f = io.BufferedWriter(gz, buffer_size=BUFFER_SIZE)
+        if 'b' not in mode:
+            f = io.TextIOWrapper(f, write_through=False)
+
+        yield f
+
+        # closes the wrappers (flush their buffers into raw) without
+        #  closing raw
+        if f is not raw:
+            f.flush()
+            if 'b' not in mode:
+                f.detach()
+            if gz:
+                gz.close()
+        raw.flush()
+        if fsync:
+            os.fsync(raw.fileno())
+        raw.close()
+
+        # same permissions as a file created by open()
+        os.chmod(tmpname, 0o666 & ~UMASK)
+
+        os.replace(tmpname, filename)
+
+        if fsync:
+            dirfd = os.open(dirname, os.O_RDONLY)
+            try:
+                os.fsync(dirfd)
+            finally:
+                os.close(dirfd)
+
+    except BaseException:
+        # the wrappers are closed from the outermost one, before raw, so
+        #  they do not flush into a closed (or reused) file descriptor when
+        #  they are garbage collected
+        for wrapper in [f, gz, raw]:
+            if wrapper is not None:
+                with suppress(Exception):
+                    wrapper.close()
+        if os.path.exists(tmpname):
+            os.remove(tmpname)
+        raise
+
+def to_float(values):
+
+    '''
+    Convert an array of strings to floats, the values that are not numbers
+    (for example '.' for the missing data in Eyelink recordings, or the empty
+    fields of the tsv files) are NaN
+
+    Parameters
+    ----------
+    values: numpy.ndarray
+        Array of strings
+
+    Returns
+    -------
+    values: numpy.ndarray
+        Array of floats
+    '''
+
+    try:
+        return values.astype(np.float64)
+    except ValueError:
+        pass
+
+    values = np.char.strip(values)
+    values = np.where(np.isin(values, ['', '.']), 'nan', values)
+
+    try:
+        return values.astype(np.float64)
+    except ValueError:
+        pass
+
+    # slow path for the other values that are not numbers
+    def float_or_nan(v):
+        try: return float(v)
+        except ValueError: return np.nan
+
+    return np.array([float_or_nan(v) for v in values.ravel()],
+                    dtype=np.float64).reshape(values.shape)
+
+# values of the missing data in the tsv and csv files
+MISSING_VALUES = ['', '.', 'NA', 'NaN', 'nan']
+
+def to_typed(values, kind='i'):
+
+    '''
+    Convert an array of strings to the narrowest type among integers ('i'),
+    floats ('f', the missing values are NaN) and strings ('U')
+
+    Parameters
+    ----------
+    values: numpy.ndarray
+        Array of strings
+    kind: str (default 'i')
+        Narrowest type tried, so that the chunks of a column are never
+        narrower than the previous ones
+
+    Returns
+    -------
+    values, kind: numpy.ndarray, str
+        The converted array and its type
+    '''
+
+    if kind=='i':
+        try:
+            return values.astype(np.int64), 'i'
+        except (ValueError, OverflowError):
+            kind = 'f'
+
+    if kind=='f':
+        stripped = np.char.strip(values)
+        stripped = np.where(np.isin(stripped, MISSING_VALUES), 'nan',
+                            stripped)
+        try:
+            return stripped.astype(np.float64), 'f'
+        except ValueError:
+            kind = 'U'
+
+    return values, 'U'
+
+def to_dtype(values, dtype=None):
+
+    '''
+    Convert an array of strings (the fields of a column of a tsv file) to a
+    type
+
+    Parameters
+    ----------
+    values: numpy.ndarray
+        Array of strings
+    dtype: numpy.dtype, str or None (default None)
+        Type of the column. The integer columns with missing values are
+        converted to floats (NaN), the string columns are kept as they are.
+        If None, the column is converted to floats if all its values are
+        numbers or missing values, otherwise it is kept as strings
 
+    Returns
+    -------
+    values: numpy.ndarray
+        The converted array
     '''
-    Save the data in files json or tsv
+
+    if dtype is None:
+        return to_typed(values, 'f')[0]
+
+    dtype = np.dtype(dtype)
+
+    if dtype.kind in 'iu':
+        try:
+            return values.astype(dtype)
+        except (ValueError, OverflowError):
+            return to_typed(values, 'f')[0]
+
+    if dtype.kind=='f':
+        return to_typed(values, 'f')[0].astype(dtype, copy=False)
+
+    if dtype.kind=='b':
+        return values=='True'
+
+    return values
+
+def sniff_delimiter(sample, default=' '):
+
+    '''
+    Find the delimiter of a tsv or csv file among tabulation, comma,
+    semicolon and space
+
+    Parameters
+    ----------
+    sample: str
+        First lines of the file
+    default: str (default ' ')
+        Delimiter if none is found
+
+    Returns
+    -------
+    delimiter: str
+    '''
+
+    try:
+        return csv.Sniffer().sniff(sample, delimiters='\t,; ').delimiter
+    except csv.Error:
+        return default
+
+def read_chunks(filename, filepath, chunksize=BLOCK_SIZE, delimiter=None):
+
+    '''
+    Read a file tsv, csv, tsv.gz or csv.gz by chunks of columns
+
+    The delimiter is sniffed from the start of the file. The fields are kept
+    as they are written in the file (strings, see :func:`to_typed` for their
+    types). The lines shorter than the header are padded with empty fields,
+    the extra fields are ignored.
+
+    Parameters
+    ----------
+    filename: str
+        Name of the file
+    filepath: str
+        Path of the file
+    chunksize: int (default BLOCK_SIZE)
+        Number of rows per chunk
+    delimiter: str or None (default None)
+        Delimiter of the file, sniffed if None
+
+    Yields
+    ------
+    columns: dict
+        Dictionary ``{name: array}`` of the columns of a chunk of rows
+    '''
+
+    if filepath:
+        filename = os.path.join(filepath, filename)
+
+    opener = gzip.open if filename.endswith('.gz') else open
+
+    with opener(filename, 'rt', newline='') as f:
+
+        if delimiter is None:
+            delimiter = sniff_delimiter(f.read(64*1024))
+            f.seek(0)
+
+        reader = csv.reader(f, delimiter=delimiter)
+        names = next(reader, None)
+        if not names:
+            return
+
+        n = len(names)
+
+        while True:
+            rows = list(itertools.islice(reader, chunksize))
+            if not rows:
+                break
+
+            rows = [r if len(r)==n else (r+['']*n)[:n] for r in rows]
+            values = np.array(rows, dtype=str).reshape(len(rows), n)
+
+            yield {k: values[:, i] for i, k in enumerate(names)}
+
+def save_file(data, filename, filepath, fsync=False, compresslevel=9):
+
+    '''
+    Save the data in files json, tsv or tsv.gz
 
     Parameters
     ----------
@@ -96,33 +409,436 @@ def save_file(data, filename, filepath):
         Name of the file
     filepath: str (default None)
         Path of the file
+    fsync: bool (default False)
+        If True, the file is synchronised to disk before returning
+    compresslevel: int (default 9)
+        Compression level of the .gz files
     '''
 
     # file format
     fileformat = filename.split('.')[-1]
-    if fileformat in ['json', 'tsv']:
+    if fileformat in ['json', 'tsv', 'gz']:
 
-        filename = os.path.join(filepath, filename)
-        f = open(filename, 'w')
+        if fileformat!='gz':
+            compresslevel = None
 
-        # save file .json
-        if fileformat=='json':
-            json.dump(data, f, indent=4)
+        with atomic_open(filename, filepath, fsync=fsync,
+                         compresslevel=compresslevel) as f:
 
-        # save file .tsv
-        elif fileformat=='tsv':
-            file_ = csv.DictWriter(f, fieldnames=data[0].keys(), delimiter=' ')
-            file_.writeheader()
-            file_.writerows(data)
+            # save file .json
+            if fileformat=='json':
+                json.dump(data, f, indent=4)
 
-        f.close()
+            # save file .tsv, .tsv.gz
+            else:
+                file_ = csv.DictWriter(f, fieldnames=data[0].keys(),
+                                       delimiter=' ')
+                file_.writeheader()
+                file_.writerows(data)
+
+def save_columns(columns, filename, filepath, fsync=False, compresslevel=9,
+                 index=None, precision=None, dtypes=None):
+
+    '''
+    Save a table of columns in files tsv, tsv.gz, npy or parquet
+
+    The .tsv.gz files are written as a series of independent gzip members of
+    :data:`BLOCK_SIZE` rows, followed by an index of these blocks embedded in
+    the file (see :func:`read_gz_index`), so that a range of rows or of
+    timestamps can be read without decompressing the whole file. They remain
+    standard gzip files.
+
+    With the .npy format, ``filename`` is a directory containing one .npy
+    file per column that can be loaded (or memory-mapped) independently,
+    and the names of the columns in their order (:data:`NPY_COLUMNS`).
+    The .parquet format requires the optional ``pyarrow`` package.
+
+    Parameters
+    ----------
+    columns: dict
+        Dictionary ``{name: array}`` of the columns to be saved, all of the
+        same length. The NaN of the float columns are the missing values
+    filename: str
+        Name of the file
+    filepath: str
+        Path of the file
+    fsync: bool (default False)
+        If True, the files are synchronised to disk before returning
+    compresslevel: int (default 9)
+        Compression level of the .gz files
+    index: str or None (default None)
+        Name of the column of the timestamps recorded in the index of the
+        blocks of the .tsv.gz files
+    precision: int or None (default None)
+        Number of decimals of the floats in the .tsv and .tsv.gz files (see
+        :func:`format_lines`)
+    dtypes: dict or None (default None)
+        Types of the columns recorded in the index of the .tsv.gz files (see
+        :func:`save_chunks`)
+    '''
+
+    # file format
+    fileformat = filename.split('.')[-1]
+
+    # save file .tsv, .tsv.gz
+    if fileformat in ['tsv', 'gz']:
+
+        names = list(columns.keys())
+        nrows = len(columns[names[0]]) if names else 0
+
+        def chunks():
+            # the header is given by a first empty chunk
+            yield {k: columns[k][:0] for k in names}
+            for start in range(0, nrows, BLOCK_SIZE):
+                yield {k: columns[k][start:start+BLOCK_SIZE] for k in names}
+
+        save_chunks(chunks(), filename, filepath, fsync=fsync,
+                    compresslevel=compresslevel, index=index,
+                    precision=precision, dtypes=dtypes)
+
+    # save directory of files .npy
+    elif fileformat=='npy':
+
+        dirname = os.path.join(filepath, filename)
+        if not os.path.isdir(dirname):
+            os.makedirs(dirname)
+
+        for k in columns.keys():
+            with atomic_open(k+'.npy', dirname, mode='wb', fsync=fsync) as f:
+                np.save(f, np.ascontiguousarray(columns[k]))
+
+        save_file(list(columns.keys()), NPY_COLUMNS, dirname, fsync=fsync)
+
+    # save file .parquet
+    elif fileformat=='parquet':
+
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError("The 'pyarrow' package is required to save "
+                              "files in parquet format")
+
+        table = pyarrow.table({k: pyarrow.array(columns[k],
+                                                from_pandas=True)
+                               for k in columns.keys()})
+        with atomic_open(filename, filepath, mode='wb', fsync=fsync) as f:
+            pyarrow.parquet.write_table(table, f)
+
+    else:
+        raise ValueError("Unknown file format '%s'"%fileformat)
+
+def format_lines(columns, precision=None):
+
+    '''
+    Format a table of columns as the lines of a tsv file
+
+    The floats are written with their shortest representation in their
+    type (so the single precision floats are written as they were recorded,
+    not with the digits of their double precision value), or with a fixed
+    number of decimals.
+
+    Parameters
+    ----------
+    columns: dict
+        Dictionary ``{name: array}`` of the columns, all of the same length.
+        The NaN of the float columns are the missing values
+    precision: int or None (default None)
+        Number of decimals of the floats, None for their shortest
+        representation
+
+    Returns
+    -------
+    lines: str
+        The lines of the tsv file, without header
+    '''
+
+    values = []
+    for c in columns.values():
+
+        if c.dtype.kind=='f' and (precision is not None or c.dtype.itemsize<8):
+            if precision is None:
+                v = c.astype(str)
+            else:
+                v = np.char.mod('%%.%df'%precision, c)
+            v[np.isnan(c)] = ''
+            values.append(v.tolist())
+            continue
+
+        v = c.tolist()
+        # missing values are written as empty fields
+        if c.dtype.kind=='f':
+            for i in np.flatnonzero(np.isnan(c)):
+                v[i] = ''
+        values.append(v)
+
+    f = io.StringIO()
+    csv.writer(f, delimiter=' ').writerows(zip(*values))
+
+    return f.getvalue()
+
+def save_chunks(chunks, filename, filepath, fsync=False, compresslevel=9,
+                index=None, precision=None, dtypes=None):
+
+    '''
+    Save a table given by chunks of rows in a file tsv or tsv.gz
+
+    The chunks are written as they come, so the whole table is never held in
+    memory. In the .tsv.gz files, each chunk is a gzip member (block) of the
+    index of the file (see :func:`save_columns`).
+
+    Parameters
+    ----------
+    chunks: iterable
+        Dictionaries ``{name: array}`` of the columns of the successive
+        chunks of rows, all with the same names
+    filename: str
+        Name of the file
+    filepath: str
+        Path of the file
+    fsync: bool (default False)
+        If True, the file is synchronised to disk before returning
+    compresslevel: int (default 9)
+        Compression level of the .gz files
+    index: str or None (default None)
+        Name of the column of the timestamps recorded in the index of the
+        blocks of the .tsv.gz files
+    precision: int or None (default None)
+        Number of decimals of the floats (see :func:`format_lines`)
+    dtypes: dict or None (default None)
+        Dictionary ``{name: dtype}`` of the types of the columns recorded in
+        the index of the .tsv.gz files. By default, the types of the arrays
+        of the chunks, except for the arrays of strings (the fields of a tsv
+        or csv file) whose types are settled over all the chunks as they are
+        written (see :func:`to_typed`)
+    '''
+
+    # file format
+    fileformat = filename.split('.')[-1]
+
+    chunks = iter(chunks)
+    first = next(chunks, {})
+    names = list(first.keys())
+
+    # narrowest types of the columns of strings without a given type,
+    #  settled as the chunks are written
+    given = dtypes or {}
+    kinds = {k: 'i' for k in names
+             if k not in given and np.asarray(first[k]).dtype.kind=='U'}
+    dtypes = {k: given.get(k, np.asarray(first[k]).dtype) for k in names}
+
+    header = io.StringIO()
+    csv.writer(header, delimiter=' ').writerow(names)
+    header = header.getvalue()
+
+    if fileformat=='tsv':
+        with atomic_open(filename, filepath, fsync=fsync) as f:
+            f.write(header)
+            for columns in itertools.chain([first], chunks):
+                f.write(format_lines(columns, precision))
 
     elif fileformat=='gz':
+        blocks = dict(row=[], offset=[], length=[], first=[], last=[])
+        nrows = 0
 
-        filename = os.path.join(filepath, filename)
-        f = gzip.open(filename, 'wt')
-        file_ = csv.DictWriter(f, fieldnames=data[0].keys(), delimiter=' ')
-        file_.writeheader()
-        file_.writerows(data)
+        with atomic_open(filename, filepath, mode='wb', fsync=fsync) as f:
 
-        f.close()
+            offset = f.write(gzip.compress(header.encode(), compresslevel,
+                                           mtime=0))
+
+            for columns in itertools.chain([first], chunks):
+
+                n = len(columns[names[0]]) if names else 0
+                if n==0:
+                    continue
+
+                for k, kind in kinds.items():
+                    kinds[k] = to_typed(columns[k], kind)[1]
+
+                member = gzip.compress(
+                            format_lines(columns, precision).encode(),
+                            compresslevel, mtime=0)
+                f.write(member)
+
+                blocks['row'].append(nrows)
+                blocks['offset'].append(offset)
+                blocks['length'].append(len(member))
+                if index:
+                    t = columns[index]
+                    blocks['first'].append(float(np.nanmin(t)))
+                    blocks['last'].append(float(np.nanmax(t)))
+                offset += len(member)
+                nrows += n
+
+            for k, kind in kinds.items():
+                dtypes[k] = {'i': np.int64, 'f': np.float64}.get(kind, str)
+            dtypes = [np.dtype(dtypes[k]).str for k in names]
+
+            gz_index = dict(columns=names, dtypes=dtypes, rows=nrows,
+                            timestamp=index, block_size=BLOCK_SIZE,
+                            blocks=blocks)
+            f.write(gz_index_members(gz_index, offset))
+
+    else:
+        raise ValueError("Unknown file format '%s'"%fileformat)
+
+#------------------------------------------------------------------------------
+# Index of the blocks of the .tsv.gz files
+#------------------------------------------------------------------------------
+# The index is stored in the comment field of an empty gzip member, and the
+#  file ends with an empty gzip member of GZ_FOOTER_SIZE bytes whose extra
+#  field (subfield 'TI') contains the offset of the index member. Both
+#  members are ignored by the gzip readers.
+GZ_FOOTER_SIZE = 34
+
+def gz_empty_member(flags, fields):
+
+    '''
+    Create an empty gzip member
+
+    Parameters
+    ----------
+    flags: int
+        FLG byte of the gzip header
+    fields: bytes
+        Optional fields of the gzip header
+
+    Returns
+    -------
+    member: bytes
+        The gzip member
+    '''
+
+    header = b'\x1f\x8b\x08' + bytes([flags]) + b'\x00'*4 + b'\x00\xff'
+    deflate = zlib.compressobj(9, zlib.DEFLATED, -zlib.MAX_WBITS)
+    data = deflate.compress(b'') + deflate.flush()
+
+    return header + fields + data + struct.pack('<II', 0, 0)
+
+def gz_index_members(gz_index, offset):
+
+    '''
+    Create the gzip members containing the index of the blocks of a .tsv.gz
+    file
+
+    Parameters
+    ----------
+    gz_index: dict
+        Index of the blocks
+    offset: int
+        Position of the index in the file
+
+    Returns
+    -------
+    members: bytes
+        The gzip members to be written at the end of the file
+    '''
+
+    comment = json.dumps(gz_index, separators=(',', ':')).encode('latin-1')
+    index_member = gz_empty_member(0x10, comment + b'\x00')
+
+    extra = b'TI' + struct.pack('<HQ', 8, offset)
+    footer = gz_empty_member(0x04, struct.pack('<H', len(extra)) + extra)
+
+    return index_member + footer
+
+def read_gz_index(filename):
+
+    '''
+    Read the index of the blocks of a .tsv.gz file written by
+    :func:`save_columns`
+
+    Parameters
+    ----------
+    filename: str
+        Full name of the file
+
+    Returns
+    -------
+    gz_index: dict or None
+        ``{'columns': names of the columns, 'dtypes': types of the
+        columns (missing in the files written before they were recorded),
+        'rows': number of rows,
+        'timestamp': name of the column of the timestamps or None,
+        'block_size': number of rows per block,
+        'blocks': {'row': first row of the blocks,
+        'offset': positions of the blocks in the file,
+        'length': sizes of the blocks in the file,
+        'first': first timestamps of the blocks,
+        'last': last timestamps of the blocks}}``,
+        None if the file has no index
+    '''
+
+    with open(filename, 'rb') as f:
+
+        f.seek(0, os.SEEK_END)
+        if f.tell()<GZ_FOOTER_SIZE:
+            return None
+        f.seek(-GZ_FOOTER_SIZE, os.SEEK_END)
+        footer = f.read(GZ_FOOTER_SIZE)
+
+        if footer[:4]!=b'\x1f\x8b\x08\x04' or footer[12:14]!=b'TI':
+            return None
+        offset = struct.unpack('<Q', footer[16:24])[0]
+
+        f.seek(offset)
+        member = f.read(os.fstat(f.fileno()).st_size-offset-GZ_FOOTER_SIZE)
+
+    # the comment of the index member starts after its 10 bytes header
+    if member[:4]!=b'\x1f\x8b\x08\x10':
+        return None
+    comment = member[10:member.index(b'\x00', 10)]
+
+    return json.loads(comment.decode('latin-1'))
+
+def read_gz_blocks(filename, offsets, lengths):
+
+    '''
+    Decompress blocks of a .tsv.gz file written by :func:`save_columns`
+
+    Parameters
+    ----------
+    filename: str
+        Full name of the file
+    offsets: list
+        Positions of the blocks in the file
+    lengths: list
+        Sizes of the blocks in the file
+
+    Returns
+    -------
+    text: str
+        The decompressed lines of the blocks
+    '''
+
+    text = []
+    with open(filename, 'rb') as f:
+        for offset, length in zip(offsets, lengths):
+            f.seek(offset)
+            text.append(gzip.decompress(f.read(length)).decode())
+
+    return ''.join(text)
+
+def copy_file(src, filename, filepath, fsync=False):
+
+    '''
+    Copy the file ``src`` to ``filename`` through :func:`atomic_open` and
+    keep its metadata
+
+    Parameters
+    ----------
+    src: str
+        Path of the file to be copied
+    filename: str
+        Name of the new file
+    filepath: str
+        Path of the new file
+    fsync: bool (default False)
+        If True, the file is synchronised to disk before returning
+    '''
+
+    with open(src, 'rb') as f_src:
+        with atomic_open(filename, filepath, mode='wb', fsync=fsync) as f:
+            shutil.copyfileobj(f_src, f, BUFFER_SIZE)
+
+    shutil.copystat(src, os.path.join(filepath, filename))
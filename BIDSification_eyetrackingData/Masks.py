@@ -0,0 +1,211 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+# bits of the flags of the samples
+TRACKING_LOSS = 1   # a coordinate is missing or a pupil size is 0
+BLINK = 2           # the sample is in a blink (SBLINK to EBLINK)
+OUT_OF_SCREEN = 4   # a gaze position is outside the screen
+
+FLAGS = {'tracking_loss': TRACKING_LOSS,
+         'blink': BLINK,
+         'out_of_screen': OUT_OF_SCREEN}
+
+# name of the column of the flags in the data files
+FLAGS_COLUMN = 'sample_flags'
+
+
+def tracking_loss_mask(columns):
+
+    '''
+    Samples of tracking loss: one of their coordinates is missing (NaN) or
+    one of their pupil sizes is 0 or missing
+
+    Parameters
+    ----------
+    columns: dict
+        Dictionary ``{name: array}`` of the columns of the samples
+
+    Returns
+    -------
+    mask: numpy.ndarray
+        Boolean mask of the samples
+    '''
+
+    mask = None
+    for k, c in columns.items():
+        if k.endswith('_coordinate'):
+            m = np.isnan(c)
+        elif k.endswith('_pupil_size'):
+            m = ~(c>0)
+        else:
+            continue
+        mask = m if mask is None else mask|m
+
+    if mask is None:
+        mask = np.zeros(len(next(iter(columns.values()), [])), dtype=bool)
+
+    return mask
+
+def blink_mask(timestamps, starts, ends):
+
+    '''
+    Samples in a blink
+
+    The blinks of the two eyes may overlap: the samples in any blink are
+    found with a single search in the union of the blinks.
+
+    Parameters
+    ----------
+    timestamps: numpy.ndarray
+        Timestamps of the samples
+    starts: numpy.ndarray
+        Start of each blink (timestamp of its SBLINK line)
+    ends: numpy.ndarray
+        End of each blink (timestamp of its EBLINK line, included)
+
+    Returns
+    -------
+    mask: numpy.ndarray
+        Boolean mask of the samples
+    '''
+
+    timestamps = np.asarray(timestamps)
+    starts = np.asarray(starts, dtype=np.float64)
+    ends = np.asarray(ends, dtype=np.float64)
+
+    valid = ~(np.isnan(starts) | np.isnan(ends))
+    starts, ends = starts[valid], ends[valid]
+    if not len(starts):
+        return np.zeros(len(timestamps), dtype=bool)
+
+    # the blinks sorted by start, with the end of the union of the blinks
+    #  started before each of them
+    order = np.argsort(starts, kind='stable')
+    starts = starts[order]
+    ends = np.maximum.accumulate(ends[order])
+
+    i = np.searchsorted(starts, timestamps, side='right')-1
+    mask = i>=0
+    mask[mask] = timestamps[mask]<=ends[i[mask]]
+
+    return mask
+
+def out_of_screen_mask(columns, ScreenResolution):
+
+    '''
+    Samples whose gaze position is outside the screen
+
+    Parameters
+    ----------
+    columns: dict
+        Dictionary ``{name: array}`` of the columns of the samples, the
+        columns ``*_x_coordinate`` and ``*_y_coordinate`` are the gaze
+        positions in pixels
+    ScreenResolution: list
+        Width and height of the screen in pixels (the positions are from 0
+        to the width or the height excluded)
+
+    Returns
+    -------
+    mask: numpy.ndarray
+        Boolean mask of the samples (the missing positions are not outside
+        the screen)
+    '''
+
+    width, height = (float(x) for x in ScreenResolution)
+
+    mask = None
+    for k, c in columns.items():
+        if k.endswith('_x_coordinate'):
+            m = (c<0) | (c>=width)
+        elif k.endswith('_y_coordinate'):
+            m = (c<0) | (c>=height)
+        else:
+            continue
+        mask = m if mask is None else mask|m
+
+    if mask is None:
+        mask = np.zeros(len(next(iter(columns.values()), [])), dtype=bool)
+
+    return mask
+
+def sample_flags(columns, timestamp='eye_timestamp', blinks=None,
+                 ScreenResolution=None):
+
+    '''
+    Flags of the samples, as a bitmask of one byte per sample
+
+    |---------------------------------------------------------------------|
+    | Bit               | Samples                                         |
+    |-------------------|-------------------------------------------------|
+    | 1 (TRACKING_LOSS) | a coordinate is missing or a pupil size is 0    |
+    | 2 (BLINK)         | in a blink                                      |
+    | 4 (OUT_OF_SCREEN) | a gaze position is outside the screen           |
+    |---------------------------------------------------------------------|
+
+    Parameters
+    ----------
+    columns: dict
+        Dictionary ``{name: array}`` of the columns of the samples
+    timestamp: str (default 'eye_timestamp')
+        Name of the column of the timestamps
+    blinks: dict or None (default None)
+        Dictionary ``{name: array}`` of the eye movement events (see
+        ``extract_eyeMovementEvents``): the rows whose 'event' is 'blink'
+        give the 'start' and 'end' of the blinks. No sample is flagged as
+        in a blink if None
+    ScreenResolution: list or None (default None)
+        Width and height of the screen in pixels, no sample is flagged as
+        outside the screen if None
+
+    Returns
+    -------
+    flags: numpy.ndarray
+        Flags of the samples (uint8)
+    '''
+
+    flags = tracking_loss_mask(columns).astype(np.uint8)
+
+    if blinks is not None and timestamp in columns:
+        blink = np.asarray(blinks['event'])=='blink'
+        mask = blink_mask(columns[timestamp], blinks['start'][blink],
+                          blinks['end'][blink])
+        flags |= mask.astype(np.uint8)*BLINK
+
+    if ScreenResolution:
+        try:
+            mask = out_of_screen_mask(columns, ScreenResolution)
+        except (TypeError, ValueError):
+            # resolution not given as [width, height]
+            pass
+        else:
+            flags |= mask.astype(np.uint8)*OUT_OF_SCREEN
+
+    return flags
+
+def flag_mask(flags, bits):
+
+    '''
+    Samples having one of the given flags
+
+    Parameters
+    ----------
+    flags: numpy.ndarray
+        Flags of the samples (see :func:`sample_flags`), for example the
+        ``sample_flags`` column of a data file
+    bits: int
+        Flags tested, for example ``TRACKING_LOSS | BLINK``
+
+    Returns
+    -------
+    mask: numpy.ndarray
+        Boolean mask of the samples
+    '''
+
+    flags = np.asarray(flags)
+    if flags.dtype.kind not in 'iu':
+        flags = flags.astype(np.uint8)
+
+    return (flags & bits)!=0
@@ -0,0 +1,249 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import numpy as np
+from .AscGrammar import line_key, EYE_MOVEMENT_EVENTS
+from .Trials import pair_trials
+
+
+# kinds of the rows of the table
+MESSAGE = 0         # 'MSG' lines
+EYE_MOVEMENT = 1    # eye movement event lines
+OTHER = 2           # other lines with a timestamp ('INPUT', 'START', ...)
+
+
+class MessageTable:
+
+    '''
+    Table of the messages of an asc file
+
+    The lines of a file that are not samples are extracted in a single pass
+    over its lines: the messages ('MSG' lines), the eye movement event lines
+    ('SFIX', 'EFIX', 'SSACC', 'ESACC', 'SBLINK' and 'EBLINK') and the other
+    lines with a timestamp (for example 'INPUT', 'BUTTON', 'START' or 'END'
+    lines). The table is small compared to the file (a few rows per trial),
+    so the trials and the events of any configuration of ``StartMessage``,
+    ``EndMessage`` and ``saved_events`` are found on the table without
+    reading the file again.
+
+    The texts are dictionary-encoded: each distinct text is stored once in
+    :attr:`texts` and the rows only contain its code, so the search of a
+    substring in the messages only tests the distinct texts.
+
+    |---------------------------------------------------------------------|
+    | Column      | Description                                           |
+    |-------------|-------------------------------------------------------|
+    | timestamp   | timestamp of the row (int64), for the eye movement    |
+    |             |   events the start ('S' lines) or the end ('E' lines) |
+    |             |   of the event                                        |
+    | offset      | index of the line in the file (int64), which orders   |
+    |             |   the rows of the same timestamp                      |
+    | code        | index of the text of the row in ``texts`` (int32)     |
+    | kind        | MESSAGE, EYE_MOVEMENT or OTHER (int8)                 |
+    |---------------------------------------------------------------------|
+
+    The text of a message is the part of the line after its timestamp (for
+    example 'TRIALID 3'), the text of the other rows is their whole line.
+    The timestamp of the other rows is the first word after their first
+    tabulation (as the end of the trials in the first release), the lines
+    without a timestamp (for example the header of the file) are not in
+    the table.
+
+    Parameters
+    ----------
+    lines: list
+        Lines of the asc file
+    '''
+
+    def __init__(self, lines):
+
+        timestamp, offset, code, kind = [], [], [], []
+        codes = {}
+
+        for n, line in enumerate(lines):
+
+            if line[:1].isdigit():
+                continue
+
+            l = line[:-1] if line[-1:]=='\n' else line
+
+            if l[:4]=='MSG\t':
+                # MSG\t<timestamp> <text>
+                t, _, text = l[4:].partition(' ')
+                k = MESSAGE
+            elif line_key(l) in EYE_MOVEMENT_EVENTS:
+                # S<event> <eye> <start>
+                # E<event> <eye> <start> <end> ...
+                words = l.split()
+                if words[0][0]=='S':
+                    t = words[-1]
+                else:
+                    t = words[3] if len(words)>3 else ''
+                text = l
+                k = EYE_MOVEMENT
+            else:
+                # <key>\t<timestamp> ...
+                t = l.partition('\t')[2].split(' ')[0].split('\t')[0]
+                text = l
+                k = OTHER
+
+            try:
+                t = int(t)
+            except ValueError:
+                continue
+
+            timestamp.append(t)
+            offset.append(n)
+            code.append(codes.setdefault(text, len(codes)))
+            kind.append(k)
+
+        self.timestamp = np.array(timestamp, dtype=np.int64)
+        self.offset = np.array(offset, dtype=np.int64)
+        self.code = np.array(code, dtype=np.int32)
+        self.kind = np.array(kind, dtype=np.int8)
+        self.texts = list(codes)
+
+        # last line of the file, which ends the last trial when the trials
+        #  are only marked by their start (see last_timestamp)
+        self.nlines = len(lines)
+        self.last_line = lines[-1] if lines else ''
+
+    def __len__(self):
+
+        return len(self.code)
+
+    def text(self, rows):
+
+        '''
+        Texts of some rows of the table
+
+        Parameters
+        ----------
+        rows: numpy.ndarray
+            Indices of the rows
+
+        Returns
+        -------
+        texts: list
+        '''
+
+        return [self.texts[c] for c in self.code[rows]]
+
+    def identifier(self, rows):
+
+        '''
+        Identifiers of the trials starting at some rows of the table: the
+        text of the messages after their timestamp, and the part of the
+        other lines after the first space following their first tabulation
+
+        Parameters
+        ----------
+        rows: numpy.ndarray
+            Indices of the rows
+
+        Returns
+        -------
+        identifiers: list
+        '''
+
+        identifiers = []
+        for text, kind in zip(self.text(rows), self.kind[rows]):
+            if kind!=MESSAGE:
+                text = text.partition('\t')[2].partition(' ')[2]
+            identifiers.append(text)
+
+        return identifiers
+
+    def contains(self, substring):
+
+        '''
+        Rows whose text contains a substring
+
+        Parameters
+        ----------
+        substring: str
+            Substring searched in the texts
+
+        Returns
+        -------
+        mask: numpy.ndarray
+            Boolean mask of the rows of the table
+        '''
+
+        found = np.fromiter((substring in t for t in self.texts), dtype=bool,
+                            count=len(self.texts))
+
+        return found[self.code]
+
+    def trials(self, StartMessage, EndMessage=None):
+
+        '''
+        Trials of the file (see :func:`Trials.pair_trials`)
+
+        A trial starts at a row containing ``StartMessage``. It ends at the
+        next row containing ``EndMessage``, or, if ``EndMessage`` is None, at
+        the next start of a trial or at the last line of the file. As in the
+        first release, the markers are searched in all the rows, not only in
+        the messages.
+        The trials whose ``EndMessage`` is missing (for example at the end of
+        an interrupted recording) are unterminated and end at the last line
+        of the file.
+
+        Parameters
+        ----------
+        StartMessage: str
+            Message marking the start of the trials
+        EndMessage: str or None (default None)
+            Message marking the end of the trials
+
+        Returns
+        -------
+        trials: dict
+            Dictionary ``{name: array}`` with one row per trial: 'row' (row
+            of the start message in the table), 'start' and 'end'
+            (timestamps), 'start_offset' and 'end_offset' (lines of the file,
+            the rows of a trial are the rows from its start offset included
+            to its end offset excluded) and 'terminated'
+        '''
+
+        starts = np.flatnonzero(self.contains(StartMessage))
+        ends = None
+        if EndMessage is not None:
+            ends = self.offset[self.contains(EndMessage)]
+
+        index, end_offset, terminated = pair_trials(self.offset[starts], ends,
+                                                    self.nlines-1)
+        row = starts[index]
+
+        # timestamps of the ends, the last line may not be in the table
+        end = np.empty(len(row), dtype=np.int64)
+        if len(row):
+            k = np.minimum(np.searchsorted(self.offset, end_offset),
+                           len(self)-1)
+            in_table = self.offset[k]==end_offset
+            end[in_table] = self.timestamp[k[in_table]]
+
+            t_stop = self.last_timestamp()
+            if t_stop is None:
+                t_stop = self.timestamp.max()
+            end[~in_table] = t_stop
+
+        return {'row': row, 'start': self.timestamp[row], 'end': end,
+                'start_offset': self.offset[row], 'end_offset': end_offset,
+                'terminated': terminated}
+
+    def last_timestamp(self):
+
+        '''
+        Timestamp of the last line of the file (for example its 'END' line
+        or its last sample), None if it has no timestamp
+        '''
+
+        l = self.last_line.split('\t', 1)
+        for t in [l[0], l[-1].lstrip().split(' ')[0].split('\t')[0]]:
+            try:
+                return int(t)
+            except ValueError:
+                pass
+
+        return None
@@ -0,0 +1,216 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import struct
+import hashlib
+import zipfile
+import numpy as np
+from .File import atomic_open, BUFFER_SIZE
+
+
+class ParseCache:
+
+    '''
+    On-disk cache of the parsed data files
+
+    The entries are addressed by the hash of the content of the data files
+    and the version of the parser, so a data file that is moved or copied
+    is still found, and an entry is never used by another version of the
+    parser. Each entry is a .npz file of arrays. The total size of the
+    entries is bounded: the least recently used entries are removed first.
+
+    Parameters
+    ----------
+    dirpath: str
+        Path of the directory of the cache
+    max_size: int (default 1 GiB)
+        Maximal total size of the entries in bytes
+    '''
+
+    def __init__(self, dirpath, max_size=1024**3):
+
+        self.dirpath = dirpath
+        self.max_size = max_size
+
+    def key(self, path, version):
+
+        '''
+        Key of a data file
+
+        Parameters
+        ----------
+        path: str
+            Path of the data file
+        version: str or int
+            Version of the parser
+
+        Returns
+        -------
+        key: str
+            Hash of the content of the file and version of the parser
+        '''
+
+        h = hashlib.blake2b(digest_size=20)
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(BUFFER_SIZE), b''):
+                h.update(block)
+
+        return '%s-v%s'%(h.hexdigest(), version)
+
+    def filename(self, key):
+
+        '''
+        Path of the .npz file of an entry
+        '''
+
+        return os.path.join(self.dirpath, key+'.npz')
+
+    def load(self, key, mmap_mode=None):
+
+        '''
+        Load an entry of the cache
+
+        Parameters
+        ----------
+        key: str
+            Key of the entry (see :meth:`key`)
+        mmap_mode: str or None (default None)
+            If not None, the arrays are memory-mapped from the .npz file
+            with this mode (see :func:`numpy.load`) instead of being read
+
+        Returns
+        -------
+        arrays: dict or None
+            Dictionary ``{name: array}`` of the entry, None if the entry does
+            not exist (or is unreadable)
+        '''
+
+        filename = self.filename(key)
+
+        try:
+            if mmap_mode:
+                arrays = self.map_arrays(filename, mmap_mode)
+            else:
+                with np.load(filename, allow_pickle=False) as f:
+                    arrays = {k: f[k] for k in f.files}
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, zipfile.BadZipFile):
+            self.remove(filename)
+            return None
+
+        # the entry is now the most recently used
+        try:
+            os.utime(filename)
+        except OSError:
+            pass
+
+        return arrays
+
+    @staticmethod
+    def map_arrays(filename, mmap_mode='r'):
+
+        '''
+        Memory-map the arrays of a .npz file
+
+        The arrays of the .npz files written by :func:`numpy.savez` are
+        stored without compression, each one as a .npy file at an offset of
+        the .npz file, so they can be memory-mapped like .npy files.
+
+        Parameters
+        ----------
+        filename: str
+            Name of the .npz file
+        mmap_mode: str (default 'r')
+            Mode of the memory maps (see :class:`numpy.memmap`)
+
+        Returns
+        -------
+        arrays: dict
+            Dictionary ``{name: numpy.memmap}``
+        '''
+
+        arrays = {}
+        with zipfile.ZipFile(filename) as z, open(filename, 'rb') as f:
+            for info in z.infolist():
+
+                if info.compress_type!=zipfile.ZIP_STORED:
+                    raise ValueError("Compressed array '%s'"%info.filename)
+
+                # data of the member after its local header
+                f.seek(info.header_offset)
+                header = f.read(30)
+                n, m = struct.unpack('<HH', header[26:30])
+                f.seek(info.header_offset+30+n+m)
+
+                version = np.lib.format.read_magic(f)
+                if version==(1, 0):
+                    header = np.lib.format.read_array_header_1_0(f)
+                else:
+                    header = np.lib.format.read_array_header_2_0(f)
+                shape, fortran_order, dtype = header
+
+                arrays[info.filename[:-4]] = np.memmap(
+                                filename, dtype=dtype, mode=mmap_mode,
+                                offset=f.tell(), shape=shape,
+                                order='F' if fortran_order else 'C')
+
+        return arrays
+
+    def save(self, key, arrays):
+
+        '''
+        Save an entry in the cache, then remove the least recently used
+        entries beyond the maximal size of the cache
+
+        Parameters
+        ----------
+        key: str
+            Key of the entry (see :meth:`key`)
+        arrays: dict
+            Dictionary ``{name: array}`` of the entry
+        '''
+
+        os.makedirs(self.dirpath, exist_ok=True)
+
+        with atomic_open(key+'.npz', self.dirpath, mode='wb') as f:
+            np.savez(f, **arrays)
+
+        self.evict()
+
+    def evict(self):
+
+        '''
+        Remove the least recently used entries beyond the maximal size of
+        the cache
+        '''
+
+        entries = []
+        for f in os.listdir(self.dirpath):
+            if f.endswith('.npz'):
+                try:
+                    st = os.stat(os.path.join(self.dirpath, f))
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime_ns, st.st_size, f))
+
+        size = 0
+        for _, s, f in sorted(entries, reverse=True):
+            size += s
+            if size>self.max_size:
+                self.remove(os.path.join(self.dirpath, f))
+
+    @staticmethod
+    def remove(filename):
+
+        '''
+        Remove an entry of the cache
+        '''
+
+        # the entry may be removed by another process at the same time, or
+        #  be memory-mapped (on Windows)
+        try:
+            os.remove(filename)
+        except OSError:
+            pass
@@ -0,0 +1,306 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from collections.abc import Mapping
+import numpy as np
+
+# alignment of the columns in the buffer of the recordings, in bytes
+ALIGNMENT = 8
+
+# types of the columns of the samples, by suffix of their names: the
+#  timestamps are integers, and the positions and pupil sizes, recorded with
+#  a precision of 0.1, are represented exactly in single precision (their
+#  shortest representation is the recorded value)
+DTYPE_POLICY = {'timestamp': np.int64,
+                '_coordinate': np.float32,
+                '_pupil_size': np.float32}
+
+# types of the columns of the eye movement events
+EYE_MOVEMENT_DTYPE_POLICY = {'start': np.int64,
+                             'end': np.int64,
+                             'duration': np.int64,
+                             '_x': np.float32,
+                             '_y': np.float32,
+                             'pupil_size': np.float32}
+
+
+def policy_dtypes(columns, policy=DTYPE_POLICY):
+
+    '''
+    Types of columns given by a dtype policy
+
+    The integer types are only given to the columns without missing or
+    fractional values, the other columns keep their type.
+
+    Parameters
+    ----------
+    columns: dict
+        Dictionary ``{name: array}`` of the columns
+    policy: dict (default DTYPE_POLICY)
+        Dictionary ``{suffix: dtype}`` of the types of the columns whose name
+        ends with ``suffix``
+
+    Returns
+    -------
+    dtypes: dict
+        Dictionary ``{name: dtype}`` of the types of the columns
+    '''
+
+    dtypes = {}
+    for k, c in columns.items():
+
+        dtypes[k] = c.dtype
+
+        for suffix, dtype in policy.items():
+            if k.endswith(suffix):
+                dtype = np.dtype(dtype)
+                if dtype.kind in 'iu' and c.dtype.kind=='f' and \
+                   not (np.isfinite(c).all() and (c==np.trunc(c)).all()):
+                    break
+                dtypes[k] = dtype
+                break
+
+    return dtypes
+
+
+class Recording(Mapping):
+
+    '''
+    Samples of a recording in a single contiguous buffer
+
+    The columns of the samples are stored one after the other in one buffer
+    of bytes, each column being contiguous and aligned on :data:`ALIGNMENT`
+    bytes. The recording is a mapping ``{name: array}`` of views on this
+    buffer, so it is used as the dictionaries of columns and its columns are
+    never copied. The buffer may be a memory-mapped file (see
+    :meth:`ParseCache.ParseCache.load`).
+
+    The recording supports the array interface (``numpy.asarray(recording)``
+    is an array of shape (columns, samples), a view on the buffer if all the
+    columns have the same type, ``numpy.asarray(recording, copy=False)``
+    raises a ValueError if it cannot be a view) and the buffer protocol
+    (``memoryview(recording)`` is the buffer of bytes, with python 3.12 or
+    later).
+
+    Parameters
+    ----------
+    names: list
+        Names of the columns
+    dtypes: list
+        Types of the columns
+    length: int
+        Number of samples
+    buffer: numpy.ndarray or None (default None)
+        Buffer of bytes (uint8) containing the columns (see :meth:`layout`),
+        a new buffer is allocated if None
+    '''
+
+    def __init__(self, names, dtypes, length, buffer=None):
+
+        self.names = list(names)
+        self.dtypes = [np.dtype(d) for d in dtypes]
+        self.length = int(length)
+        self.offsets = self.layout(self.dtypes, self.length)
+
+        if buffer is None:
+            buffer = np.empty(self.offsets[-1], dtype=np.uint8)
+        if buffer.dtype!=np.uint8 or buffer.ndim!=1 or \
+           len(buffer)<self.offsets[-1]:
+            raise ValueError("The buffer does not contain %d samples of the "
+                             "columns %s"%(self.length, self.names))
+        self.buffer = buffer
+
+        self.columns = {}
+        for k, dtype, offset in zip(self.names, self.dtypes, self.offsets):
+            end = offset + self.length*dtype.itemsize
+            self.columns[k] = buffer[offset:end].view(dtype)
+
+    @staticmethod
+    def layout(dtypes, length):
+
+        '''
+        Offsets of the columns in the buffer
+
+        Parameters
+        ----------
+        dtypes: list
+            Types of the columns
+        length: int
+            Number of samples
+
+        Returns
+        -------
+        offsets: list
+            Offset of each column in bytes, followed by the size of the
+            buffer
+        '''
+
+        offsets = [0]
+        for dtype in dtypes:
+            end = offsets[-1] + length*dtype.itemsize
+            offsets.append(-(-end//ALIGNMENT)*ALIGNMENT)
+
+        return offsets
+
+    @classmethod
+    def from_columns(cls, columns, dtypes=None, writeable=True):
+
+        '''
+        Copy columns in a new recording
+
+        Parameters
+        ----------
+        columns: dict
+            Dictionary ``{name: array}`` of the columns, all of the same
+            length (the arrays may be views, for example the columns of a
+            2D array)
+        dtypes: dict or None (default None)
+            Dictionary ``{name: dtype}`` of the types of the columns in the
+            recording (see :func:`policy_dtypes`), the columns are converted
+            while they are copied. By default the columns keep their type
+        writeable: bool (default True)
+            If False, the columns of the recording are read-only
+
+        Returns
+        -------
+        recording: Recording
+        '''
+
+        names = list(columns.keys())
+        arrays = [np.asarray(columns[k]) for k in names]
+        length = len(arrays[0]) if arrays else 0
+
+        if dtypes is None:
+            dtypes = {}
+        recording = cls(names, [dtypes.get(k, a.dtype)
+                                for k, a in zip(names, arrays)], length)
+        for k, a in zip(names, arrays):
+            recording.columns[k][...] = a
+
+        if not writeable:
+            recording.buffer.flags.writeable = False
+            for c in recording.columns.values():
+                c.flags.writeable = False
+
+        return recording
+
+    def add_columns(self, columns):
+
+        '''
+        Copy the recording in a new recording with other columns
+
+        The columns of the recording keep their place in the new buffer, so
+        the buffer is copied at once, and the other columns follow them.
+
+        Parameters
+        ----------
+        columns: dict
+            Dictionary ``{name: array}`` of the columns to be added, of the
+            length of the recording
+
+        Returns
+        -------
+        recording: Recording
+        '''
+
+        arrays = [np.asarray(a) for a in columns.values()]
+        recording = Recording(self.names+list(columns.keys()),
+                              self.dtypes+[a.dtype for a in arrays],
+                              self.length)
+
+        recording.buffer[:self.offsets[-1]] = self.buffer[:self.offsets[-1]]
+        for k, a in zip(columns.keys(), arrays):
+            recording.columns[k][:] = a
+
+        return recording
+
+    def to_arrays(self):
+
+        '''
+        Arrays describing the recording, to be saved in a .npz file
+
+        Returns
+        -------
+        arrays: dict
+            ``{'names', 'dtypes', 'length', 'buffer'}``
+            (see :meth:`from_arrays`)
+        '''
+
+        return dict(names=np.array(self.names),
+                    dtypes=np.array([d.str for d in self.dtypes]),
+                    length=np.array(self.length),
+                    buffer=self.buffer[:self.offsets[-1]])
+
+    @classmethod
+    def from_arrays(cls, arrays):
+
+        '''
+        Recording described by arrays (see :meth:`to_arrays`), the columns
+        are views on ``arrays['buffer']``
+        '''
+
+        return cls(arrays['names'].tolist(), arrays['dtypes'].tolist(),
+                   arrays['length'], arrays['buffer'])
+
+    @property
+    def nbytes(self):
+
+        return self.offsets[-1]
+
+    #--------------------------------------------------------------------------
+    # Mapping {name: array}
+    #--------------------------------------------------------------------------
+    def __getitem__(self, name):
+
+        return self.columns[name]
+
+    def __iter__(self):
+
+        return iter(self.names)
+
+    def __len__(self):
+
+        return len(self.names)
+
+    def __repr__(self):
+
+        return '<Recording of %d samples: %s>'%(self.length,
+                                               ', '.join(self.names))
+
+    #--------------------------------------------------------------------------
+    # Array interface and buffer protocol
+    #--------------------------------------------------------------------------
+    def __array__(self, dtype=None, copy=None):
+
+        if dtype is not None:
+            dtype = np.dtype(dtype)
+
+        if len(set(self.dtypes))==1 and self.offsets[-1]==\
+           len(self.names)*self.length*self.dtypes[0].itemsize:
+            # the columns are contiguous: view of shape (columns, samples)
+            values = self.buffer[:self.offsets[-1]].view(self.dtypes[0])
+            values = values.reshape(len(self.names), self.length)
+            view = True
+        elif copy is False:
+            raise ValueError("The columns of the recording do not have the "
+                             "same type, they cannot be viewed as an array "
+                             "without a copy")
+        else:
+            values = np.stack(list(self.columns.values())) if self.names \
+                     else np.empty((0, self.length))
+            view = False
+
+        if dtype is not None and dtype!=values.dtype:
+            if copy is False:
+                raise ValueError("The columns of the recording cannot be "
+                                 "viewed as %s without a copy"%dtype)
+            return values.astype(dtype)
+
+        if copy and view:
+            values = values.copy()
+
+        return values
+
+    def __buffer__(self, flags):
+
+        return memoryview(self.buffer[:self.offsets[-1]])
@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import time
+
+# size of the samples of the files read to estimate their number of lines
+SAMPLE_SIZE = 64*1024
+
+
+def estimate_cost(filename, filepath, nsamples=3):
+
+    '''
+    Estimate the cost of the conversion of a data file by its number of lines
+
+    The number of lines is estimated from the size of the file and the mean
+    length of the lines of ``nsamples`` samples of :data:`SAMPLE_SIZE` bytes
+    spread over the file, so the file is not read entirely. The cost of the
+    binary files (without lines) is their size.
+
+    Parameters
+    ----------
+    filename: str
+        Name of the data file
+    filepath: str
+        Path of the data file
+    nsamples: int (default 3)
+        Number of samples read in the file
+
+    Returns
+    -------
+    cost: float
+        Estimated number of lines of the file, 0 if the file does not exist
+    '''
+
+    path = os.path.join(filepath, filename) if filepath else filename
+    if not os.path.isfile(path):
+        return 0.
+
+    size = os.path.getsize(path)
+    if size<=nsamples*SAMPLE_SIZE:
+        offsets = [0]
+    else:
+        step = (size-SAMPLE_SIZE)//(nsamples-1) if nsamples>1 else 0
+        offsets = [n*step for n in range(nsamples)]
+
+    nbytes, nlines = 0, 0
+    with open(path, 'rb') as f:
+        for offset in offsets:
+            f.seek(offset)
+            sample = f.read(SAMPLE_SIZE)
+            nbytes += len(sample)
+            nlines += sample.count(b'\n')
+
+    if not nlines:
+        return float(size)
+
+    return size*nlines/nbytes
+
+def timed_call(function, arg):
+
+    '''
+    Call ``function(arg)`` and measure the time of the call
+
+    Parameters
+    ----------
+    function: function
+        Function called
+    arg: object
+        Argument of the function
+
+    Returns
+    -------
+    result, start, end, pid: object, float, float, int
+        Result of the call, start and end times of the call (in seconds
+        since the epoch, so the times of different processes can be
+        compared) and identifier of the process of the call
+    '''
+
+    start = time.time()
+    result = function(arg)
+
+    return result, start, time.time(), os.getpid()
+
+def run_largest_first(function, args, costs, workers):
+
+    '''
+    Call ``function`` on each argument in a pool of processes, the arguments
+    of largest cost first, so the longest calls do not start last while the
+    other processes are idle
+
+    Parameters
+    ----------
+    function: function
+        Function called (it must be picklable, for example a method of a
+        picklable object)
+    args: list
+        Arguments of the calls
+    costs: list
+        Estimated cost of each call (see :func:`estimate_cost`)
+    workers: int
+        Number of processes
+
+    Returns
+    -------
+    results, report: list, dict
+        ``results`` are the results of the calls, in the order of ``args``.
+        ``report`` contains the 'workers', the 'makespan' (time from the
+        submission of the calls to the end of the last one), the 'busy' time
+        of the processes, their 'utilization' (busy time over ``workers``
+        times the makespan) and a dictionary list for each call with its
+        'index', 'cost', 'start' and 'duration' (relative to the submission)
+        and 'pid'
+    '''
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    order = sorted(range(len(args)), key=lambda k: (-costs[k], k))
+
+    t0 = time.time()
+    with ProcessPoolExecutor(workers) as executor:
+        # the pool starts the calls in the order of their submission
+        futures = {k: executor.submit(timed_call, function, args[k])
+                   for k in order}
+        calls = {k: futures[k].result() for k in order}
+    makespan = time.time()-t0
+
+    results = [calls[k][0] for k in range(len(args))]
+
+    tasks = []
+    for k in order:
+        _, start, end, pid = calls[k]
+        tasks.append(dict(index=k, cost=costs[k], start=start-t0,
+                          duration=end-start, pid=pid))
+
+    busy = sum(t['duration'] for t in tasks)
+    utilization = busy/(workers*makespan) if makespan>0 else 0.
+
+    report = dict(workers=workers, makespan=makespan, busy=busy,
+                  utilization=utilization, tasks=tasks)
+
+    return results, report
@@ -2,7 +2,8 @@
 # -*- coding: utf-8 -*-
 
 import os
-import numpy as np
+import heapq
+from collections import ChainMap
 from .File import open_file, save_file
 
 
@@ -194,6 +195,10 @@ class StandardisationProcess:
         self.infofilesname = None
         self.settingsEventsfilename = None
 
+        # static layers of the settings, shared by all the data files
+        #  (see settings_template)
+        self.settings_layers = None
+
         self.required_setting = ['SamplingFrequency',
                                  'SampleCoordinateUnit',
                                  'SampleCoordinateSystem',
@@ -446,31 +451,21 @@ class StandardisationProcess:
         # list of settings that will be kept for infos_participant
         infos = [s for s in infoFiles[0].keys() if s not in does_not_keep]
 
-        dict_participant = {f['participant_id']: {s:[] for s in infos}
-                            for f in infoFiles}
-
-        for f in infoFiles:
-            for s in dict_participant[f['participant_id']].keys():
-                dict_participant[f['participant_id']][s].append(f[s])
-
         #----------------------------------------------------------------------
         # check if there are settings on the files that are global to a
         #  participant
         #----------------------------------------------------------------------
-        # list of settings per participant
-        infos_participant = infos.copy()
+        _, conflicts = self.aggregate_infoParticipants(infoFiles, infos,
+                                                       distinct=False)
 
-        for p in dict_participant.keys():
-            for s in dict_participant[p].keys():
+        # if there is more than one setting data for the same participant, it
+        #  is not global setting for the participant
+        not_global = set()
+        for c in conflicts.values():
+            not_global.update(c)
 
-                # list of data of settings
-                list_s = list(set(dict_participant[p][s]))
-
-                # if there is more than one setting data for the same
-                #  participant, it is not global setting for the participant
-                if len(list_s)!=1:
-                    if s in infos_participant:
-                        infos_participant.remove(s)
+        # list of settings per participant
+        infos_participant = [s for s in infos if s not in not_global]
 
         # list of settings per file
         infos_file = [s for s in infos if s not in infos_participant]
@@ -480,6 +475,51 @@ class StandardisationProcess:
         return infos
 
 
+    def shard_infoFiles(self, infoFiles, shard):
+
+        '''
+        Partition the lines of infoFiles in shards balanced by the size of
+        their data files
+
+        The lines are assigned from the largest to the smallest data file to
+        the shard with the smallest total size (the first one in case of
+        equality), so the partition only depends on infoFiles and on the
+        sizes of the data files, and is the same for all the shards.
+
+        Parameters
+        ----------
+        infoFiles: list
+            A dictionary list for each line of the information file
+        shard: tuple
+            ``(i, N)``: index of the shard (from 0 to N-1) and number of
+            shards
+
+        Returns
+        -------
+        indices: list
+            Sorted indices of the lines of infoFiles in the shard ``i``
+        '''
+
+        i, n = shard
+        if not 0<=i<n:
+            raise ValueError("Shard %d does not exist in %d shards"%(i, n))
+
+        sizes = []
+        for f in infoFiles:
+            path = os.path.join(self.dirpath, f['filepath'], f['filename'])
+            sizes.append(os.path.getsize(path) if os.path.isfile(path) else 0)
+
+        # shards sorted by (total size, index)
+        shards = [(0, s) for s in range(n)]
+        indices = []
+        for k in sorted(range(len(infoFiles)), key=lambda k: (-sizes[k], k)):
+            size, s = heapq.heappop(shards)
+            if s==i:
+                indices.append(k)
+            heapq.heappush(shards, (size+sizes[k], s))
+
+        return sorted(indices)
+
     #--------------------------------------------------------------------------
     # dataset_description
     #--------------------------------------------------------------------------
@@ -881,6 +921,113 @@ class StandardisationProcess:
 
         return settings
 
+    def settings_template(self, settingsfilename, infofilesname):
+
+        '''
+        Load the static layers of the settings, which are the same for all
+        the data files: the initial settings, the settings of the json file
+        and the lines of the infoFiles. They are loaded once and cached.
+
+        Parameters
+        ----------
+        settingsfilename: str or None
+            Name of the file containing the settings of the data to be
+            BIDSified
+        infofilesname: str
+            Name of the file containing the information on the files to be
+            BIDSified
+
+        Returns
+        -------
+        init, settings_json, infoFiles: dict, dict, dict
+            ``init`` are the initial settings, ``settings_json`` the filled
+            settings of the json file and ``infoFiles`` a dictionary of the
+            lines of the infoFiles by data file name
+        '''
+
+        key = (settingsfilename, infofilesname)
+
+        if not self.settings_layers or self.settings_layers[0]!=key:
+
+            init = self.settings_init()
+
+            settings_json = {}
+            if settingsfilename:
+                new_settings = open_file(settingsfilename, self.dirpath)
+                for s in new_settings.keys():
+                    if new_settings[s]:
+                        settings_json[s] = new_settings[s]
+
+            # the last line of a data file is kept
+            infoFiles = {}
+            for f in open_file(infofilesname, self.dirpath):
+                infoFiles[f['filename']] = f
+
+            self.settings_layers = (key, (init, settings_json, infoFiles))
+
+        return self.settings_layers[1]
+
+    def resolve_settings(self, filename, settingsfilename, infofilesname,
+                         list_settings, extract=None):
+
+        '''
+        Resolve the settings of a data file from the cached static layers
+        (see :meth:`settings_template`) and the settings of the data file.
+
+        The layers are, by increasing priority: the initial settings, the
+        settings extracted from the data file, the settings of the json
+        file and the settings of the line of the data file in the infoFiles.
+        The settings of the data file are written in a copy-on-write overlay
+        of the initial settings, so the template is never modified.
+
+        Parameters
+        ----------
+        filename: str
+            Name of the data file to be BIDSified
+        settingsfilename: str or None
+            Name of the file containing the settings of the data to be
+            BIDSified
+        infofilesname: str
+            Name of the file containing the information on the files to be
+            BIDSified
+        list_settings: list
+            List of settings to be extracted from the infoFiles
+        extract: function or None (default None)
+            Function filling the settings given as argument with the
+            settings of the data file
+
+        Returns
+        -------
+        settings: dict
+            A dictionary containing the settings of the experiment
+        '''
+
+        init, settings_json, infoFiles = self.settings_template(
+                                                            settingsfilename,
+                                                            infofilesname)
+
+        # settings of the data file
+        settings_file = ChainMap({}, init)
+        if extract:
+            extract(settings_file)
+
+        # retrieves the information about the file in infoFiles
+        info_file = infoFiles.get(filename)
+
+        # check if this information exist
+        if not info_file:
+            message = "The info file %s/%s "%(self.dirpath, infofilesname)
+            message += "does not contain information on %s"%(filename)
+            raise ValueError(message)
+
+        settings_info = {}
+        for i in list_settings:
+            if i in info_file.keys():
+                settings_info[i] = info_file[i]
+
+        return dict(ChainMap(settings_info, settings_json,
+                             *settings_file.maps))
+
     def check_required_settings(self, settings):
 
         '''
@@ -951,7 +1098,7 @@ class StandardisationProcess:
 
         settingsEvents = {}
         if len(events)!=0:
-            events = np.unique(events)
+            events = sorted(set(events))
 
             for e in events:
                 if e!="trial":
@@ -1015,7 +1162,7 @@ class StandardisationProcess:
 
                 for e in eventsfile:
                     events.extend(e.keys())
-        events = list(np.unique(events))
+        events = sorted(set(events))
         if 'trial' in events:
             events.remove('trial')
         #----------------------------------------------------------------------
@@ -1179,10 +1326,113 @@ class StandardisationProcess:
         return events
 
 
+    #--------------------------------------------------------------------------
+    # Summary
+    #--------------------------------------------------------------------------
+    def extract_summaryTrials(self, data, events, timestamp='eye_timestamp',
+                              timescale=1000):
+
+        '''
+        Compute summary statistics of the samples of each trial: number of
+        samples, fraction of missing samples (a sample is missing if one of
+        its coordinates is missing), mean pupil size (the pupil sizes of 0
+        are tracking losses and are excluded) and number of blinks
+
+        Parameters
+        ----------
+        data: dict
+            Dictionary ``{name: array}`` of the columns of the samples
+        events: list
+            A dictionary list for each trial containing the events of
+            those trials, with at least the 'trial', 'sample' (timestamp of
+            the start of the trial) and 'duration' (in seconds) events
+        timestamp: str (default 'eye_timestamp')
+            Name of the column of the timestamps
+        timescale: float (default 1000)
+            Number of timestamp units per second
+
+        Returns
+        -------
+        summary: list
+            A dictionary list for each trial containing the statistics of
+            those trials
+        '''
+
+        import numpy as np
+        from .Epochs import event_onsets
+        from .Trials import assign_trials
+
+        if not events or timestamp not in data:
+            return []
+
+        starts = event_onsets(events, 'sample')
+        ends = starts + event_onsets(events, 'duration')*timescale
+        if np.isnan(starts).all():
+            return []
+
+        #----------------------------------------------------------------------
+        # trial of each sample (-1 if the sample is outside the trials)
+        #----------------------------------------------------------------------
+        ts = np.asarray(data[timestamp], dtype=np.float64)
+        trial = assign_trials(ts, starts, ends, closed=True)
+
+        inside = trial>=0
+        trial = trial[inside]
+        ntrials = len(events)
+
+        #----------------------------------------------------------------------
+        # reductions per trial
+        #----------------------------------------------------------------------
+        n_samples = np.bincount(trial, minlength=ntrials)
+
+        coordinates = [k for k in data.keys() if '_coordinate' in k]
+        missing = np.zeros(len(ts), dtype=bool)
+        for k in coordinates:
+            missing |= np.isnan(data[k])
+        n_missing = np.bincount(trial, weights=missing[inside],
+                                minlength=ntrials)
+
+        pupil_sum = np.zeros(ntrials)
+        pupil_count = np.zeros(ntrials)
+        for k in [k for k in data.keys() if k.endswith('_pupil_size')]:
+            pupil = np.asarray(data[k], dtype=np.float64)[inside]
+            valid = pupil>0
+            pupil_sum += np.bincount(trial[valid], weights=pupil[valid],
+                                     minlength=ntrials)
+            pupil_count += np.bincount(trial[valid], minlength=ntrials)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            missing_fraction = n_missing/n_samples
+            mean_pupil = pupil_sum/pupil_count
+
+        #----------------------------------------------------------------------
+        # number of blinks per trial
+        #----------------------------------------------------------------------
+        def count(e):
+            if e is None or e=='':
+                return 0
+            if isinstance(e, (list, tuple)):
+                return len(e)
+            if isinstance(e, str) and e.startswith('['):
+                return e.count(',')+1 if e.strip('[]') else 0
+            return 1
+
+        summary = []
+        for n, e in enumerate(events):
+            summary.append({'trial': e.get('trial', n+1),
+                            'n_samples': int(n_samples[n]),
+                            'missing_fraction': float(missing_fraction[n]),
+                            'mean_pupil_size': float(mean_pupil[n]),
+                            'n_blinks': count(e.get('SBLINK'))})
+
+        return summary
+
+
     #--------------------------------------------------------------------------
     # infoParticipants
     #--------------------------------------------------------------------------
-    def extract_infoParticipants(self, filename, list_infoparticipants):
+    def extract_infoParticipants(self, filename, list_infoparticipants,
+                                 infoFiles=None):
 
         '''
         Extract the participant informations from the tsv file
@@ -1193,6 +1443,9 @@ class StandardisationProcess:
             Name of the information file
         list_infoparticipant: list
             List of participant information to be extracted
+        infoFiles: list or None (default None)
+            A dictionary list for each line of the information file, read
+            from ``filename`` if None
 
         Returns
         -------
@@ -1202,14 +1455,69 @@ class StandardisationProcess:
         '''
 
         # open infoFiles
-        infoFiles = open_file(filename, self.dirpath)
+        if infoFiles is None:
+            infoFiles = open_file(filename, self.dirpath)
 
         # extract the participant informations from the file
+        info_participants, conflicts = self.aggregate_infoParticipants(
+                                                        infoFiles,
+                                                        list_infoparticipants)
+
+        # print a message if a participant has several values of information
+        if conflicts:
+            print('Conflicting participant information:', conflicts)
+
+        return info_participants
+
+    def aggregate_infoParticipants(self, infoFiles, list_infoparticipants,
+                                   distinct=True):
+
+        '''
+        Aggregate the lines of infoFiles per participant in a single pass
+
+        Parameters
+        ----------
+        infoFiles: list
+            A dictionary list for each line of the information file
+        list_infoparticipant: list
+            List of participant information to be aggregated
+        distinct: bool (default True)
+            If False, only the conflicts are computed and ``info_participants``
+            is empty
+
+        Returns
+        -------
+        info_participants, conflicts: list, dict
+            ``info_participants`` is a dictionary list of the distinct
+            informations, in the order of their first line.
+            ``conflicts`` is a dictionary ``{participant_id: [informations]}``
+            of the informations with several values for a participant
+        '''
+
         info_participants = []
+        seen = set()
+        first = {}
+        conflicts = {}
+
         for f in infoFiles:
-            i = {k:f[k] for k in list_infoparticipants}
-            if i not in info_participants:
-                info_participants.append(i)
 
-        return info_participants
+            values = tuple(f[k] for k in list_infoparticipants)
+
+            if distinct and values not in seen:
+                seen.add(values)
+                info_participants.append(dict(zip(list_infoparticipants,
+                                                  values)))
+
+            # values of the first line of the participant
+            p = f['participant_id']
+            if p not in first:
+                first[p] = values
+
+            elif first[p]!=values:
+                c = conflicts.setdefault(p, [])
+                for k, v0, v in zip(list_infoparticipants, first[p], values):
+                    if v0!=v and k not in c:
+                        c.append(k)
+
+        return info_participants, conflicts
 
@@ -1,11 +1,23 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-from .File import open_file
+import os
+import numpy as np
+from .File import open_file, to_float
 from .StandardisationProcess import *
+from .Calibration import is_calibration_line, extract_calibrations
+from .AscGrammar import line_key, SETTINGS_GRAMMAR
+from .Backends import Backend, register_backend
+from .MessageTable import MessageTable, MESSAGE
+from .Trials import assign_trials
+from .Recording import Recording, policy_dtypes, \
+                       EYE_MOVEMENT_DTYPE_POLICY
 
 
-class StandardisationProcessDataEyelink:
+@register_backend('Eyelink', capabilities=['settings', 'events',
+                                           'eyeMovementEvents', 'sourcefile',
+                                           'indexable'])
+class StandardisationProcessDataEyelink(Backend):
 
     '''
     Processes to standardise data eyelink
@@ -20,13 +32,109 @@ class StandardisationProcessDataEyelink:
         Message marking the end of the trial
     '''
 
+    # version of the parsing of the asc files, to be incremented when the
+    #  parsed samples change (see ParseCache)
+    parser_version = 3
+
     def __init__(self, dirpath, StartMessage, EndMessage,):
 
+        Backend.__init__(self, dirpath, StartMessage, EndMessage)
+
         self.process = StandardisationProcess(dirpath)
 
-        # global variables
-        self.StartMessage = StartMessage
-        self.EndMessage = EndMessage
+        # validations of the calibrations of the last asc file processed
+        #  by extract_settings_ascFile
+        self.calibrations = None
+
+        # lines of the last file opened
+        self.file_asc = (None, None)
+        # key and entry of the parse cache of the last file opened
+        self.file_cache = (None, None)
+        # key and message table of the last file whose messages were
+        #  extracted
+        self.messages = (None, None)
+
+    def open_ascFile(self, filename, filepath):
+
+        '''
+        Open a data file as the lines of an asc file
+
+        The lines of the last file opened are kept, so the settings, data
+        and events of a file are extracted from a single reading of the
+        file.
+
+        If the file is in the parse cache (see :class:`ParseCache.ParseCache`),
+        its lines are read from the cache, without the sample lines which are
+        already parsed (see :meth:`extract_samples_ascFile`). The entry of
+        the cache is memory-mapped.
+
+        Parameters
+        ----------
+        filename: str
+            Name of the data file to be BIDSified
+        filepath: str
+            Path of the data file to be BIDSified
+
+        Returns
+        -------
+        file_asc: list
+            Lines of the file
+        '''
+
+        path = os.path.join(filepath, filename) if filepath else filename
+        key = (os.path.abspath(path), os.stat(path).st_mtime_ns)
+
+        if self.file_asc[0]!=key:
+
+            digest, entry = None, None
+            if self.cache:
+                digest = self.cache.key(path, self.parser_version)
+                entry = self.cache.load(digest, mmap_mode='r')
+
+            if entry:
+                lines = bytes(entry['lines']).decode().split('\n')
+                last = lines.pop()
+                lines = [l+'\n' for l in lines]
+                if last:
+                    lines.append(last)
+            else:
+                lines = open_file(filename, filepath)
+
+            self.file_asc = (key, lines)
+            self.file_cache = (digest, entry)
+
+        return self.file_asc[1]
+
+
+    def extract_messages_ascFile(self, filename, filepath):
+
+        '''
+        Extract the messages of a given run file (in .asc format) as a table
+        (see :class:`MessageTable.MessageTable`).
+
+        The table of the last file is kept, so the events of several
+        configurations of ``saved_events``, ``StartMessage`` and
+        ``EndMessage`` are extracted without reading the lines of the file
+        again.
+
+        Parameters
+        ----------
+        filename: str
+            Name of the data file to be BIDSified
+        filepath: str
+            Path of the data file to be BIDSified
+
+        Returns
+        -------
+        messages: MessageTable
+        '''
+
+        file_asc = self.open_ascFile(filename, filepath)
+
+        if self.messages[0]!=self.file_asc[0]:
+            self.messages = (self.file_asc[0], MessageTable(file_asc))
+
+        return self.messages[1]
 
 
     #--------------------------------------------------------------------------
@@ -61,135 +169,40 @@ class StandardisationProcessDataEyelink:
         settings['Manufacturer'] = "SR-Research"
 
         # open file asc
-        file_asc = open_file(filename, filepath)
+        file_asc = self.open_ascFile(filename, filepath)
+
+        # lines of the validations and timestamps of the lines containing the
+        #  StartMessage
+        calibration_lines = []
+        start_timestamps = []
 
         # extract settings in the file asc
         for line in file_asc:
 
             l = line[:-1]
 
+            # header settings, eye movement events
+            key = SETTINGS_GRAMMAR.parse_line(l, settings)
 
+            if key=='SAMPLE':
+                continue
 
-            if '** EYELINK' in l:
-                k = 'ManufacturersModelName'
-                v = l[3:]
-                settings[k] = v
-
-            if 'VERSION:' in l:
-                k = 'SoftwareVersion'
-                v = l.split('VERSION: ')[1]
-                settings[k] = v
-
-            if 'SERIAL NUMBER:' in l:
-                k = 'DeviceSerialNumber'
-                v = l.split('SERIAL NUMBER: ')[1]
-                settings[k] = v
-
-            if 'CAMERA:' in l:
-                k = 'EyeCameraSettings'
-                v = l.split('CAMERA: ')[1]
-                settings[k] = v
-
-            if 'GAZE_COORDS' in l:
-                k = 'ScreenResolution'
-                v = [float(l.split(' ')[-2]) +1, float(l.split(' ')[-1]) +1]
-                settings[k] = v
-
-            if 'ELCL_PROC' in l:
-                k = 'PupilFitMethod'
-                v = l.split('ELCL_PROC ')[-1]
-                settings[k] = v
-
-            if 'CALIBRATION' in l:
-                k = 'CalibrationType'
-                v = l.split('CALIBRATION ')[1].split(' ')[0]
-                settings[k] = v
-
-            if 'RATE' in l:
-                k = 'SamplingFrequency'
-                v = float(l.split('RATE')[1].split('\t')[1])
-                settings[k] = v
-
-            if 'FILTER' in l:
-                k = 'RawDataFilters'
-                num_filter = int(l.split('FILTER')[1].split('\t')[1])
-                if num_filter==0: v = 'off'
-                elif num_filter==1: v = 'standard'
-                elif num_filter==2: v = 'extra'
-                settings[k] = v
-
-            if 'SAMPLES'==l.split('\t')[0]:
-
-                k = ['SampleCoordinateSystem', 'SampleCoordinateUnit']
-                if 'GAZE' in l: v = ['gaze-on-screen', 'pixels']
-                elif 'HREF' in l: v = ['eye-in-head', 'degree']
-                elif 'PUPIL' in l: v = ['eye-in-camera', 'data raw']
-                for k_, v_ in zip(k, v): settings[k_] = v_
-
-                k = 'RecordedEye'
-                if 'LEFT' in l and 'RIGHT' in l: v = 'Both'
-                elif 'LEFT' in l: v = 'Left'
-                elif 'RIGHT' in l: v = 'Right'
-                settings[k] = v
-
-            if '!CAL VALIDATION' in l and 'GOOD' in l:
-                k = 'CalibrationList'
-                v = l
-                if not settings[k]: settings[k] = [v]
-                else: settings[k].append(v)
-
-            #------------------------------------------------------------------
-            # Eye Movement Events
-            #------------------------------------------------------------------
-            eye_events = ['SFIX', 'EFIX', 'SSACC', 'ESACC', 'SBLINK', 'EBLINK']
-            if l.split(' ')[0] in eye_events:
-                k = 'IncludedEyeMovementEvents'
-                if not settings[k]: settings[k] = []
-
-                event = l.split(' ')[0]
-                if event not in [e[1] for e in settings[k]]:
-                    if event=='SFIX': v = ["Start of fixation", "SFIX"]
-                    elif event=='EFIX': v = ["End of fixation", "EFIX"]
-                    elif event=='SSACC': v = ["Start of saccade", "SSACC"]
-                    elif event=='ESACC': v = ["End of saccade", "ESACC"]
-                    elif event=='SBLINK': v = ["Start of blink", "SBLINK"]
-                    elif event=='EBLINK': v = ["End of blink", "EBLINK"]
-                    settings[k].append(v)
-
-
-            #------------------------------------------------------------------
-            # StartTime
-            #------------------------------------------------------------------
-            if not settings['StartTime']:
-                l_ = l.split('\t')
-                try:
-                    if int(l_[0]):
-                        k = 'StarTime'
-                        v = int(l_[0])
-                        settings[K] = V
-                except:
-                    pass
+            if is_calibration_line(l, key):
+                calibration_lines.append(l)
 
             #------------------------------------------------------------------
-            # EndTime
-            #------------------------------------------------------------------
-            l_ = l.split('\t')
-            try:
-                if int(l_[0]):
-                    k = 'EndTime'
-                    v = int(l_[0])
-                    settings[K] = V
-            except:
-                pass
-            #------------------------------------------------------------------
             # StartMessage
             #------------------------------------------------------------------
             if self.StartMessage in l:
                 k = 'StartMessage'
                 v = self.StartMessage + l.split(self.StartMessage)[1]
+                try:
+                    start_timestamps.append(
+                                    int(l.split('\t')[1].split(' ')[0]))
+                except (IndexError, ValueError):
+                    pass
                 if not settings[k]:
                     settings[k] = [v]
-                    t_0 = int(l.split('\t')[1].split(' ')[0])
                 else:
                     if not v in settings[k]:
                         settings[k].append(v)
@@ -216,27 +229,86 @@ class StandardisationProcessDataEyelink:
         #----------------------------------------------------------------------
         # CalibrationList
         #----------------------------------------------------------------------
-        if settings['CalibrationList']:
-            k = 'CalibrationList'
-            for n, l in enumerate(settings[k]):
-                # calibration type
-                cali = l.split('VALIDATION ')[1].split(' ')[0]
-                # recorded eye
-                eye = l.split(' GOOD')[0].split(' ')[-1]
-                # maximal calibration error
-                max_ = float(l.split(' max')[0].split(' ')[-1])
-                # average_calibration_error
-                avg_ = float(l.split(' avg.')[0].split(' ')[-1])
-                # time relative to the first events of the event file
-                time = int(l.split('\t')[1].split(' ')[0]) - t_0
-                time /= settings['SamplingFrequency']
-
-                settings[k][n] = [cali, eye, max_, avg_, time]
+        self.calibrations = extract_calibrations(
+                        calibration_lines,
+                        self.extract_trialStarts_ascFile(filename, filepath))
+
+        # time relative to the first events of the event file
+        t_0 = start_timestamps[0] if start_timestamps else None
+
+        k = 'CalibrationList'
+        for c in self.calibrations:
+            if c['result']=='GOOD':
+                time = None
+                if t_0 is not None and settings['SamplingFrequency']:
+                    time = (c['timestamp'] - t_0)/settings['SamplingFrequency']
+                v = [c['type'], c['eye'], c['MaximalCalibrationError'],
+                     c['AverageCalibrationError'], time]
+                if not settings[k]: settings[k] = [v]
+                else: settings[k].append(v)
         #----------------------------------------------------------------------
 
         return settings
 
 
+    def extract_calibrations_ascFile(self, filename, filepath):
+
+        '''
+        Process a given run file (in .asc format) to extract the validations
+        of the calibrations as structured records
+
+        Parameters
+        ----------
+        filename: str
+            Name of the data file to be BIDSified
+        filepath: str
+            Path of the data file to be BIDSified
+
+        Returns
+        -------
+        calibrations: list
+            A dictionary list for each validation and each eye (see
+            :func:`Calibration.extract_calibrations`)
+        '''
+
+        # open file asc
+        file_asc = self.open_ascFile(filename, filepath)
+
+        calibration_lines = [l[:-1] for l in file_asc
+                             if is_calibration_line(l[:-1])]
+
+        del file_asc
+
+        return extract_calibrations(
+                        calibration_lines,
+                        self.extract_trialStarts_ascFile(filename, filepath))
+
+    def extract_trialStarts_ascFile(self, filename, filepath):
+
+        '''
+        Timestamps of the start of the trials of a given run file (in .asc
+        format), the trials of the events file (see
+        :meth:`extract_events_ascFile`)
+
+        Parameters
+        ----------
+        filename: str
+            Name of the data file to be BIDSified
+        filepath: str
+            Path of the data file to be BIDSified
+
+        Returns
+        -------
+        trial_starts: numpy.ndarray
+            Timestamps of the start of the trials
+        '''
+
+        messages = self.extract_messages_ascFile(filename, filepath)
+        trials = messages.trials(self.StartMessage, self.EndMessage)
+
+        return trials['start'][trials['terminated']]
+
+
     #--------------------------------------------------------------------------
     # data
     #--------------------------------------------------------------------------
@@ -260,8 +332,58 @@ class StandardisationProcessDataEyelink:
             those trials
         '''
 
+        line_formats, columns = self.extract_samples_ascFile(filename,
+                                                             filepath)
+
+        # missing values are None
+        values = []
+        for d in line_formats:
+            c = columns[d]
+            # recorded values of the single precision columns
+            if c.dtype.kind=='f' and c.dtype.itemsize<8:
+                c = c.astype(str).astype(np.float64)
+            v = c.tolist()
+            for i in np.flatnonzero(np.isnan(c)):
+                v[i] = None
+            values.append(v)
+
+        data = [dict(zip(line_formats, line)) for line in zip(*values)]
+
+        return data
+
+    def extract_samples_ascFile(self, filename, filepath):
+
+        '''
+        Process a given run file (in .asc format) to extract the samples
+        as arrays, one per column of the data file.
+
+        Parameters
+        ----------
+        filename: str
+            Name of the data file to be BIDSified
+        filepath: str
+            Path of the data file to be BIDSified
+
+        Returns
+        -------
+        line_formats, columns: list, Recording
+            ``line_formats`` is the list of the names of the columns.
+            ``columns`` is a mapping ``{name: array}`` of the columns of the
+            samples, views on a single buffer (memory-mapped from the parse
+            cache if the file is in the cache). Their types are given by the
+            dtype policy (see :func:`Recording.policy_dtypes`): integer
+            timestamps, single precision positions and pupil sizes. The
+            missing values are NaN
+        '''
+
         # open file asc
-        file_asc = open_file(filename, filepath)
+        file_asc = self.open_ascFile(filename, filepath)
+
+        # samples already parsed
+        digest, entry = self.file_cache
+        if entry:
+            columns = Recording.from_arrays(entry)
+            return columns.names, columns
 
 
         # Reminder for eyelink recordings
@@ -345,17 +467,19 @@ class StandardisationProcessDataEyelink:
         '''
 
         # extract data in the file asc
-        data = []
         line_formats = None
+        samples = []
 
         for line in file_asc:
 
-            l = line[:-1].split('\t')
+            key = line_key(line)
 
             # Search for line formats
             if not line_formats:
 
-                if l[0]=='SAMPLES':
+                if key=='SAMPLES':
+
+                    l = line[:-1].split('\t')
 
                     #line_formats = ["time"]
                     line_formats = ["eye_timestamp"]
@@ -396,18 +520,139 @@ class StandardisationProcessDataEyelink:
                         #line_formats.extend(["xr", "yr"])
                         line_formats.extend(["x_resolution", "y_resolution"])
 
-            try:
-                # add line in data
-                if int(l[0]):
-                    line = {}
-                    for n, d in enumerate(line_formats):
-                        try: line[d] = float(l[n])
-                        except: line[d] = None
-                    data.append(line)
-            except:
-                pass
+            elif key=='SAMPLE':
+                samples.append(line[:-1].split('\t'))
 
-        return data
+        del file_asc
+
+        if not line_formats:
+            return [], {}
+
+        # all the samples are converted at once
+        n = len(line_formats)
+        samples = [l[:n] if len(l)>=n else l+['']*(n-len(l))
+                   for l in samples]
+        samples = to_float(np.array(samples, dtype=str).reshape(-1, n))
+
+        # drops the lines whose timestamp is 0
+        samples = samples[samples[:, 0]!=0]
+
+        # the samples are copied once, in a buffer where each column is
+        #  contiguous, and converted to the types of the dtype policy
+        columns = {d: samples[:, i] for i, d in enumerate(line_formats)}
+        columns = Recording.from_columns(columns, policy_dtypes(columns))
+        del samples
+
+        # save the samples and the other lines in the parse cache (the last
+        #  line is kept, it may end the last trial)
+        if self.cache and digest:
+            file_asc = self.file_asc[1]
+            lines = [l for l in file_asc if not l[:1].isdigit()]
+            if file_asc and file_asc[-1][:1].isdigit():
+                lines.append(file_asc[-1])
+            lines = np.frombuffer(''.join(lines).encode(), dtype=np.uint8)
+            entry = dict(columns.to_arrays(), lines=lines)
+            self.cache.save(digest, entry)
+
+        return line_formats, columns
+
+    #--------------------------------------------------------------------------
+    # Eye movement events
+    #--------------------------------------------------------------------------
+    def extract_eyeMovementEvents_ascFile(self, filename, filepath):
+
+        '''
+        Process a given run file (in .asc format) to extract the eye
+        movement events (fixations, saccades and blinks) as a table.
+
+        The table is built from the 'EFIX', 'ESACC' and 'EBLINK' lines,
+        which contain all the information on the events:
+
+        |---------------------------------------------------------------------|
+        | Line   | Fields                                                     |
+        |--------|------------------------------------------------------------|
+        | EFIX   | eye start end duration mean_x mean_y pupil_size            |
+        | ESACC  | eye start end duration start_x start_y end_x end_y         |
+        |        |     amplitude peak_velocity                                |
+        | EBLINK | eye start end duration                                     |
+        |---------------------------------------------------------------------|
+
+        Parameters
+        ----------
+        filename: str
+            Name of the data file to be BIDSified
+        filepath: str
+            Path of the data file to be BIDSified
+
+        Returns
+        -------
+        columns: dict
+            Dictionary ``{name: array}`` of the columns of the table, with
+            one row per event sorted by start time: 'event' ('fixation',
+            'saccade' or 'blink'), 'eye' ('L' or 'R') and the columns of the
+            fields above (integer times, single precision positions and
+            pupil sizes, see :func:`Recording.policy_dtypes`), NaN when the
+            field does not exist for the event or is missing
+        '''
+
+        line_formats = {'EFIX': ('fixation',
+                                 ['start', 'end', 'duration', 'mean_x',
+                                  'mean_y', 'pupil_size']),
+                        'ESACC': ('saccade',
+                                  ['start', 'end', 'duration', 'start_x',
+                                   'start_y', 'end_x', 'end_y', 'amplitude',
+                                   'peak_velocity']),
+                        'EBLINK': ('blink',
+                                   ['start', 'end', 'duration'])}
+
+        names = ['start', 'end', 'duration', 'start_x', 'start_y', 'end_x',
+                 'end_y', 'mean_x', 'mean_y', 'amplitude', 'peak_velocity',
+                 'pupil_size']
+
+        # open file asc
+        file_asc = self.open_ascFile(filename, filepath)
+
+        # lines of each type of event, without their first token
+        lines = {e: [] for e in line_formats}
+        for line in file_asc:
+            e = line_key(line)
+            if e in lines:
+                lines[e].append(line.split()[1:])
+
+        del file_asc
+
+        # conversion of all the lines of each type of event at once
+        event, eye, values = [], [], []
+        for e, (name, fields) in line_formats.items():
+
+            n = len(fields)+1
+            rows = [l[:n] if len(l)>=n else l+['']*(n-len(l))
+                    for l in lines[e]]
+            rows = np.array(rows, dtype=str).reshape(-1, n)
+
+            v = np.full((len(rows), len(names)), np.nan)
+            v[:, [names.index(f) for f in fields]] = to_float(rows[:, 1:])
+
+            event.append(np.full(len(rows), name, dtype='U8'))
+            eye.append(rows[:, 0].astype('U1'))
+            values.append(v)
+
+        event = np.concatenate(event)
+        eye = np.concatenate(eye)
+        values = np.concatenate(values)
+
+        # sort the events by start time
+        order = np.argsort(values[:, 0], kind='stable')
+        values = np.ascontiguousarray(values[order].T)
+
+        columns = {'event': event[order], 'eye': eye[order]}
+        columns.update({k: values[i] for i, k in enumerate(names)})
+
+        dtypes = policy_dtypes(columns, EYE_MOVEMENT_DTYPE_POLICY)
+        columns = {k: c.astype(dtypes[k], copy=False)
+                   for k, c in columns.items()}
+
+        return columns
 
 
     #--------------------------------------------------------------------------
@@ -450,8 +695,8 @@ class StandardisationProcessDataEyelink:
         else:
             events = self.process.events_init()
 
-        # open file asc
-        file_asc = open_file(filename, filepath)
+        # table of the messages of the file
+        messages = self.extract_messages_ascFile(filename, filepath)
 
         saved_e = list(saved_events.keys())
 
@@ -460,8 +705,8 @@ class StandardisationProcessDataEyelink:
         #----------------------------------------------------------------------
         # add event names at saved_events
         #----------------------------------------------------------------------
-        for n, e in enumerate(["onset", "duration", "sample", "trial",
-                               "eventIdentifier"]):
+        trial_e = ["onset", "duration", "sample", "trial", "eventIdentifier"]
+        for n, e in enumerate(trial_e):
             if e not in saved_e:
                 saved_e.insert(n, e)
 
@@ -475,135 +720,114 @@ class StandardisationProcessDataEyelink:
                                           x[1]: {"Description": x[0]}}
         #----------------------------------------------------------------------
 
+        #----------------------------------------------------------------------
+        # trials
+        #----------------------------------------------------------------------
+        trials = messages.trials(self.StartMessage, self.EndMessage)
+
+        # the trials without EndMessage (interrupted recording) are ignored
+        if not trials['terminated'].all():
+            for t in trials['start'][~trials['terminated']]:
+                print("The trial starting at %d in %s has no EndMessage, it "
+                      "is ignored"%(t, filename))
+            trials = {k: v[trials['terminated']] for k, v in trials.items()}
+
+        events_trials = []
+        for t, identifier in zip(trials['start'].tolist(),
+                                 messages.identifier(trials['row'])):
+            events_trial = {e: None for e in saved_e}
+            events_trial["sample"] = t
+            events_trial["eventIdentifier"] = identifier
+            events_trials.append(events_trial)
+
+        # trial of each row of the table (-1 outside the trials)
+        row_trial = assign_trials(messages.offset, trials['start_offset'],
+                                  trials['end_offset'])
+        inside = row_trial>=0
 
-        # function initializing events_trial
-        def start_events(l, saved_e):
-
-            events_trial = {}
-            for e in saved_e:
-                events_trial[e] = None
-
-            t_start = int(l.split('\t', 1)[1].split(' ')[0])
-            events_trial["sample"] = t_start
-
-            event_ID = l.split('\t', 1)[1].split(' ', 1)[1]
-            events_trial["eventIdentifier"] = event_ID
-
-            return events_trial, t_start
-
+        #----------------------------------------------------------------------
+        # events of the trials
+        #----------------------------------------------------------------------
+        for event in saved_e:
 
-        # extract events in the file asc
-        started = False
-        trialend = False
+            if event in trial_e:
+                continue
 
-        t_0 = None
-        trial = 1
-        for line in file_asc:
+            rows = np.flatnonzero(messages.contains(event) & inside)
 
-            l = line[:-1]
+            for r, text, t in zip(rows, messages.text(rows),
+                                  messages.timestamp[rows].tolist()):
 
-            if not started:
+                events_trial = events_trials[row_trial[r]]
+                if not events_trial[event]:
+                    events_trial[event] = []
 
                 #--------------------------------------------------------------
-                # Check if the trial has started
+                # OtherEvents
                 #--------------------------------------------------------------
-                if self.StartMessage in line:
-                    # initialise events_trial
-                    events_trial, t_start = start_events(l, saved_e)
-                    if not t_0: t_0 = t_start
-                    started = True
-                #--------------------------------------------------------------
-
-            else:
+                if messages.kind[r]==MESSAGE:
+                    events_trial[event].append(t)
 
                 #--------------------------------------------------------------
-                # Check if the trial has finished
-                #--------------------------------------------------------------
-                if self.EndMessage != None:
-                    if self.EndMessage in line:
-                        started = False
-                        trialend = True
-                else:
-                    if self.StartMessage in line:
-                        started = True
-                        trialend = True
-                    if line==file_asc[-1]:
-                        started = False
-                        trialend = True
+                # EyeMovementEvents
                 #--------------------------------------------------------------
+                elif text.split(' ')[0]==event:
+                    l = text.split(' ')
+
+                    # Start
+                    if l[0][0]=='S':
+                        events_trial[event].append(int(l[-1]))
 
-                if trialend:
-
-                    try:
-                        t_end = int(l.split('\t', 1)[1].split(' ')[0])
-                    except:
-                        t_end = int(l.split('\t', 1)[1].split('\t')[0])
-                    events_trial["onset"] = (t_start-t_0)/1000
-                    events_trial["duration"] = (t_end-t_start)/1000
-                    events_trial["trial"] = trial
-
-                    for e in events_trial.keys():
-                        if type(events_trial[e])==list:
-                            if len(events_trial[e])==1:
-                                events_trial[e] = events_trial[e][0]
-
-                    #----------------------------------------------------------
-                    # add event of events_trial in events
-                    #----------------------------------------------------------
-                    add_event = False
-                    for i in range(len(events)):
-                        if 'trial' in events[i].keys():
-                            if float(events[i]['trial'])==float(trial):
-                                events[i] = dict(events[i], **events_trial)
-                                add_event = True
-                    if not add_event:
-                        events.append(events_trial)
-
-                    #----------------------------------------------------------
-                    # Check if the trial has started
-                    #----------------------------------------------------------
-                    if started:
-                        # initialise events_trial
-                        events_trial, t_start = start_events(l, saved_e)
-                    #----------------------------------------------------------
-
-                    trial += 1
-                    trialend = False
-
-
-            if started:
-
-                for event in saved_e:
-                    if event in line:
-                        if not events_trial[event]:
-                            events_trial[event] = []
-
-                        #------------------------------------------------------
-                        # EyeMovementEvents
-                        #------------------------------------------------------
-                        if l.split(' ')[0]==event:
-                            l = l.split(' ')
-
-                            # Start
-                            if l[0][0]=='S':
-                                e = int(l[-1])
-                                events_trial[event].append(e)
-
-                            # End
-                            elif l[0][0]=='E':
-                                for x in l:
-                                    if len(x.split('\t'))>1:
-                                        if x.split('\t')[1]!='':
-                                            e = float(x.split('\t')[1])
-                                            events_trial[event].append(e)
-
-                        #------------------------------------------------------
-                        # OtherEvents
-                        #------------------------------------------------------
-                        elif l.split('\t')[0]=="MSG":
-                            l = l.split('\t', 1)[1].split(' ')
-                            e = int(l[0])
-                            events_trial[event].append(e)
+                    # End
+                    elif l[0][0]=='E':
+                        for x in l:
+                            if len(x.split('\t'))>1:
+                                if x.split('\t')[1]!='':
+                                    e = float(x.split('\t')[1])
+                                    events_trial[event].append(e)
+
+        #----------------------------------------------------------------------
+        # add event of events_trial in events
+        #----------------------------------------------------------------------
+        t_0 = events_trials[0]["sample"] if events_trials else None
+
+        for trial, (events_trial, t_end) in enumerate(
+                                zip(events_trials, trials['end'].tolist()), 1):
+
+            t_start = events_trial["sample"]
+            events_trial["onset"] = (t_start-t_0)/1000
+            events_trial["duration"] = (t_end-t_start)/1000
+            events_trial["trial"] = trial
+
+            for e in events_trial.keys():
+                if type(events_trial[e])==list:
+                    if len(events_trial[e])==1:
+                        events_trial[e] = events_trial[e][0]
+
+            add_event = False
+            for i in range(len(events)):
+                if 'trial' in events[i].keys():
+                    if float(events[i]['trial'])==float(trial):
+                        events[i] = dict(events[i], **events_trial)
+                        add_event = True
+            if not add_event:
+                events.append(events_trial)
 
         return events, settingsEvents
 
+    #--------------------------------------------------------------------------
+    # Backend interface (see :class:`Backends.Backend`)
+    #--------------------------------------------------------------------------
+    def extract_settings(self, filename, filepath, settings):
+        return self.extract_settings_ascFile(filename, filepath, settings)
+
+    def extract_samples(self, filename, filepath):
+        return self.extract_samples_ascFile(filename, filepath)
+
+    def extract_events(self, filename, filepath, saved_events, settings=None,
+                       events=None):
+        return self.extract_events_ascFile(filename, filepath, saved_events,
+                                           settings, events)
+
+    def extract_eyeMovementEvents(self, filename, filepath):
+        return self.extract_eyeMovementEvents_ascFile(filename, filepath)
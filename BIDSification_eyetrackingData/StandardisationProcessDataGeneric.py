@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import numpy as np
+from .File import read_chunks, BLOCK_SIZE
+from .Backends import Backend, register_backend, DEFAULT_BACKEND
+
+
+@register_backend(DEFAULT_BACKEND, capabilities=['chunkable'])
+class StandardisationProcessDataGeneric(Backend):
+
+    '''
+    Processes to standardise the data of the eyetrackers without a dedicated
+    backend, recorded in tsv or csv files
+
+    The settings and the events of these data are only given by the settings
+    file, the information file and the events files of the data directory.
+
+    Parameters
+    ----------
+    dirpath: str
+        Path of the data directory to BIDSified
+    StartMessage: str
+        Message marking the start of the trial
+    EndMessage: str
+        Message marking the end of the trial
+    '''
+
+    def extract_samples(self, filename, filepath):
+
+        '''
+        Process a given run file (in .tsv or .csv format) to extract the
+        samples as arrays, one per column of the data file.
+
+        Parameters
+        ----------
+        filename: str
+            Name of the data file to be BIDSified
+        filepath: str
+            Path of the data file to be BIDSified
+
+        Returns
+        -------
+        line_formats, columns: list, dict
+            ``line_formats`` is the list of the names of the columns.
+            ``columns`` is a dictionary ``{name: array}`` of the columns of
+            the samples, with the fields as they are written in the data
+            file (see :func:`File.to_typed` for their types)
+        '''
+
+        line_formats, chunks = [], []
+        for line_formats, columns in self.iter_samples(filename, filepath):
+            chunks.append(columns)
+
+        columns = {d: np.concatenate([c[d] for c in chunks])
+                   for d in line_formats}
+
+        return line_formats, columns
+
+    def iter_samples(self, filename, filepath, chunksize=BLOCK_SIZE):
+
+        '''
+        Process a given run file (in .tsv or .csv format) to extract the
+        samples by chunks. The delimiter of the file is sniffed (see
+        :func:`File.read_chunks`).
+
+        Parameters
+        ----------
+        filename: str
+            Name of the data file to be BIDSified
+        filepath: str
+            Path of the data file to be BIDSified
+        chunksize: int (default BLOCK_SIZE)
+            Number of samples per chunk
+
+        Yields
+        ------
+        line_formats, columns: list, dict
+            The samples of a chunk (see :meth:`extract_samples`)
+        '''
+
+        for columns in read_chunks(filename, filepath, chunksize):
+            yield list(columns.keys()), columns
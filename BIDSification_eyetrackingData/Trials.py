@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+
+def pair_trials(starts, ends=None, stop=None):
+
+    '''
+    Pair the starts and the ends of the trials
+
+    The positions are the positions of the markers in the recording (for
+    example the index of their line in the file, which orders the markers
+    of the same timestamp). A trial starts at the first start marker after
+    the end of the previous trial, and ends at the first end marker after
+    its start: the start markers inside a trial are ignored. If ``ends`` is
+    None, each start marker starts a trial, which ends at the next start
+    marker (or at ``stop`` for the last trial).
+
+    The trials without an end marker are not dropped but returned as
+    unterminated, ending at ``stop``, so the caller decides what to do
+    with them.
+
+    Parameters
+    ----------
+    starts: numpy.ndarray
+        Sorted positions of the start markers
+    ends: numpy.ndarray or None (default None)
+        Sorted positions of the end markers, None if the trials are ended by
+        the start of the next trial
+    stop: int or None (default None)
+        Position of the end of the recording, the start markers at or after
+        this position are ignored
+
+    Returns
+    -------
+    index, end, terminated: numpy.ndarray, numpy.ndarray, numpy.ndarray
+        ``index`` is the index in ``starts`` of the start of each trial,
+        ``end`` the position of the end of each trial (``stop``, or -1 if
+        ``stop`` is None, for the unterminated trials) and ``terminated``
+        False for the trials without an end marker
+    '''
+
+    starts = np.asarray(starts, dtype=np.int64)
+    if stop is not None:
+        starts = starts[starts<stop]
+    stop = -1 if stop is None else stop
+
+    #--------------------------------------------------------------------------
+    # trials ended by the next start
+    #--------------------------------------------------------------------------
+    if ends is None:
+        index = np.arange(len(starts))
+        end = np.append(starts[1:], stop)
+        terminated = end>=0
+        return index, end, terminated
+
+    #--------------------------------------------------------------------------
+    # trials ended by an end marker
+    #--------------------------------------------------------------------------
+    ends = np.asarray(ends, dtype=np.int64)
+
+    # first end after each start, then first start after this end
+    j = np.searchsorted(ends, starts, side='right')
+    terminated = j<len(ends)
+    end = np.full(len(starts), stop, dtype=np.int64)
+    end[terminated] = ends[j[terminated]]
+    following = np.where(terminated,
+                         np.searchsorted(starts, end, side='right'),
+                         len(starts))
+
+    # the trials are the chain of the starts following the first one, it is
+    #  only walked through once per trial
+    index = []
+    i = 0
+    while i<len(starts):
+        index.append(i)
+        i = following[i]
+    index = np.array(index, dtype=np.int64)
+
+    return index, end[index], terminated[index]
+
+def assign_trials(values, starts, ends, closed=False):
+
+    '''
+    Trial of each value (sample timestamp, message position ...)
+
+    Parameters
+    ----------
+    values: numpy.ndarray
+        Values to be assigned
+    starts: numpy.ndarray
+        Start of each trial, in the unit of ``values``
+    ends: numpy.ndarray
+        End of each trial
+    closed: bool (default False)
+        The ends belong to the trials, otherwise the trials are
+        ``[start, end)``
+
+    Returns
+    -------
+    trial: numpy.ndarray
+        Index of the trial of each value (the last trial started before
+        the value), -1 for the values outside the trials
+    '''
+
+    values = np.asarray(values)
+    starts = np.asarray(starts)
+    ends = np.asarray(ends)
+
+    if not len(starts):
+        return np.full(len(values), -1, dtype=np.int64)
+
+    order = np.argsort(starts, kind='stable')
+    i = np.searchsorted(starts[order], values, side='right')-1
+    trial = np.where(i>=0, order[np.maximum(i, 0)], -1)
+
+    inside = trial>=0
+    if closed:
+        inside[inside] = values[inside]<=ends[trial[inside]]
+    else:
+        inside[inside] = values[inside]<ends[trial[inside]]
+    trial[~inside] = -1
+
+    return trial
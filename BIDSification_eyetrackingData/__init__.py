@@ -1,8 +1,73 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import sys
+import types
+import importlib
+
 version__ = "0.0.1"
 
-from .StandardisationProcess import *
-from .StandardisationProcessDataEyelink import *
-from .DataStandardisation import *
+# The modules of the package are only imported when one of their names is
+#  used (PEP 562), so importing the package (for example to run its command
+#  line) does not import numpy.
+# {module: names of the module in the namespace of the package}
+_modules = {
+    'StandardisationProcess': ['InfoFilesError', 'settingsEventsError',
+                               'StandardisationProcess'],
+    # 'os' and 'np' were exported by the star imports of the first release
+    'File': ['open_file', 'save_file', 'os', 'np'],
+    'Backends': ['BACKENDS', 'DEFAULT_BACKEND', 'register_backend',
+                 'get_backend', 'Backend'],
+    'StandardisationProcessDataEyelink': ['StandardisationProcessDataEyelink'],
+    'MessageTable': ['MessageTable'],
+    'StandardisationProcessDataGeneric': ['StandardisationProcessDataGeneric'],
+    'DataStandardisation': ['DataStandardisation'],
+    'DataReader': ['DataReader'],
+    'Epochs': ['event_onsets', 'epoch_data'],
+    'Trials': ['pair_trials', 'assign_trials'],
+    'Recording': ['Recording'],
+    'Masks': ['TRACKING_LOSS', 'BLINK', 'OUT_OF_SCREEN', 'sample_flags',
+              'flag_mask'],
+}
+
+# {name: module}
+_names = {n: m for m, names in _modules.items() for n in names}
+
+__all__ = list(_names)
+
+
+def __getattr__(name):
+
+    if name in _names:
+        value = getattr(importlib.import_module('.'+_names[name], __name__),
+                        name)
+    else:
+        # submodules (for example ``File``)
+        try:
+            value = importlib.import_module('.'+name, __name__)
+        except ModuleNotFoundError as e:
+            if e.name!=__name__+'.'+name:
+                raise
+            raise AttributeError("module %r has no attribute %r"%(
+                                 __name__, name)) from None
+
+    globals()[name] = value
+
+    return value
+
+def __dir__():
+
+    return sorted(set(globals()) | set(_names))
+
+
+class _Package(types.ModuleType):
+
+    # Most modules have the name of their main class: the import system does
+    #  not bind these modules in the namespace of the package, so the name
+    #  remains the class (as with the star imports of the modules).
+    def __setattr__(self, name, value):
+        if name in _names and isinstance(value, types.ModuleType):
+            return
+        super().__setattr__(name, value)
+
+sys.modules[__name__].__class__ = _Package
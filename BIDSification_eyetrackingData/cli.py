@@ -0,0 +1,217 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import json
+import argparse
+
+
+# files of the data directory used if they exist and are not given
+DEFAULT_FILES = {'settings': 'settings.json',
+                 'settings_events': 'settingsEvents.json'}
+
+
+def shard_type(value):
+
+    '''
+    Type of the ``--shard`` argument: 'i/N' for the shard i (from 0 to N-1)
+    of N shards
+    '''
+
+    try:
+        i, n = (int(x) for x in value.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError("shard must be i/N, not '%s'"%value)
+    if not 0<=i<n:
+        raise argparse.ArgumentTypeError("shard %d does not exist in %d "
+                                         "shards"%(i, n))
+    return i, n
+
+def parse_args(argv=None):
+
+    '''
+    Parse the arguments of the command line
+
+    Parameters
+    ----------
+    argv: list or None (default None)
+        Arguments of the command line, ``sys.argv[1:]`` if None
+
+    Returns
+    -------
+    args: argparse.Namespace
+    '''
+
+    parser = argparse.ArgumentParser(
+                prog='bidsify-eyetrack',
+                description="Arrange the eyetracking data of a directory in "
+                            "BIDS format")
+
+    parser.add_argument('path_oldData',
+                        help="path of the data directory to BIDSified")
+    parser.add_argument('path_newData',
+                        help="path of the new BIDS data directory")
+
+    # files of the data directory
+    parser.add_argument('--infofiles', default='infoFiles.tsv',
+                        help="name of the file containing the information "
+                             "on the files to be BIDSified "
+                             "(default: %(default)s)")
+    parser.add_argument('--settings', default=None,
+                        help="name of the file containing the settings of "
+                             "the data (default: %s if it exists)"%(
+                             DEFAULT_FILES['settings']))
+    parser.add_argument('--settings-events', default=None,
+                        help="name of the file containing the events "
+                             "settings (default: %s if it exists, otherwise "
+                             "it is searched among the json files)"%(
+                             DEFAULT_FILES['settings_events']))
+    parser.add_argument('--dataset-description',
+                        default='dataset_description.json',
+                        help="name of the file describing the dataset "
+                             "(default: %(default)s)")
+    parser.add_argument('--saved-events', default=None,
+                        help="name of a json file of the data directory "
+                             "containing the events to be extracted from the "
+                             "trials and their descriptions")
+
+    # data
+    parser.add_argument('--eyetracktype', default='Eyelink',
+                        help="type of eyetracker (default: %(default)s)")
+    parser.add_argument('--dataformat', default='.asc',
+                        help="format of the data files "
+                             "(default: %(default)s)")
+    parser.add_argument('--start-message', default='TRIALID',
+                        help="message marking the start of the trials "
+                             "(default: %(default)s)")
+    parser.add_argument('--end-message', default=None,
+                        help="message marking the end of the trials")
+
+    # outputs
+    parser.add_argument('--output-format', action='append',
+                        choices=['npy', 'parquet'], default=[],
+                        dest='output_formats',
+                        help="additional format of the data files, can be "
+                             "repeated")
+    parser.add_argument('--compresslevel', type=int, default=9,
+                        choices=range(10), metavar='{0..9}',
+                        help="compression level of the .tsv.gz files "
+                             "(default: %(default)s)")
+    parser.add_argument('--precision', type=int, default=None,
+                        help="number of decimals of the floats in the "
+                             "tsv.gz files, by default the floats are written "
+                             "as they were recorded")
+    parser.add_argument('--masks', action='store_true',
+                        help="add a sample_flags column to the data files, "
+                             "flagging the samples of tracking loss, in a "
+                             "blink or outside the screen")
+    parser.add_argument('--eye-movement-events', action='store_true',
+                        help="save the eye movement events of each data "
+                             "file")
+    parser.add_argument('--summary', action='store_true',
+                        help="save summary statistics of each trial")
+    parser.add_argument('--inheritance', action='store_true',
+                        help="save the sidecar json files following the BIDS "
+                             "inheritance principle")
+    parser.add_argument('--fsync', action='store_true',
+                        help="synchronise each file to disk after writing it")
+
+    # run
+    parser.add_argument('-j', '--workers', type=int, default=1,
+                        help="number of processes converting the data files "
+                             "in parallel (default: %(default)s)")
+    parser.add_argument('--incremental', action='store_true',
+                        help="do not convert again the data files whose "
+                             "BIDSified files are up to date")
+    parser.add_argument('-n', '--dry-run', action='store_true',
+                        help="only check the files to be BIDSified, without "
+                             "writing anything")
+    parser.add_argument('--shard', type=shard_type, default=None,
+                        metavar='i/N',
+                        help="only BIDSify the shard i (from 0 to N-1) of a "
+                             "partition of the files in N shards balanced "
+                             "by size, for example $SLURM_ARRAY_TASK_ID/N")
+    parser.add_argument('--cache-dir', default=None,
+                        help="directory of a cache of the parsed data files, "
+                             "shared by the runs on the same data")
+    parser.add_argument('--cache-size', type=int, default=1024,
+                        help="maximal size of the cache in MiB "
+                             "(default: %(default)s)")
+    parser.add_argument('--finalize', action='store_true',
+                        help="merge the results of the shards once they "
+                             "are all done")
+
+    args = parser.parse_args(argv)
+
+    for k, filename in DEFAULT_FILES.items():
+        if getattr(args, k) is None and \
+           os.path.isfile(os.path.join(args.path_oldData, filename)):
+            setattr(args, k, filename)
+
+    return args
+
+def main(argv=None):
+
+    '''
+    Entry point of the ``bidsify-eyetrack`` command
+
+    Parameters
+    ----------
+    argv: list or None (default None)
+        Arguments of the command line, ``sys.argv[1:]`` if None
+
+    Returns
+    -------
+    status: int
+        0 if the data were BIDSified (or can be, with ``--dry-run``), 1 if
+        source files are missing
+    '''
+
+    args = parse_args(argv)
+
+    saved_events = {}
+    if args.saved_events:
+        with open(os.path.join(args.path_oldData, args.saved_events)) as f:
+            saved_events = json.load(f)
+
+    # the package (and numpy) is only imported once the arguments are valid
+    from .DataStandardisation import DataStandardisation
+
+    process = DataStandardisation(
+                        path_oldData=args.path_oldData,
+                        path_newData=args.path_newData,
+                        infofilesname=args.infofiles,
+                        settingsfilename=args.settings,
+                        settingsEventsfilename=args.settings_events,
+                        datasetdescriptionfilename=args.dataset_description,
+                        eyetracktype=args.eyetracktype,
+                        dataformat=args.dataformat,
+                        saved_events=saved_events,
+                        StartMessage=args.start_message,
+                        EndMessage=args.end_message,
+                        fsync=args.fsync,
+                        output_formats=args.output_formats,
+                        eyeMovementEvents=args.eye_movement_events,
+                        summary=args.summary,
+                        inheritance=args.inheritance,
+                        compresslevel=args.compresslevel,
+                        workers=args.workers,
+                        incremental=args.incremental,
+                        dry_run=args.dry_run,
+                        shard=args.shard,
+                        finalize=args.finalize,
+                        cache_dir=args.cache_dir,
+                        cache_size=args.cache_size*1024**2,
+                        precision=args.precision,
+                        masks=args.masks)
+
+    if process.report and any(r['status']=='missing'
+                              for r in process.report):
+        return 1
+
+    return 0
+
+
+if __name__=='__main__':
+    sys.exit(main())
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''
+Benchmark of the import time of the package and of the startup time of its
+command line
+
+Each measure is made in a new python process. The script fails (exit status
+1) if importing the package imports numpy, or if the median import time is
+above ``--max-ms``.
+
+Usage: ``python benchmarks/import_time.py [--repeat 10] [--max-ms 50]``
+'''
+
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+import statistics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# code run in the new process: time of the import and heavy modules imported
+IMPORT = '''
+import sys, time, json
+t = time.perf_counter()
+import BIDSification_eyetrackingData
+t = time.perf_counter() - t
+print(json.dumps({'time': t, 'numpy': 'numpy' in sys.modules}))
+'''
+
+
+def run(code):
+
+    '''
+    Run python code in a new process, from the root of the repository
+
+    Parameters
+    ----------
+    code: list
+        Arguments of the python interpreter
+
+    Returns
+    -------
+    stdout, duration: str, float
+        Output of the process and duration of the process in seconds
+    '''
+
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    t = time.perf_counter()
+    stdout = subprocess.run([sys.executable]+code, env=env, cwd=ROOT,
+                            check=True, capture_output=True,
+                            text=True).stdout
+    return stdout, time.perf_counter() - t
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--repeat', type=int, default=10,
+                        help="number of measures (default: %(default)s)")
+    parser.add_argument('--max-ms', type=float, default=50,
+                        help="maximal median import time of the package in "
+                             "milliseconds (default: %(default)s)")
+    args = parser.parse_args()
+
+    imports, numpy, cli = [], False, []
+    for _ in range(args.repeat):
+        stdout, _ = run(['-c', IMPORT])
+        result = json.loads(stdout)
+        imports.append(result['time']*1000)
+        numpy |= result['numpy']
+
+        _, duration = run(['-m', 'BIDSification_eyetrackingData.cli',
+                           '--help'])
+        cli.append(duration*1000)
+
+    print('import BIDSification_eyetrackingData: %.1f ms (median of %d)'%(
+          statistics.median(imports), args.repeat))
+    print('bidsify-eyetrack --help: %.1f ms (median of %d, whole process)'%(
+          statistics.median(cli), args.repeat))
+
+    failed = False
+    if numpy:
+        print('FAILED: importing the package imports numpy')
+        failed = True
+    if statistics.median(imports)>args.max_ms:
+        print('FAILED: import time above %.1f ms'%args.max_ms)
+        failed = True
+
+    return 1 if failed else 0
+
+
+if __name__=='__main__':
+    sys.exit(main())
@@ -1,19 +1,28 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import re
 from setuptools import setup, find_packages
 
-import BIDSification_eyetrackingData
+# version of the package, read without importing it
+with open('BIDSification_eyetrackingData/__init__.py') as f:
+    version = re.search(r'^version__ = [\'"]([^\'"]+)[\'"]', f.read(),
+                        re.M)[1]
 
 setup(
     name='BIDSification_eyetrackingData',
-    version=BIDSification_eyetrackingData.version__,
+    version=version,
     packages=find_packages(),
     author="",
     author_email="",
     description="allows automatic arrangement of eye data in BIDS format",
     long_description=open('README.md').read(),
     include_package_data=True,
+    entry_points={
+        'console_scripts': [
+            'bidsify-eyetrack=BIDSification_eyetrackingData.cli:main',
+        ],
+    },
     url='',
     classifiers=[
         "Programming Language :: Python",
@@ -0,0 +1,178 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Generation of the asc files of the tests, with the lines of the eyelink
+#  recordings (header, calibrations, messages, eye movement events, samples)
+
+import json
+import random
+
+
+HEADER = ["** CONVERTED FROM D:\\data\\OP.edf using edfapi 3.1 Win32 Apr 13 "
+          "2011 on Thu Oct 26 12:18:23 2017",
+          "** DATE: Thu Oct 26 12:18:23 2017",
+          "** TYPE: EDF_FILE BINARY EVENT SAMPLE TAGGED",
+          "** VERSION: EYELINK II 1",
+          "** SOURCE: EYELINK CL",
+          "** EYELINK II CL v5.01 Jan 16 2014",
+          "** CAMERA: Eyelink GL Version 1.2 Sensor=AI7",
+          "** SERIAL NUMBER: CLG-BAF38",
+          "** CAMERA_CONFIG: BAF38200.SCD",
+          "**",
+          ""]
+
+def calibration_lines(t, eye='RIGHT'):
+
+    e = eye[0]
+    return ["MSG\t%d !CAL CALIBRATION HV9 %s %s  GOOD"%(t, e, eye),
+            ">>>>>>> CALIBRATION (HV9,P-CR) FOR %s: <<<<<<<<<"%eye,
+            "MSG\t%d VALIDATE %s POINT 0  %s  at 640,512  OFFSET 0.21 deg.  "
+            "4.3,-7.2 pix."%(t+50, e, eye),
+            "MSG\t%d VALIDATE %s POINT 1  %s  at 640,92  OFFSET 0.40 deg.  "
+            "-8.1,12.2 pix."%(t+60, e, eye),
+            "MSG\t%d !CAL VALIDATION HV9 %s %s GOOD ERROR 0.32 avg. 0.64 max  "
+            "OFFSET 0.15 deg. -2.1,5.3 pix."%(t+100, e, eye)]
+
+def asc_lines(ntrials=6, binocular=False, velocity=False, end_message=True,
+              seed=0, t0=9052000):
+
+    '''
+    Lines of an asc file of ``ntrials`` trials, starting with 'TRIALID <n>'
+    and ending with 'TRIAL OK' (if ``end_message``), with events
+    'StimulusOn', 'StimulusOff', 'TargetOn' and 'TargetOff', a fixation and
+    a saccade per trial, and a blink in one trial out of three. The x
+    positions of the samples may be out of the screen (1280x1024).
+    '''
+
+    rng = random.Random(seed)
+    neyes = 2 if binocular else 1
+    eye = 'LEFT\tRIGHT' if binocular else 'RIGHT'
+
+    t = t0
+    lines = list(HEADER)
+    lines += ["MSG\t%d DISPLAY_COORDS 0 0 1279 1023"%t]
+    lines += calibration_lines(t-500)
+    lines += ["MSG\t%d RECCFG CR 1000 2 1 R"%t,
+              "MSG\t%d GAZE_COORDS 0.00 0.00 1279.00 1023.00"%t,
+              "MSG\t%d ELCL_PROC ELLIPSE (5)"%t,
+              "START\t%d \t%s\tSAMPLES\tEVENTS"%(t, eye.replace('\t', ' ')),
+              "PRESCALER\t1",
+              "VPRESCALER\t1",
+              "PUPIL\tAREA",
+              "EVENTS\tGAZE\t%s\tRATE\t1000.00\tTRACKING\tCR\tFILTER\t2"%eye,
+              "SAMPLES\tGAZE\t%s\t%sRATE\t1000.00\tTRACKING\tCR\tFILTER\t2"%(
+                                            eye, 'VEL\t' if velocity else '')]
+
+    for trial in range(ntrials):
+
+        t += rng.randint(200, 800)
+        lines.append("MSG\t%d TRIALID %d"%(t, trial))
+
+        duration = rng.randint(500, 1500)
+        messages = {t+100: 'StimulusOn', t+200: 'StimulusOff',
+                    t+300: 'TargetOn', t+duration-50: 'TargetOff'}
+        fixation = (t+20, t+350)
+        saccade = (t+351, t+380)
+        blink = (t+400, t+480) if trial%3==0 else None
+
+        for ts in range(t, t+duration):
+
+            if ts in messages:
+                lines.append("MSG\t%d %s"%(ts, messages[ts]))
+            if ts==fixation[0]:
+                lines.append("SFIX R   %d"%ts)
+            if ts==fixation[1]:
+                lines.append("EFIX R   %d\t%d\t%d\t  641.2\t  513.1\t   1230"%(
+                             fixation[0], ts, ts-fixation[0]+1))
+            if ts==saccade[0]:
+                lines.append("SSACC R  %d"%ts)
+            if ts==saccade[1]:
+                lines.append("ESACC R  %d\t%d\t%d\t  641.2\t  513.1\t  "
+                             "800.4\t  510.2\t   4.12\t    345"%(
+                             saccade[0], ts, ts-saccade[0]+1))
+            if blink and ts==blink[0]:
+                lines.append("SBLINK R %d"%ts)
+            if blink and ts==blink[1]:
+                lines.append("EBLINK R %d\t%d\t%d"%(blink[0], ts,
+                                                    ts-blink[0]+1))
+            if ts==t+450:
+                lines.append("INPUT\t%d\t0"%ts)
+
+            if blink and blink[0]<=ts<=blink[1]:
+                values = ['   .', '   .', '    0.0']*neyes
+                if velocity:
+                    values += ['  .', '  .']*neyes
+            else:
+                values = []
+                for _ in range(neyes):
+                    values += ['%7.1f'%rng.uniform(-20, 1300),
+                               '%7.1f'%rng.uniform(0, 1030),
+                               '%7.1f'%rng.uniform(800, 1500)]
+                if velocity:
+                    values += ['%7.1f'%rng.uniform(-50, 50)
+                               for _ in range(2*neyes)]
+            lines.append("%d\t"%ts + '\t'.join(values) + "\t...")
+
+        if end_message:
+            lines.append("MSG\t%d TRIAL OK"%(t+duration))
+        t += duration
+
+    lines.append("END\t%d \tSAMPLES\tEVENTS\tRES\t  38.00\t  35.00"%t)
+
+    return lines
+
+def write_asc(filename, lines):
+
+    with open(filename, 'w') as f:
+        f.write('\n'.join(lines)+'\n')
+
+SETTINGS = {'TaskName': 'task', 'EnvironmentCoordinates': 'top-left',
+            'ScreenSize': [37, 29.5], 'ScreenDistance': 57,
+            'SampleCoordinateUnit': 'pixel',
+            'SampleCoordinateSystem': 'gaze-on-screen'}
+
+SAVED_EVENTS = {'StimulusOn': {'Description': 'stimulus on'},
+                'StimulusOff': {'Description': 'stimulus off'},
+                'TargetOn': {'Description': 'target on'},
+                'TargetOff': {'Description': 'target off'}}
+
+def write_dataset(dirpath, recordings):
+
+    '''
+    Data directory of asc files, with its information file, settings file
+    and dataset description
+
+    ``recordings`` is a dictionary ``{filename: (participant_id, lines)}``,
+    the recordings are numbered by run
+    '''
+
+    info = ['filename filepath eventsfilename participant_id ses task acq '
+            'run']
+    for run, (filename, (participant_id, lines)) in enumerate(
+                                                    recordings.items(), 1):
+        write_asc(dirpath/filename, lines)
+        info.append('%s   %s    %d'%(filename, participant_id, run))
+    (dirpath/'infoFiles.tsv').write_text('\n'.join(info)+'\n')
+
+    (dirpath/'settings.json').write_text(json.dumps(SETTINGS))
+    (dirpath/'dataset_description.json').write_text(json.dumps(
+                                {'Name': 'dataset', 'BIDSVersion': '1.8.1'}))
+
+def convert(path_oldData, path_newData, **options):
+
+    '''
+    BIDSification of a data directory written by :func:`write_dataset`
+    '''
+
+    from BIDSification_eyetrackingData import DataStandardisation
+
+    return DataStandardisation(path_oldData=str(path_oldData),
+                        path_newData=str(path_newData),
+                        infofilesname='infoFiles.tsv',
+                        settingsfilename='settings.json',
+                        settingsEventsfilename='settingsEvents.json',
+                        datasetdescriptionfilename='dataset_description.json',
+                        eyetracktype='Eyelink', dataformat='.asc',
+                        saved_events=dict(SAVED_EVENTS),
+                        StartMessage='TRIALID', EndMessage='TRIAL OK',
+                        **options)
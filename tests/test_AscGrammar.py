@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from BIDSification_eyetrackingData.AscGrammar import line_key, \
+                                                    SETTINGS_GRAMMAR
+from BIDSification_eyetrackingData.StandardisationProcessDataEyelink import \
+                                            StandardisationProcessDataEyelink
+import baseline_eyelink
+from asc_data import asc_lines, write_asc
+
+
+VARIANTS = {'monocular': dict(),
+            'binocular': dict(binocular=True),
+            'velocity': dict(velocity=True, seed=1),
+            'no_end_message': dict(end_message=False, seed=2)}
+
+# messages and other lines containing the keywords of the settings, which
+#  do not change the settings of the recording
+EXTRA_LINES = ["MSG\t9052001 user CALIBRATION start now",
+               "MSG\t9052002 FRAME RATE\t60",
+               "MSG\t9052003 display FILTER\t0",
+               "MSG\t9052004 stimulus VERSION: x",
+               "MSG\t9052005 note ** EYELINK 1000",
+               "MSG\t9052006 SERIAL NUMBER: 1 CAMERA: 2",
+               "MSG\t9052007 old GAZE_COORDS 0 0 799 599",
+               "INPUT\t9052009 RATE\t500\tFILTER\t1"]
+
+def settings(process, tmp_path, lines):
+
+    write_asc(tmp_path/'data.asc', lines)
+    return process.extract_settings_ascFile('data.asc', str(tmp_path))
+
+@pytest.mark.parametrize('variant', VARIANTS)
+@pytest.mark.parametrize('EndMessage', ['TRIAL OK', None])
+def test_settings_baseline(tmp_path, variant, EndMessage):
+
+    lines = asc_lines(**VARIANTS[variant])
+
+    baseline = baseline_eyelink.StandardisationProcessDataEyelink(
+                                        str(tmp_path), 'TRIALID', EndMessage)
+    process = StandardisationProcessDataEyelink(str(tmp_path), 'TRIALID',
+                                                EndMessage)
+
+    assert settings(process, tmp_path, lines)== \
+           settings(baseline, tmp_path, lines)
+
+@pytest.mark.parametrize('position', [0, 30, -1])
+def test_settings_extra_lines(tmp_path, position):
+
+    lines = asc_lines()
+    process = StandardisationProcessDataEyelink(str(tmp_path), 'TRIALID',
+                                                'TRIAL OK')
+    expected = settings(process, tmp_path, lines)
+
+    lines[position:position] = EXTRA_LINES
+
+    assert settings(process, tmp_path, lines)==expected
+
+def test_calibration_type(tmp_path):
+
+    process = StandardisationProcessDataEyelink(str(tmp_path), 'TRIALID',
+                                                'TRIAL OK')
+    s = settings(process, tmp_path, asc_lines())
+
+    # the last line containing 'CALIBRATION' gives the calibration type
+    assert s['CalibrationType']=='(HV9,P-CR)'
+    assert s['ScreenResolution']==[1280.0, 1024.0]
+    assert s['SamplingFrequency']==1000.0
+    assert s['RawDataFilters']=='extra'
+    assert s['RecordedEye']=='Right'
+
+@pytest.mark.parametrize('line, key', [
+        ("9052000\t  641.2\t  513.1\t   1230\t...", 'SAMPLE'),
+        ("MSG\t9052000 TRIALID 3", 'MSG TRIALID'),
+        ("MSG\t9052000 -12 TRIALID 3", 'MSG TRIALID'),
+        ("EFIX R   9052020\t9052350\t331", 'EFIX'),
+        ("SAMPLES\tGAZE\tRIGHT", 'SAMPLES'),
+        (">>>>>>> CALIBRATION (HV9,P-CR) FOR RIGHT: <<<<<<<<<", '>>>>>>>')])
+def test_line_key(line, key):
+
+    assert line_key(line)==key
+
+@pytest.mark.parametrize('line', ["9052000\tRATE\t500",
+                                  "MSG\t9052000 FRAME RATE\t60",
+                                  "BUTTON\t9052000 RATE\t60"])
+def test_rules_of_key(line):
+
+    # the rules of the settings are only applied to the lines of their key
+    settings = {'SamplingFrequency': None}
+    SETTINGS_GRAMMAR.parse_line(line, settings)
+
+    assert settings['SamplingFrequency'] is None
+
+def test_header_settings():
+
+    settings = {}
+    for line in ["** EYELINK II CL v5.01 Jan 16 2014",
+                 "** VERSION: EYELINK II 1", "** SERIAL NUMBER: CLG-BAF38",
+                 "** CAMERA: Eyelink GL Version 1.2 Sensor=AI7",
+                 "** CAMERA_CONFIG: BAF38200.SCD",
+                 "EVENTS\tGAZE\tRIGHT\tRATE\t 500.00\tTRACKING\tCR\t"
+                 "FILTER\t1"]:
+        SETTINGS_GRAMMAR.parse_line(line, settings)
+
+    assert settings=={'ManufacturersModelName': 'EYELINK II CL v5.01 Jan 16 '
+                                                '2014',
+                      'SoftwareVersion': 'EYELINK II 1',
+                      'DeviceSerialNumber': 'CLG-BAF38',
+                      'EyeCameraSettings': 'Eyelink GL Version 1.2 '
+                                           'Sensor=AI7',
+                      'SamplingFrequency': 500.0,
+                      'RawDataFilters': 'standard'}
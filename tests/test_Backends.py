@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import numpy as np
+import pytest
+
+from BIDSification_eyetrackingData import Backends
+from BIDSification_eyetrackingData.Backends import Backend, get_backend, \
+                                                   register_backend
+from BIDSification_eyetrackingData.StandardisationProcessDataEyelink import \
+                                            StandardisationProcessDataEyelink
+from BIDSification_eyetrackingData.StandardisationProcessDataGeneric import \
+                                            StandardisationProcessDataGeneric
+from BIDSification_eyetrackingData.File import read_gz_index
+from asc_data import SETTINGS
+
+
+# backend of data files of lines 'timestamp x'
+class ToyBackend(Backend):
+
+    def extract_settings(self, filename, filepath, settings):
+        settings['Manufacturer'] = 'Toy'
+        return settings
+
+    def extract_samples(self, filename, filepath):
+        values = np.loadtxt(os.path.join(filepath, filename), ndmin=2)
+        columns = {'eye_timestamp': values[:, 0].astype(np.int64),
+                   'eye1_x_coordinate': values[:, 1]}
+        return list(columns), columns
+
+    def extract_events(self, filename, filepath, saved_events,
+                       settings=None, events=None):
+        return [dict(onset=0.0, duration=0.002, trial=1)], {}
+
+
+@pytest.fixture
+def backends(monkeypatch):
+
+    # the backends registered by the tests are removed after them
+    monkeypatch.setattr(Backends, 'BACKENDS', dict(Backends.BACKENDS))
+
+    return Backends.BACKENDS
+
+def test_get_backend():
+
+    # the backends provided with the package, the generic backend for the
+    #  other eyetrackers
+    assert get_backend('Eyelink') is StandardisationProcessDataEyelink
+    assert get_backend('Tobii') is StandardisationProcessDataGeneric
+
+    assert StandardisationProcessDataEyelink.capabilities== \
+           {'settings', 'events', 'eyeMovementEvents', 'sourcefile',
+            'indexable'}
+    assert StandardisationProcessDataGeneric.capabilities=={'chunkable'}
+    assert StandardisationProcessDataGeneric.eyetracktype== \
+           Backends.DEFAULT_BACKEND
+
+def convert(dirpath, path_newData):
+
+    from BIDSification_eyetrackingData import DataStandardisation
+
+    DataStandardisation(path_oldData=str(dirpath),
+                        path_newData=str(path_newData),
+                        infofilesname='infoFiles.tsv',
+                        settingsfilename='settings.json',
+                        settingsEventsfilename=None,
+                        datasetdescriptionfilename='dataset_description.json',
+                        eyetracktype='Toy', dataformat='.txt',
+                        saved_events={}, StartMessage=None, EndMessage=None)
+
+@pytest.mark.parametrize('capabilities', [(), ('settings', 'events',
+                                                'indexable')])
+def test_register_backend(tmp_path, backends, capabilities):
+
+    cls = register_backend('Toy', capabilities)(type('Toy', (ToyBackend,),
+                                                     {}))
+    assert backends['Toy'] is cls
+    assert get_backend('Toy') is cls
+    assert cls.eyetracktype=='Toy'
+    assert cls.capabilities==frozenset(capabilities)
+
+    dirpath = tmp_path/'data'
+    dirpath.mkdir()
+    (dirpath/'S1.txt').write_text('100 1.5\n101 2.5\n102 3.5\n')
+    (dirpath/'infoFiles.tsv').write_text(
+                        'filename filepath eventsfilename participant_id ses '
+                        'task acq run\nS1.txt   001    \n')
+    (dirpath/'settings.json').write_text(json.dumps(
+                        dict(SETTINGS, SamplingFrequency=1000,
+                             ScreenResolution=[1280, 1024])))
+    (dirpath/'dataset_description.json').write_text(json.dumps(
+                        {'Name': 'dataset', 'BIDSVersion': '1.8.1'}))
+    convert(dirpath, tmp_path/'bids')
+
+    # the methods of the capabilities not declared are not used
+    filepath = tmp_path/'bids'/'sub-001'/'eyetrack'
+    settings = json.loads((filepath/'sub-001_eyetrack.json').read_text())
+    gz_index = read_gz_index(str(filepath/'sub-001_eyetrack.tsv.gz'))
+    if capabilities:
+        assert settings['Manufacturer']=='Toy'
+        assert (filepath/'sub-001_events.tsv').is_file()
+        assert gz_index['timestamp']=='eye_timestamp'
+        assert gz_index['blocks']['first']==[100]
+    else:
+        assert settings['Manufacturer'] is None
+        assert not (filepath/'sub-001_events.tsv').exists()
+        assert gz_index['timestamp'] is None
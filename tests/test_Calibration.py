@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from BIDSification_eyetrackingData.Calibration import extract_calibrations, \
+                                                    is_calibration_line
+from BIDSification_eyetrackingData.StandardisationProcessDataEyelink import \
+                                            StandardisationProcessDataEyelink
+from asc_data import asc_lines, calibration_lines, write_asc
+
+
+BINOCULAR = ["MSG\t1000 !CAL CALIBRATION HV9 LR LEFT  GOOD",
+             "MSG\t1050 VALIDATE LR POINT 0  LEFT  at 640,512  OFFSET 0.31 "
+             "deg.  5.0,-1.5 pix.",
+             "MSG\t1050 VALIDATE LR POINT 0  RIGHT  at 640,512  OFFSET 0.21 "
+             "deg.  4.3,-7.2 pix.",
+             "MSG\t1060 VALIDATE LR POINT 1  LEFT  at 640,92  OFFSET 0.52 "
+             "deg.  -9.0,11.0 pix.",
+             "MSG\t1060 VALIDATE LR POINT 1  RIGHT  at 640,92  OFFSET 0.40 "
+             "deg.  -8.1,12.2 pix.",
+             "MSG\t1100 !CAL VALIDATION HV9 LR LEFT  POOR ERROR 1.20 avg. "
+             "2.40 max  OFFSET 0.35 deg. 3.0,-4.0 pix.",
+             "MSG\t1100 !CAL VALIDATION HV9 LR RIGHT GOOD ERROR 0.32 avg. "
+             "0.64 max  OFFSET 0.15 deg. -2.1,5.3 pix."]
+
+
+def test_extract_calibrations():
+
+    lines = calibration_lines(9051500)
+    assert [is_calibration_line(l) for l in lines]==[True, False, True, True,
+                                                     True]
+
+    calibrations = extract_calibrations(lines)
+
+    assert calibrations==[dict(timestamp=9051600, type='HV9', mode='R',
+                               eye='RIGHT', result='GOOD',
+                               AverageCalibrationError=0.32,
+                               MaximalCalibrationError=0.64,
+                               offset_deg=0.15, offset_pix=[-2.1, 5.3],
+                               points=[dict(point=0, position=[640, 512],
+                                            offset_deg=0.21,
+                                            offset_pix=[4.3, -7.2]),
+                                       dict(point=1, position=[640, 92],
+                                            offset_deg=0.4,
+                                            offset_pix=[-8.1, 12.2])],
+                               trial=0)]
+
+def test_extract_calibrations_binocular():
+
+    calibrations = extract_calibrations(BINOCULAR)
+
+    # one validation per eye, with the points of this eye
+    assert [(c['eye'], c['mode'], c['result']) for c in calibrations]== \
+           [('LEFT', 'LR', 'POOR'), ('RIGHT', 'LR', 'GOOD')]
+    assert [[p['offset_deg'] for p in c['points']] for c in calibrations]== \
+           [[0.31, 0.52], [0.21, 0.40]]
+    assert calibrations[0]['AverageCalibrationError']==1.2
+    assert calibrations[1]['offset_pix']==[-2.1, 5.3]
+
+def test_extract_calibrations_aborted():
+
+    lines = ["MSG\t1000 VALIDATE R POINT 0  RIGHT  at 640,512  OFFSET 0.21 "
+             "deg.  4.3,-7.2 pix.",
+             "MSG\t1010 !CAL VALIDATION HV9 R RIGHT ABORTED"]
+    lines += calibration_lines(2000)
+
+    calibrations = extract_calibrations(lines)
+
+    # the points of the aborted validation are not those of the next one
+    assert calibrations[0]['result']=='ABORTED'
+    assert calibrations[0]['AverageCalibrationError'] is None
+    assert calibrations[0]['offset_pix'] is None
+    assert len(calibrations[0]['points'])==1
+    assert calibrations[1]['result']=='GOOD'
+    assert [p['point'] for p in calibrations[1]['points']]==[0, 1]
+
+@pytest.mark.parametrize('trial_starts, trials', [
+        ([], [0, 0, 0]),
+        ([1100], [0, 1, 1]),
+        ([1500, 500, 3000], [1, 2, 2]),
+        ([1000, 1100, 2000, 5000], [1, 3, 3])])
+def test_extract_calibrations_trials(trial_starts, trials):
+
+    lines = calibration_lines(900)+BINOCULAR[-2:]
+    lines[-2:] = [l.replace('1100', '2100') for l in lines[-2:]]
+
+    # number of trials started before each validation (or at its time)
+    calibrations = extract_calibrations(lines, trial_starts)
+
+    assert [c['timestamp'] for c in calibrations]==[1000, 2100, 2100]
+    assert [c['trial'] for c in calibrations]==trials
+
+@pytest.mark.parametrize('EndMessage', ['TRIAL OK', None])
+def test_calibrations_trials_of_events(tmp_path, EndMessage):
+
+    # validations between the trials, and trials started by lines other
+    #  than messages
+    lines = asc_lines()
+    trials = [n for n, l in enumerate(lines) if 'TRIALID' in l]
+    t = lambda n: int(lines[n].split('\t')[1].split(' ')[0])
+    lines[trials[4]:trials[4]] = calibration_lines(t(trials[4])-200)
+    lines[trials[3]] = lines[trials[3]].replace('MSG', 'BUTTON')
+    lines[trials[2]:trials[2]] = calibration_lines(t(trials[2])-200)
+    write_asc(tmp_path/'data.asc', lines)
+
+    process = StandardisationProcessDataEyelink(str(tmp_path), 'TRIALID',
+                                                EndMessage)
+    calibrations = process.extract_calibrations_ascFile('data.asc',
+                                                        str(tmp_path))
+    events, _ = process.extract_events_ascFile('data.asc', str(tmp_path),
+                                               {}, None)
+
+    assert len(calibrations)==3
+    for c in calibrations:
+        assert c['trial']==sum(e['sample']<=c['timestamp'] for e in events)
+    assert [c['trial'] for c in calibrations]==[0, 2, 4]
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import sys
+import gzip
+import numpy as np
+import pytest
+
+from BIDSification_eyetrackingData import File
+from BIDSification_eyetrackingData.DataReader import DataReader
+from BIDSification_eyetrackingData.File import save_columns
+
+
+@pytest.fixture
+def columns():
+
+    return {'eye_timestamp': np.arange(100, 110, dtype=np.int64),
+            'eye1_x_coordinate': np.array([1.5, np.nan, 2, 3, 4, 5, 6, 7, 8,
+                                           -0.1], dtype=np.float32),
+            'eye': np.array(['R', 'L R', '"q"', '', 'x']*2),
+            'sample_flags': np.arange(10, dtype=np.uint8),
+            'valid': np.arange(10)%2==0}
+
+def bids_directory(tmp_path, columns):
+
+    filepath = tmp_path/'sub-001'/'eyetrack'
+    filepath.mkdir(parents=True)
+    save_columns(columns, 'sub-001_eyetrack.tsv.gz', str(filepath),
+                 index='eye_timestamp')
+
+    return DataReader(str(tmp_path))
+
+def assert_columns_equal(data, columns):
+
+    assert list(data)==list(columns)
+    for k, c in columns.items():
+        assert data[k].dtype.kind==c.dtype.kind, k
+        if c.dtype.kind=='f':
+            np.testing.assert_array_equal(data[k], c)
+        else:
+            assert data[k].tolist()==c.tolist(), k
+
+def test_read_data(tmp_path, columns):
+
+    reader = bids_directory(tmp_path, columns)
+    data = reader.read_data('sub-001')
+
+    assert_columns_equal(data, columns)
+    assert data['eye_timestamp'].dtype==np.int64
+    assert data['eye1_x_coordinate'].dtype==np.float32
+    assert data['sample_flags'].dtype==np.uint8
+
+def test_read_window(tmp_path, columns):
+
+    reader = bids_directory(tmp_path, columns)
+    data = reader.read_window('sub-001', 101, 103)
+
+    assert_columns_equal(data, {k: c[1:4] for k, c in columns.items()})
+
+def test_decode_lines_without_dtypes():
+
+    # the files without the types of their columns: the numeric columns are
+    #  floats and the others strings
+    lines = ['1 0.5 R', '2  "L R"', '3 .5 ""']
+    data = DataReader.decode_lines(lines, ['t', 'x', 'eye'])
+
+    np.testing.assert_array_equal(data['t'], [1, 2, 3])
+    np.testing.assert_array_equal(data['x'], [0.5, np.nan, 0.5])
+    assert data['eye'].tolist()==['R', 'L R', '']
+
+def test_decode_tsv_header(tmp_path, columns):
+
+    reader = bids_directory(tmp_path, columns)
+    filename = tmp_path/'sub-001'/'eyetrack'/'sub-001_eyetrack.tsv.gz'
+    with gzip.open(filename, 'rt') as f:
+        assert f.readline().split()==list(columns)
+
+    assert reader.columns('sub-001')==list(columns)
+
+def test_npy_columns(tmp_path, columns):
+
+    reader = bids_directory(tmp_path, columns)
+    filepath = tmp_path/'sub-001'/'eyetrack'
+    save_columns(columns, 'sub-001_eyetrack.npy', str(filepath))
+
+    # the columns of the npy files are in the order of the tsv.gz files
+    assert reader.source('sub-001')[0]=='npy'
+    assert reader.columns('sub-001')==list(columns)
+    assert_columns_equal(reader.read_data('sub-001'), columns)
+
+    # the directories written without the order of their columns
+    (filepath/'sub-001_eyetrack.npy'/File.NPY_COLUMNS).unlink()
+    reader.clear_cache()
+    assert reader.columns('sub-001')==sorted(columns)
+
+@pytest.mark.parametrize('t0, t1', [(1050, 1150), (1190, 2040), (1250, 1999),
+                                    (0, 5000), (3000, 4000), (1099, 1100)])
+def test_read_window_blocks(tmp_path, monkeypatch, t0, t1):
+
+    # the blocks of the window are read, within and across the blocks of
+    #  100 rows and the gap of the timestamps
+    monkeypatch.setattr(File, 'BLOCK_SIZE', 100)
+    t = np.concatenate([np.arange(1000, 1250), np.arange(2000, 2080)])
+    columns = {'eye_timestamp': t,
+               'eye1_x_coordinate': (np.arange(len(t))/2).astype(np.float32)}
+    reader = bids_directory(tmp_path, columns)
+
+    read = []
+    def read_gz_blocks(filename, offsets, lengths):
+        read.extend(offsets)
+        return File.read_gz_blocks(filename, offsets, lengths)
+    # the module, not the class of the same name in the package
+    monkeypatch.setattr(sys.modules[DataReader.__module__],
+                        'read_gz_blocks', read_gz_blocks)
+
+    keep = (t>=t0) & (t<=t1)
+    data = reader.read_window('sub-001', t0, t1)
+    assert_columns_equal(data, {k: c[keep] for k, c in columns.items()})
+
+    # only the blocks whose timestamps overlap the window are decompressed
+    first, last = t[::100], t[99::100].tolist()+[t[-1]]
+    assert len(read)==sum(l>=t0 and f<=t1 for f, l in zip(first, last))
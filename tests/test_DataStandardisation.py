@@ -0,0 +1,258 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import io
+import os
+import csv
+import gzip
+import json
+import pytest
+
+from BIDSification_eyetrackingData.StandardisationProcess import \
+                                                        StandardisationProcess
+import baseline_eyelink
+from asc_data import asc_lines, write_asc, write_dataset, convert, \
+                     SAVED_EVENTS
+
+
+def json_files(dirpath):
+
+    files = {}
+    for root, dirs, filenames in os.walk(dirpath):
+        for f in filenames:
+            if f.endswith('.json'):
+                with open(os.path.join(root, f)) as file:
+                    files[os.path.relpath(os.path.join(root, f),
+                                          dirpath)] = json.load(file)
+
+    return files
+
+@pytest.fixture
+def data_directory(tmp_path):
+
+    dirpath = tmp_path/'data'
+    dirpath.mkdir()
+    write_dataset(dirpath, {'S1.asc': ('001', asc_lines(seed=0)),
+                            'S2.asc': ('002', asc_lines(seed=1)),
+                            'S3.asc': ('002', asc_lines(seed=2))})
+
+    return dirpath
+
+def test_inheritance_incremental(tmp_path, data_directory):
+
+    bids = tmp_path/'bids'
+    convert(data_directory, bids, inheritance=True, incremental=True)
+    first = json_files(bids)
+    assert 'eyetrack.json' in first
+
+    # nothing to convert: the inherited files are computed over all the
+    #  recordings, not only over the converted ones
+    convert(data_directory, bids, inheritance=True, incremental=True)
+    assert json_files(bids)==first
+
+    # one recording changed: only its files are converted, the inherited
+    #  files are those of a complete conversion
+    data = bids/'sub-001'/'eyetrack'/'sub-001_run-1_eyetrack.tsv.gz'
+    mtime = os.stat(bids/'sub-002'/'eyetrack'/'sub-002_run-2_eyetrack.tsv.gz'
+                    ).st_mtime_ns
+    lines = asc_lines(seed=0, binocular=True)
+    write_asc(data_directory/'S1.asc', lines)
+    os.utime(data_directory/'S1.asc',
+             ns=(os.stat(data).st_mtime_ns+10**9,)*2)
+
+    convert(data_directory, bids, inheritance=True, incremental=True)
+    convert(data_directory, tmp_path/'complete', inheritance=True)
+
+    assert json_files(bids)==json_files(tmp_path/'complete')
+    assert os.stat(bids/'sub-002'/'eyetrack'/'sub-002_run-2_eyetrack.tsv.gz'
+                   ).st_mtime_ns==mtime
+
+def first_release_tsv(data):
+
+    # the tsv files as written by the first release
+    f = io.StringIO()
+    writer = csv.DictWriter(f, fieldnames=data[0].keys(), delimiter=' ')
+    writer.writeheader()
+    writer.writerows(data)
+
+    return f.getvalue()
+
+def rows(text):
+
+    # the timestamps written as floats by the first release are written as
+    #  integers (see Recording.DTYPE_POLICY)
+    rows = [l.split(' ') for l in text.splitlines()]
+    for r in rows[1:]:
+        r[0] = float(r[0])
+
+    return rows
+
+@pytest.mark.parametrize('variant', [dict(), dict(binocular=True),
+                                     dict(velocity=True, seed=1),
+                                     dict(end_message=False, seed=2)])
+def test_asc_baseline(tmp_path, variant):
+
+    dirpath = tmp_path/'data'
+    dirpath.mkdir()
+    write_dataset(dirpath, {'S1.asc': ('001', asc_lines(**variant))})
+    convert(dirpath, tmp_path/'bids')
+
+    baseline = baseline_eyelink.StandardisationProcessDataEyelink(
+                                        str(dirpath), 'TRIALID', 'TRIAL OK')
+    settings = baseline.extract_settings_ascFile('S1.asc', str(dirpath))
+    data = baseline.extract_data_ascFile('S1.asc', str(dirpath))
+    events, settingsEvents = baseline.extract_events_ascFile(
+                                'S1.asc', str(dirpath), dict(SAVED_EVENTS),
+                                settings, [])
+
+    filepath = tmp_path/'bids'/'sub-001'/'eyetrack'
+    with gzip.open(filepath/'sub-001_run-1_eyetrack.tsv.gz', 'rt',
+                   newline='') as f:
+        text = f.read()
+    assert text.endswith('\r\n')
+    assert rows(text)==rows(first_release_tsv(data))
+    assert (filepath/'sub-001_run-1_eyetrack.asc').read_bytes()== \
+           (dirpath/'S1.asc').read_bytes()
+
+    # the trials without end message are ignored
+    if not events:
+        assert not os.path.exists(filepath/'sub-001_run-1_events.tsv')
+        return
+    with open(filepath/'sub-001_run-1_events.tsv', newline='') as f:
+        assert f.read()==first_release_tsv(events)
+    with open(filepath/'sub-001_run-1_events.json') as f:
+        assert json.load(f)==settingsEvents
+
+def tree(dirpath):
+
+    files = {}
+    for root, dirs, filenames in os.walk(dirpath):
+        for f in filenames:
+            path = os.path.join(root, f)
+            with open(path, 'rb') as file:
+                files[os.path.relpath(path, dirpath)] = file.read()
+
+    return files
+
+@pytest.fixture
+def shards_directory(tmp_path):
+
+    # recordings of different sizes
+    dirpath = tmp_path/'data'
+    dirpath.mkdir()
+    write_dataset(dirpath, {'S%d.asc'%n: ('00%d'%(1+n%3),
+                                          asc_lines(ntrials=n, seed=n))
+                            for n in [2, 5, 1, 4, 3]})
+
+    return dirpath
+
+@pytest.mark.parametrize('nshards', [2, 3])
+@pytest.mark.parametrize('inheritance', [False, True])
+def test_shards(tmp_path, shards_directory, nshards, inheritance):
+
+    bids = tmp_path/'bids'
+    for i in reversed(range(nshards)):
+        convert(shards_directory, bids, shard=(i, nshards),
+                inheritance=inheritance)
+    assert not (bids/'participants.tsv').exists()
+    convert(shards_directory, bids, finalize=True, inheritance=inheritance)
+
+    convert(shards_directory, tmp_path/'complete', inheritance=inheritance)
+
+    assert tree(bids)==tree(tmp_path/'complete')
+
+def test_shard_infoFiles(shards_directory):
+
+    process = StandardisationProcess(str(shards_directory))
+    infoFiles = [{'filename': 'S%d.asc'%n, 'filepath': ''}
+                 for n in [2, 5, 1, 4, 3]]
+    sizes = [os.path.getsize(shards_directory/f['filename'])
+             for f in infoFiles]
+
+    # the shards are a partition of infoFiles, the same in every process
+    shards = [process.shard_infoFiles(infoFiles, (i, 2)) for i in range(2)]
+    assert sorted(shards[0]+shards[1])==list(range(5))
+    assert [StandardisationProcess(str(shards_directory)).shard_infoFiles(
+                                        infoFiles, (i, 2)) for i in range(2)
+            ]==shards
+
+    # the largest files are assigned first to the smallest shard
+    order = sorted(range(5), key=lambda k: -sizes[k])
+    assert order[0] in shards[0] and order[1] in shards[1]
+    totals = [sum(sizes[k] for k in s) for s in shards]
+    assert abs(totals[0]-totals[1])<=max(sizes)
+
+    with pytest.raises(ValueError):
+        process.shard_infoFiles(infoFiles, (2, 2))
+
+def test_finalize_missing_shard(tmp_path, shards_directory):
+
+    bids = tmp_path/'bids'
+    convert(shards_directory, bids, shard=(0, 3))
+    convert(shards_directory, bids, shard=(2, 3))
+
+    with pytest.raises(ValueError, match='Missing shards'):
+        convert(shards_directory, bids, finalize=True)
+    assert not (bids/'participants.tsv').exists()
+
+    # the shards of different partitions are not merged
+    convert(shards_directory, bids, shard=(1, 2))
+    with pytest.raises(ValueError, match='Missing shards'):
+        convert(shards_directory, bids, finalize=True)
+
+    # all the shards done, the results are merged
+    convert(shards_directory, bids, shard=(1, 3))
+    (bids/'.shards'/'shard-1-of-2.json').unlink()
+    convert(shards_directory, bids, finalize=True)
+    assert (bids/'participants.tsv').exists()
+    assert not (bids/'.shards').exists()
+
+def test_summary(tmp_path):
+
+    # a trial with a blink and a pupil size of 0, a trial without samples
+    lines = asc_lines(ntrials=0)[:-1]
+    lines += ["MSG\t10000 TRIALID 0",
+              "10000\t  100.0\t  200.0\t 1000.0\t...",
+              "10001\t  101.0\t  201.0\t 1200.0\t...",
+              "SBLINK R 10002",
+              "10002\t   .\t   .\t    0.0\t...",
+              "10003\t   .\t   .\t    0.0\t...",
+              "EBLINK R 10002\t10003\t2",
+              "10004\t  104.0\t  204.0\t 1400.0\t...",
+              "MSG\t10005 TRIAL OK",
+              "MSG\t10100 TRIALID 1",
+              "MSG\t10150 TRIAL OK",
+              "MSG\t10200 TRIALID 2",
+              "10200\t  100.0\t  200.0\t  900.0\t...",
+              "10201\t  100.0\t  200.0\t    0.0\t...",
+              "MSG\t10201 TRIAL OK",
+              "END\t10201 \tSAMPLES\tEVENTS\tRES\t  38.00\t  35.00"]
+    dirpath = tmp_path/'data'
+    dirpath.mkdir()
+    write_dataset(dirpath, {'S1.asc': ('001', lines)})
+    convert(dirpath, tmp_path/'bids', summary=True)
+
+    path = tmp_path/'bids'/'derivatives'/'summary'
+    assert json.loads((path/'dataset_description.json').read_text()
+                      )['DatasetType']=='derivative'
+    summary = (path/'sub-001'/'eyetrack'/
+               'sub-001_run-1_desc-summary_eyetrack.tsv').read_text()
+
+    # the samples at the end of the trials are in the trials, the missing
+    #  samples and the pupil sizes of 0 are not in the mean pupil sizes
+    assert [l.split(' ') for l in summary.splitlines()]== \
+           [['trial', 'n_samples', 'missing_fraction', 'mean_pupil_size',
+             'n_blinks'],
+            ['1', '5', '0.4', '1200.0', '1'],
+            ['2', '0', 'nan', 'nan', '0'],
+            ['3', '2', '0.0', '900.0', '0']]
+
+def test_workers(tmp_path, shards_directory):
+
+    # the files converted in parallel are those converted in sequence
+    convert(shards_directory, tmp_path/'bids', inheritance=True, summary=True,
+            workers=3)
+    convert(shards_directory, tmp_path/'sequence', inheritance=True,
+            summary=True)
+
+    assert tree(tmp_path/'bids')==tree(tmp_path/'sequence')
@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+
+from BIDSification_eyetrackingData.DataReader import DataReader
+from BIDSification_eyetrackingData.Epochs import epoch_data, event_onsets
+from asc_data import asc_lines, write_dataset, convert
+
+
+# samples at 1 kHz with a gap between 110 and 120
+TIMESTAMPS = np.concatenate([np.arange(100, 111), np.arange(120, 131)])
+COLUMNS = {'x': TIMESTAMPS*10.}
+
+
+def test_epoch_data():
+
+    epochs, times, channels = epoch_data(TIMESTAMPS, COLUMNS,
+                                         [102, 125, np.nan], -3, 3)
+
+    assert channels==['x']
+    assert times.tolist()==list(range(-3, 4))
+    assert epochs.shape==(3, 7, 1)
+    # before the start of the recording, missing onset
+    np.testing.assert_array_equal(epochs[0, :, 0],
+                                  [np.nan, 1000, 1010, 1020, 1030, 1040,
+                                   1050])
+    np.testing.assert_array_equal(epochs[1, :, 0],
+                                  [1220, 1230, 1240, 1250, 1260, 1270,
+                                   1280])
+    assert np.isnan(epochs[2]).all()
+
+    # gap in the recording
+    epochs, _, _ = epoch_data(TIMESTAMPS, COLUMNS, [110], -2, 12)
+    np.testing.assert_array_equal(epochs[0, :, 0],
+                                  [1080, 1090, 1100]+[np.nan]*9+
+                                  [1200, 1210, 1220])
+
+@pytest.mark.parametrize('step', [2, 3, 0.5])
+def test_epoch_data_step(step):
+
+    # each point of the grid takes the value of the nearest sample
+    epochs, times, _ = epoch_data(TIMESTAMPS, COLUMNS, [104], -4, 6, step)
+
+    targets = 104+times
+    nearest = np.floor(targets+0.5)
+    np.testing.assert_array_equal(epochs[0, :, 0], nearest*10)
+
+def test_event_onsets():
+
+    events = [{'StimulusOn': 105}, {'StimulusOn': '"[125, 127]"'},
+              {'StimulusOn': ''}, {}]
+
+    np.testing.assert_array_equal(event_onsets(events, 'StimulusOn'),
+                                  [105, 125, np.nan, np.nan])
+
+@pytest.mark.parametrize('step', [1, 2, 5])
+def test_read_epochs(tmp_path, step):
+
+    dirpath = tmp_path/'data'
+    dirpath.mkdir()
+    write_dataset(dirpath, {'S1.asc': ('001', asc_lines())})
+    convert(dirpath, tmp_path/'bids', output_formats=['npy'])
+
+    reader = DataReader(str(tmp_path/'bids'))
+    epochs, times, channels = reader.read_epochs(
+                                'sub-001_run-1', 'StimulusOn', -10, 10,
+                                ['eye1_x_coordinate'], step=step)
+
+    assert times.tolist()==list(range(-10, 11, step))
+    assert epochs.shape==(6, len(times), 1)
+
+    # the samples at the times of the grid
+    data = reader.read_data('sub-001_run-1')
+    onsets = event_onsets(reader.read_events('sub-001_run-1'), 'StimulusOn')
+    t = data['eye_timestamp']
+    for n, onset in enumerate(onsets):
+        i = np.searchsorted(t, onset+times)
+        np.testing.assert_array_equal(epochs[n, :, 0],
+                                      data['eye1_x_coordinate'][i])
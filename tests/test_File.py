@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import gzip
+import textwrap
+import subprocess
+import numpy as np
+import pytest
+
+from BIDSification_eyetrackingData import File
+from BIDSification_eyetrackingData.File import atomic_open, save_columns, \
+                                    read_gz_index, read_gz_blocks
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class WriteError(Exception):
+    pass
+
+
+@pytest.mark.parametrize('mode, compresslevel', [('w', None), ('wb', None),
+                                                 ('w', 9), ('wb', 9)])
+def test_atomic_open_error(tmp_path, mode, compresslevel):
+
+    # an error while writing keeps the previous file and removes the
+    #  temporary file
+    filename = tmp_path/'data.tsv.gz'
+    filename.write_bytes(b'previous')
+
+    data = 'x'*100 if 'b' not in mode else b'x'*100
+    with pytest.raises(WriteError):
+        with atomic_open(str(filename), mode=mode,
+                         compresslevel=compresslevel) as f:
+            f.write(data)
+            raise WriteError()
+
+    assert filename.read_bytes()==b'previous'
+    assert os.listdir(tmp_path)==['data.tsv.gz']
+
+@pytest.mark.parametrize('mode, compresslevel', [('w', None), ('w', 9),
+                                                 ('wb', 9)])
+def test_atomic_open_error_wrappers(tmp_path, mode, compresslevel):
+
+    # the wrappers of the temporary file are closed on error: they do not
+    #  write into the closed file when they are garbage collected (these
+    #  errors are only reported in the development mode of python)
+    code = textwrap.dedent('''
+        import gc
+        from BIDSification_eyetrackingData.File import atomic_open
+        try:
+            with atomic_open(%r, mode=%r, compresslevel=%r) as f:
+                f.write(%r)
+                raise KeyError()
+        except KeyError:
+            pass
+        del f
+        gc.collect()
+        ''')%(str(tmp_path/'data.tsv.gz'), mode, compresslevel,
+               'x' if 'b' not in mode else b'x')
+
+    result = subprocess.run([sys.executable, '-X', 'dev', '-c', code],
+                            cwd=ROOT, capture_output=True, text=True)
+
+    assert result.returncode==0
+    assert 'Exception ignored' not in result.stderr
+    assert os.listdir(tmp_path)==[]
+
+def test_atomic_open(tmp_path):
+
+    filename = tmp_path/'data.tsv.gz'
+    with atomic_open('data.tsv.gz', str(tmp_path), compresslevel=6) as f:
+        f.write('a b\n1 2\n')
+
+    with gzip.open(filename, 'rt') as f:
+        assert f.read()=='a b\n1 2\n'
+    assert os.listdir(tmp_path)==['data.tsv.gz']
+
+    # the permissions of a file created by open(), the umask is not changed
+    with open(tmp_path/'open.tsv', 'w'):
+        pass
+    assert os.stat(filename).st_mode==os.stat(tmp_path/'open.tsv').st_mode
+
+def test_atomic_open_umask(tmp_path, monkeypatch):
+
+    # the umask read at import time, not set again by each file
+    monkeypatch.setattr(File, 'UMASK', 0o077)
+    umask = []
+    monkeypatch.setattr(os, 'umask', lambda mask: umask.append(mask))
+
+    with atomic_open('data.tsv', str(tmp_path)) as f:
+        f.write('a b\n')
+
+    assert umask==[]
+    assert os.stat(tmp_path/'data.tsv').st_mode & 0o777==0o600
+
+@pytest.fixture
+def blocks_file(tmp_path, monkeypatch):
+
+    # blocks of 100 rows, the timestamps have a gap
+    monkeypatch.setattr(File, 'BLOCK_SIZE', 100)
+    t = np.concatenate([np.arange(1000, 1250), np.arange(2000, 2080)])
+    columns = {'eye_timestamp': t,
+               'eye1_x_coordinate': np.arange(len(t))/2}
+    save_columns(columns, 'data.tsv.gz', str(tmp_path),
+                 index='eye_timestamp')
+
+    return str(tmp_path/'data.tsv.gz'), columns
+
+def test_gz_index(blocks_file):
+
+    filename, columns = blocks_file
+    t = columns['eye_timestamp']
+
+    # the file remains a standard gzip file
+    with gzip.open(filename, 'rt') as f:
+        lines = f.read().splitlines()
+    assert lines[0]=='eye_timestamp eye1_x_coordinate'
+    assert [int(l.split()[0]) for l in lines[1:]]==t.tolist()
+
+    gz_index = read_gz_index(filename)
+    blocks = gz_index['blocks']
+    assert gz_index['columns']==list(columns)
+    assert gz_index['rows']==len(t)
+    assert gz_index['timestamp']=='eye_timestamp'
+    assert blocks['row']==[0, 100, 200, 300]
+    assert blocks['first']==[1000, 1100, 1200, 2050]
+    assert blocks['last']==[1099, 1199, 2049, 2079]
+
+    # each block is decompressed on its own
+    for i, row in enumerate(blocks['row']):
+        text = read_gz_blocks(filename, [blocks['offset'][i]],
+                              [blocks['length'][i]])
+        assert text.splitlines()==lines[1+row:1+row+100]
+
+def test_gz_index_missing(tmp_path):
+
+    with gzip.open(tmp_path/'data.tsv.gz', 'wt') as f:
+        f.write('a b\n1 2\n')
+
+    assert read_gz_index(str(tmp_path/'data.tsv.gz')) is None
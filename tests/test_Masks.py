@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+
+from BIDSification_eyetrackingData.StandardisationProcessDataEyelink import \
+                                            StandardisationProcessDataEyelink
+from BIDSification_eyetrackingData.DataReader import DataReader
+from BIDSification_eyetrackingData.Recording import Recording
+from BIDSification_eyetrackingData.Masks import sample_flags, flag_mask, \
+                                    TRACKING_LOSS, BLINK, OUT_OF_SCREEN, \
+                                    FLAGS_COLUMN
+from asc_data import asc_lines, write_asc, write_dataset, convert
+
+
+VARIANTS = {'monocular': dict(),
+            'binocular': dict(binocular=True)}
+
+
+def blink_ranges(lines):
+
+    # (start, end) of the EBLINK lines
+    return [tuple(int(x) for x in l.split()[2:4]) for l in lines
+            if l.startswith('EBLINK')]
+
+@pytest.mark.parametrize('variant', VARIANTS)
+def test_sample_flags(tmp_path, variant):
+
+    lines = asc_lines(**VARIANTS[variant])
+    write_asc(tmp_path/'data.asc', lines)
+
+    process = StandardisationProcessDataEyelink(str(tmp_path), 'TRIALID',
+                                                'TRIAL OK')
+    line_formats, columns = process.extract_samples_ascFile('data.asc',
+                                                            str(tmp_path))
+    blinks = process.extract_eyeMovementEvents_ascFile('data.asc',
+                                                       str(tmp_path))
+    flags = sample_flags(columns, 'eye_timestamp', blinks, [1280, 1024])
+
+    assert flags.dtype==np.uint8
+
+    # blinks: the samples from SBLINK to EBLINK
+    t = columns['eye_timestamp']
+    blink = np.zeros(len(t), dtype=bool)
+    ranges = blink_ranges(lines)
+    assert ranges
+    for start, end in ranges:
+        blink |= (t>=start) & (t<=end)
+    np.testing.assert_array_equal(flag_mask(flags, BLINK), blink)
+
+    # out of the screen
+    x = [columns[k] for k in line_formats if k.endswith('_x_coordinate')]
+    y = [columns[k] for k in line_formats if k.endswith('_y_coordinate')]
+    out = np.zeros(len(t), dtype=bool)
+    for c in x:
+        out |= (c<0) | (c>=1280)
+    for c in y:
+        out |= (c<0) | (c>=1024)
+    assert out.any()
+    np.testing.assert_array_equal(flag_mask(flags, OUT_OF_SCREEN), out)
+
+    # tracking loss: the samples of the blinks have no position
+    np.testing.assert_array_equal(flag_mask(flags, TRACKING_LOSS), blink)
+    np.testing.assert_array_equal(flag_mask(flags, BLINK | OUT_OF_SCREEN),
+                                  blink | out)
+
+def test_sample_flags_recording(tmp_path):
+
+    dirpath = tmp_path/'data'
+    dirpath.mkdir()
+    write_dataset(dirpath, {'S1.asc': ('001', asc_lines())})
+
+    process = convert(dirpath, tmp_path/'bids', masks=True)
+
+    # the flags are in the buffer of the samples in memory
+    process.create_DataFile('S1.asc', str(dirpath), 'sub-001_run-1',
+                            str(tmp_path/'bids'/'sub-001'/'eyetrack'))
+    samples = process.samples
+    assert isinstance(samples, Recording)
+    assert samples[FLAGS_COLUMN].dtype==np.uint8
+    assert np.shares_memory(samples[FLAGS_COLUMN], samples.buffer)
+
+    data = DataReader(str(tmp_path/'bids')).read_data('sub-001_run-1')
+    assert data[FLAGS_COLUMN].dtype==np.uint8
+    np.testing.assert_array_equal(data[FLAGS_COLUMN], samples[FLAGS_COLUMN])
@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import numpy as np
+import pytest
+
+from BIDSification_eyetrackingData.ParseCache import ParseCache
+from BIDSification_eyetrackingData.StandardisationProcessDataEyelink import \
+                                            StandardisationProcessDataEyelink
+from asc_data import asc_lines, write_asc
+
+
+ARRAYS = {'eye_timestamp': np.arange(10, dtype=np.int64),
+          'eye1_x_coordinate': np.linspace(0, 1, 10),
+          'lines': np.array(['MSG\t1 TRIALID 1', 'MSG\t9 TRIAL OK'])}
+
+SAVED_EVENTS = {'StimulusOn': {'Description': 'stimulus on'},
+                'TargetOff': {'Description': 'target off'}}
+
+
+def assert_arrays_equal(arrays, expected):
+
+    assert sorted(arrays)==sorted(expected)
+    for k in expected:
+        np.testing.assert_array_equal(arrays[k], expected[k])
+
+@pytest.mark.parametrize('mmap_mode', [None, 'r'])
+def test_round_trip(tmp_path, mmap_mode):
+
+    cache = ParseCache(str(tmp_path/'cache'))
+    (tmp_path/'data.asc').write_text('data')
+    key = cache.key(str(tmp_path/'data.asc'), 1)
+
+    assert cache.load(key, mmap_mode) is None
+    cache.save(key, ARRAYS)
+    assert_arrays_equal(cache.load(key, mmap_mode), ARRAYS)
+
+def test_key(tmp_path):
+
+    cache = ParseCache(str(tmp_path/'cache'))
+    (tmp_path/'data.asc').write_text('data')
+    (tmp_path/'copy.asc').write_text('data')
+    key = cache.key(str(tmp_path/'data.asc'), 1)
+
+    # the key depends on the content of the file and on the version of the
+    #  parser, not on the path of the file
+    assert cache.key(str(tmp_path/'copy.asc'), 1)==key
+    assert cache.key(str(tmp_path/'data.asc'), 2)!=key
+
+    (tmp_path/'data.asc').write_text('data modified')
+    assert cache.key(str(tmp_path/'data.asc'), 1)!=key
+
+def test_unreadable_entry(tmp_path):
+
+    cache = ParseCache(str(tmp_path))
+    (tmp_path/'key.npz').write_bytes(b'truncated')
+
+    assert cache.load('key') is None
+    assert os.listdir(tmp_path)==[]
+
+def test_evict(tmp_path):
+
+    cache = ParseCache(str(tmp_path))
+    arrays = {'eye_timestamp': ARRAYS['eye_timestamp']}
+
+    # the entries are used one second apart, the first one is used last
+    for n, key in enumerate(['a', 'b', 'c']):
+        cache.save(key, arrays)
+        os.utime(cache.filename(key), (n, n))
+    assert cache.load('a') is not None
+    entry_size = os.path.getsize(cache.filename('a'))
+
+    # the least recently used entries beyond the maximal size are removed
+    cache.max_size = 2*entry_size
+    cache.save('d', arrays)
+    assert sorted(os.listdir(tmp_path))==['a.npz', 'd.npz']
+
+    cache.max_size = 0
+    cache.evict()
+    assert os.listdir(tmp_path)==[]
+
+def parse(tmp_path, cache_dir=None):
+
+    process = StandardisationProcessDataEyelink(str(tmp_path), 'TRIALID',
+                                                'TRIAL OK')
+    if cache_dir:
+        process.cache = ParseCache(cache_dir)
+
+    settings = process.extract_settings_ascFile('data.asc', str(tmp_path))
+    line_formats, columns = process.extract_samples_ascFile('data.asc',
+                                                            str(tmp_path))
+    events = process.extract_events_ascFile('data.asc', str(tmp_path),
+                                            dict(SAVED_EVENTS), settings)
+
+    # the entry of the cache read, if any
+    hit = process.file_cache[1] is not None
+
+    return settings, line_formats, columns, events, hit
+
+@pytest.mark.parametrize('variant', [dict(), dict(binocular=True),
+                                     dict(velocity=True, seed=1)])
+def test_eyelink_cache(tmp_path, variant):
+
+    write_asc(tmp_path/'data.asc', asc_lines(**variant))
+    cache_dir = str(tmp_path/'cache')
+    expected = parse(tmp_path)
+
+    # the file is parsed and saved in the cache, then read from the cache
+    for n in range(2):
+        settings, line_formats, columns, events, hit = parse(tmp_path,
+                                                             cache_dir)
+        assert len(os.listdir(cache_dir))==1
+        assert hit==(n==1)
+
+        assert settings==expected[0]
+        assert line_formats==expected[1]
+        assert_arrays_equal(columns, expected[2])
+        for k in expected[2]:
+            assert columns[k].dtype==expected[2][k].dtype
+        assert events==expected[3]
+
+    # a modified file is parsed again
+    write_asc(tmp_path/'data.asc', asc_lines(**variant)[:-100])
+    expected = parse(tmp_path)
+    _, _, columns, _, hit = parse(tmp_path, cache_dir)
+    assert not hit
+    assert len(os.listdir(cache_dir))==2
+    assert_arrays_equal(columns, expected[2])
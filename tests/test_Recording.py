@@ -0,0 +1,170 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import gzip
+import numpy as np
+import pytest
+
+from BIDSification_eyetrackingData.DataReader import DataReader
+from BIDSification_eyetrackingData.Recording import Recording, \
+                                                    policy_dtypes, \
+                                                    EYE_MOVEMENT_DTYPE_POLICY
+from BIDSification_eyetrackingData.StandardisationProcessDataEyelink import \
+                                            StandardisationProcessDataEyelink
+from asc_data import asc_lines, write_asc, write_dataset, convert
+
+
+@pytest.fixture
+def columns():
+
+    return {'eye_timestamp': np.arange(8, dtype=np.int64),
+            'eye1_x_coordinate': np.linspace(0, 1, 8, dtype=np.float32),
+            'eye1_pupil_size': np.full(8, 1000, dtype=np.float32)}
+
+def test_columns(columns):
+
+    recording = Recording.from_columns(columns)
+
+    assert list(recording)==list(columns)
+    for k, c in columns.items():
+        assert recording[k].dtype==c.dtype
+        np.testing.assert_array_equal(recording[k], c)
+        assert np.shares_memory(recording[k], recording.buffer)
+
+    arrays = recording.to_arrays()
+    copy = Recording.from_arrays(arrays)
+    for k in columns:
+        np.testing.assert_array_equal(copy[k], recording[k])
+
+def test_array_view(columns):
+
+    del columns['eye_timestamp']
+    recording = Recording.from_columns(columns)
+
+    for copy in [None, False]:
+        values = np.asarray(recording, copy=copy)
+        assert values.shape==(2, 8)
+        assert np.shares_memory(values, recording.buffer)
+
+    values = np.array(recording, copy=True)
+    assert not np.shares_memory(values, recording.buffer)
+    np.testing.assert_array_equal(values[0], columns['eye1_x_coordinate'])
+
+def test_array_copy_false(columns):
+
+    # the columns of different types cannot be viewed as one array
+    recording = Recording.from_columns(columns)
+
+    with pytest.raises(ValueError):
+        np.asarray(recording, copy=False)
+
+    values = np.asarray(recording)
+    assert values.shape==(3, 8)
+    assert not np.shares_memory(values, recording.buffer)
+
+def test_array_dtype(columns):
+
+    del columns['eye_timestamp']
+    recording = Recording.from_columns(columns)
+
+    with pytest.raises(ValueError):
+        np.asarray(recording, dtype=np.float64, copy=False)
+
+    values = np.asarray(recording, dtype=np.float64)
+    assert values.dtype==np.float64
+    assert np.asarray(recording, dtype=np.float32, copy=False).dtype== \
+           np.float32
+
+def test_add_columns(columns):
+
+    recording = Recording.from_columns(columns)
+    flags = np.arange(8, dtype=np.uint8)
+    added = recording.add_columns({'sample_flags': flags})
+
+    assert list(added)==list(columns)+['sample_flags']
+    assert added.offsets[:-1]==recording.offsets
+    for k, c in dict(columns, sample_flags=flags).items():
+        assert added[k].dtype==c.dtype
+        np.testing.assert_array_equal(added[k], c)
+        assert np.shares_memory(added[k], added.buffer)
+
+def test_policy_dtypes():
+
+    columns = {'eye_timestamp': np.array([1., 2., 3.]),
+               'start': np.array([1., np.nan, 3.]),
+               'duration': np.array([1., 2.5, 3.]),
+               'eye1_x_coordinate': np.array([1.5, np.nan, 3.]),
+               'eye1_pupil_size': np.array([1000., 0., 1200.]),
+               'event': np.array(['SFIX', 'SSACC', 'SBLINK'])}
+
+    # the integer types are not given to the columns with missing or
+    #  fractional values
+    assert policy_dtypes(columns)== \
+           dict(eye_timestamp=np.int64, start=np.float64, duration=np.float64,
+                eye1_x_coordinate=np.float32, eye1_pupil_size=np.float32,
+                event=np.dtype('<U6'))
+    assert policy_dtypes(columns, EYE_MOVEMENT_DTYPE_POLICY)== \
+           dict(eye_timestamp=np.float64, start=np.float64,
+                duration=np.float64, eye1_x_coordinate=np.float64,
+                eye1_pupil_size=np.float32, event=np.dtype('<U6'))
+
+def dtypes(columns):
+
+    return {k: c.dtype for k, c in columns.items()}
+
+@pytest.mark.parametrize('precision', [None, 2])
+def test_data_dtypes(tmp_path, precision):
+
+    dirpath = tmp_path/'data'
+    dirpath.mkdir()
+    write_dataset(dirpath, {'S1.asc': ('001', asc_lines(ntrials=2,
+                                                        binocular=True))})
+    convert(dirpath, tmp_path/'bids', output_formats=['npy'], masks=True,
+            precision=precision)
+
+    expected = {'eye_timestamp': np.int64, 'sample_flags': np.uint8}
+    for eye in ['eye1', 'eye2']:
+        for k in ['_x_coordinate', '_y_coordinate', '_pupil_size']:
+            expected[eye+k] = np.float32
+
+    # the columns of the recordings and of the npy files
+    process = StandardisationProcessDataEyelink(str(dirpath), 'TRIALID',
+                                                'TRIAL OK')
+    columns = process.extract_samples_ascFile('S1.asc', str(dirpath))[1]
+    assert isinstance(columns, Recording)
+    assert dtypes(columns)=={k: v for k, v in expected.items()
+                             if k!='sample_flags'}
+
+    data = DataReader(str(tmp_path/'bids')).read_data('sub-001_run-1')
+    assert dtypes(data)==expected
+    filepath = tmp_path/'bids'/'sub-001'/'eyetrack'
+    for k, dtype in expected.items():
+        assert np.load(filepath/'sub-001_run-1_eyetrack.npy'/(k+'.npy')
+                       ).dtype==dtype
+
+    # the values of the tsv.gz files are written as they were recorded, or
+    #  with the number of decimals of the precision
+    with gzip.open(filepath/'sub-001_run-1_eyetrack.tsv.gz', 'rt') as f:
+        row = f.readlines()[1].split()
+    x = data['eye1_x_coordinate'][0]
+    if precision is None:
+        assert row[1]==str(x)
+    else:
+        assert row[1]=='%.2f'%x
+    assert row[0]==str(data['eye_timestamp'][0])
+
+def test_eyeMovementEvents_dtypes(tmp_path):
+
+    write_asc(tmp_path/'data.asc', asc_lines())
+    process = StandardisationProcessDataEyelink(str(tmp_path), 'TRIALID',
+                                                'TRIAL OK')
+    columns = process.extract_eyeMovementEvents_ascFile('data.asc',
+                                                        str(tmp_path))
+
+    # integer times, single precision positions and pupil sizes
+    assert dtypes(columns)== \
+           dict(event=np.dtype('<U8'), eye=np.dtype('<U1'), start=np.int64,
+                end=np.int64, duration=np.int64, start_x=np.float32,
+                start_y=np.float32, end_x=np.float32, end_y=np.float32,
+                mean_x=np.float32, mean_y=np.float32, amplitude=np.float64,
+                peak_velocity=np.float64, pupil_size=np.float32)
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from BIDSification_eyetrackingData.Scheduler import estimate_cost, \
+                                                    run_largest_first, \
+                                                    SAMPLE_SIZE
+
+
+def square(x):
+
+    return x*x
+
+def test_estimate_cost(tmp_path):
+
+    # the small files are read entirely
+    (tmp_path/'small.asc').write_bytes(b'line\n'*100)
+    assert estimate_cost('small.asc', str(tmp_path))==100
+
+    # the number of lines of the large files is estimated from samples
+    (tmp_path/'large.asc').write_bytes(b'a\n'*SAMPLE_SIZE*4+
+                                       b'line\n'*SAMPLE_SIZE)
+    cost = estimate_cost('large.asc', str(tmp_path))
+    assert 4.5*SAMPLE_SIZE<cost<5.5*SAMPLE_SIZE
+
+    # binary files
+    (tmp_path/'data.edf').write_bytes(bytes(range(10))*10)
+    assert estimate_cost('data.edf', str(tmp_path))==100
+    assert estimate_cost('missing.asc', str(tmp_path))==0
+
+def test_largest_first():
+
+    args = [1, 2, 3, 4, 5]
+    costs = [10, 50, 10, 30, 40]
+    results, report = run_largest_first(square, args, costs, 1)
+
+    # the results are in the order of the arguments, the calls are started
+    #  by decreasing cost (in the order of the arguments for the same cost)
+    assert results==[1, 4, 9, 16, 25]
+    assert [t['index'] for t in report['tasks']]==[1, 4, 3, 0, 2]
+    assert [t['cost'] for t in report['tasks']]==[50, 40, 30, 10, 10]
+    starts = [t['start'] for t in report['tasks']]
+    assert starts==sorted(starts)
+    assert report['workers']==1
+    assert 0<report['utilization']<=1
+
+@pytest.mark.parametrize('workers', [2, 4])
+def test_largest_first_workers(workers):
+
+    args = list(range(20))
+    costs = [(7*k)%11 for k in args]
+
+    results, report = run_largest_first(square, args, costs, workers)
+
+    assert results==run_largest_first(square, args, costs, 1)[0]
+    assert sorted(t['index'] for t in report['tasks'])==args
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import pytest
+
+from BIDSification_eyetrackingData.StandardisationProcess import \
+                                                        StandardisationProcess
+
+
+@pytest.fixture
+def process(tmp_path):
+
+    # the last line of a data file is kept, the empty settings of the json
+    #  file are ignored
+    (tmp_path/'settings.json').write_text(json.dumps(
+                        {'TaskName': 'json', 'ScreenDistance': 57,
+                         'SamplingFrequency': '', 'ScreenRefreshRate': 60}))
+    (tmp_path/'infoFiles.tsv').write_text('filename TaskName\n'
+                                          'A.asc first\n'
+                                          'B.asc info\n'
+                                          'A.asc info\n')
+
+    return StandardisationProcess(str(tmp_path))
+
+def extract(settings):
+
+    settings.update(TaskName='file', ScreenDistance=50,
+                    SamplingFrequency=1000, Manufacturer='SR-Research')
+
+def test_resolve_settings(process):
+
+    init = process.settings_init()
+
+    # defaults < data file < json file < line of the infoFiles
+    settings = process.resolve_settings('A.asc', 'settings.json',
+                                        'infoFiles.tsv', ['TaskName'],
+                                        extract)
+    assert settings==dict(init, TaskName='info', ScreenDistance=57,
+                          SamplingFrequency=1000, Manufacturer='SR-Research',
+                          ScreenRefreshRate=60)
+    assert list(settings)[:len(init)]==list(init)
+
+    # the settings of the data file are not kept in the template
+    settings = process.resolve_settings('B.asc', 'settings.json',
+                                        'infoFiles.tsv', [])
+    assert settings==dict(init, TaskName='json', ScreenDistance=57,
+                          ScreenRefreshRate=60)
+    assert process.settings_template('settings.json', 'infoFiles.tsv')[0]== \
+           init
+
+    settings = process.resolve_settings('B.asc', None, 'infoFiles.tsv',
+                                        ['TaskName'], extract)
+    assert settings['TaskName']=='info'
+    assert settings['ScreenDistance']==50
+
+    with pytest.raises(ValueError, match='does not contain information'):
+        process.resolve_settings('C.asc', None, 'infoFiles.tsv', [])
+
+def test_settings_template(tmp_path, process):
+
+    template = process.settings_template('settings.json', 'infoFiles.tsv')
+
+    # the files are read once for the same files
+    (tmp_path/'settings.json').write_text(json.dumps({'TaskName': 'new'}))
+    assert process.settings_template('settings.json', 'infoFiles.tsv') is \
+           template
+    assert process.resolve_settings('B.asc', 'settings.json',
+                                    'infoFiles.tsv', [])['TaskName']=='json'
+
+    (tmp_path/'other.json').write_text(json.dumps({'TaskName': 'other'}))
+    assert process.resolve_settings('B.asc', 'other.json', 'infoFiles.tsv',
+                                    [])['TaskName']=='other'
+
+INFOFILES = [dict(filename='A.asc', participant_id='001', run='1', age='25',
+                  group='a', eye='R'),
+             dict(filename='B.asc', participant_id='002', run='1', age='30',
+                  group='b', eye='L'),
+             dict(filename='C.asc', participant_id='001', run='2', age='25',
+                  group='a', eye='L'),
+             dict(filename='D.asc', participant_id='002', run='2', age='31',
+                  group='b', eye='L'),
+             dict(filename='E.asc', participant_id='001', run='3', age='25',
+                  group='a', eye='R')]
+
+def test_aggregate_infoParticipants(tmp_path, capsys):
+
+    process = StandardisationProcess(str(tmp_path))
+    (tmp_path/'infoFiles.tsv').write_text('\n'.join(
+                            [' '.join(INFOFILES[0])]+
+                            [' '.join(f.values()) for f in INFOFILES])+'\n')
+
+    # the informations with several values for a participant are those of
+    #  the files
+    assert process.sort_infoFiles('infoFiles.tsv')== \
+           {'file': ['age', 'eye'], 'participant': ['participant_id', 'group']}
+
+    info_participants, conflicts = process.aggregate_infoParticipants(
+                            INFOFILES, ['participant_id', 'age', 'group'])
+    assert info_participants==[dict(participant_id='001', age='25',
+                                    group='a'),
+                               dict(participant_id='002', age='30',
+                                    group='b'),
+                               dict(participant_id='002', age='31',
+                                    group='b')]
+    assert conflicts=={'002': ['age']}
+
+    assert process.aggregate_infoParticipants(
+                            INFOFILES, ['participant_id', 'eye', 'age'],
+                            distinct=False)==([], {'001': ['eye'],
+                                                   '002': ['age']})
+
+    process.extract_infoParticipants('infoFiles.tsv',
+                                     ['participant_id', 'age'])
+    assert "{'002': ['age']}" in capsys.readouterr().out
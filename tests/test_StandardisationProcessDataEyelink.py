@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+
+from BIDSification_eyetrackingData.StandardisationProcessDataEyelink import \
+                                            StandardisationProcessDataEyelink
+import baseline_eyelink
+from asc_data import asc_lines, write_asc
+
+
+VARIANTS = {'monocular': dict(),
+            'binocular': dict(binocular=True),
+            'velocity': dict(velocity=True, seed=1),
+            'no_end_message': dict(end_message=False, seed=2)}
+
+SAVED_EVENTS = {'StimulusOn': {'Description': 'stimulus on'},
+                'StimulusOff': {'Description': 'stimulus off'},
+                'TargetOn': {'Description': 'target on'},
+                'TargetOff': {'Description': 'target off'},
+                'INPUT': {'Description': 'input'}}
+
+
+def processes(tmp_path, lines, StartMessage='TRIALID', EndMessage='TRIAL OK'):
+
+    write_asc(tmp_path/'data.asc', lines)
+    return (baseline_eyelink.StandardisationProcessDataEyelink(
+                                    str(tmp_path), StartMessage, EndMessage),
+            StandardisationProcessDataEyelink(str(tmp_path), StartMessage,
+                                              EndMessage))
+
+def events(process, tmp_path):
+
+    settings = process.extract_settings_ascFile('data.asc', str(tmp_path))
+    return process.extract_events_ascFile('data.asc', str(tmp_path),
+                                          dict(SAVED_EVENTS), settings)
+
+@pytest.mark.parametrize('variant', VARIANTS)
+@pytest.mark.parametrize('EndMessage', ['TRIAL OK', None])
+def test_events_baseline(tmp_path, variant, EndMessage):
+
+    lines = asc_lines(**VARIANTS[variant])
+    baseline, process = processes(tmp_path, lines, EndMessage=EndMessage)
+
+    assert events(process, tmp_path)==events(baseline, tmp_path)
+
+@pytest.mark.parametrize('StartMessage, EndMessage', [
+        ('TRIALID', 'TRIAL OK'), ('TRIALID', 'TRIAL END'),
+        ('TRIAL START', 'TRIAL OK'), ('TRIAL START', None)])
+def test_events_baseline_other_lines(tmp_path, StartMessage, EndMessage):
+
+    # the trials are started and ended by the lines of any kind containing
+    #  the messages, not only by the 'MSG' lines
+    lines = asc_lines()
+    trials = [n for n, l in enumerate(lines) if 'TRIALID' in l]
+    t = lambda n: int(lines[n].split('\t')[1].split(' ')[0])
+    for n in reversed(trials):
+        lines[n+1:n+1] = ["BUTTON\t%d TRIAL START %d"%(t(n), n)]
+        lines[n:n] = ["INPUT\t%d TRIAL END"%(t(n)-1)]
+
+    baseline, process = processes(tmp_path, lines, StartMessage, EndMessage)
+
+    assert events(process, tmp_path)==events(baseline, tmp_path)
+
+@pytest.mark.parametrize('variant', VARIANTS)
+def test_samples_baseline(tmp_path, variant):
+
+    baseline, process = processes(tmp_path, asc_lines(**VARIANTS[variant]))
+
+    data = baseline.extract_data_ascFile('data.asc', str(tmp_path))
+    line_formats, columns = process.extract_samples_ascFile('data.asc',
+                                                            str(tmp_path))
+
+    assert line_formats==list(data[0])
+    for k in line_formats:
+        values = np.array([np.nan if d[k] is None else d[k] for d in data])
+        np.testing.assert_array_equal(columns[k],
+                                      values.astype(columns[k].dtype))
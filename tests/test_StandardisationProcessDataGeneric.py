@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import sys
+import json
+import gzip
+import numpy as np
+import pytest
+
+from BIDSification_eyetrackingData import DataStandardisation, File
+from BIDSification_eyetrackingData import StandardisationProcessDataGeneric
+from BIDSification_eyetrackingData.DataReader import DataReader
+from BIDSification_eyetrackingData.File import read_chunks, save_chunks, \
+                                               read_gz_index
+
+
+ROWS = [['eye_timestamp', 'eye1_x_coordinate', 'trial', 'code'],
+        ['100', '1.50', '007', '000'],
+        ['101', 'NA', '008', '001'],
+        ['102', '2', 'x', '002'],
+        ['103', '-0.10', '009', '003'],
+        ['104', '3.0', '010', '004']]
+
+
+@pytest.fixture
+def data_directory(tmp_path):
+
+    dirpath = tmp_path/'data'
+    dirpath.mkdir()
+    (dirpath/'infoFiles.tsv').write_text(
+                        'filename filepath eventsfilename participant_id ses '
+                        'task acq run\nS1.csv   001    \n')
+    (dirpath/'settings.json').write_text(json.dumps(
+                        {'TaskName': 'task', 'SamplingFrequency': 1000,
+                         'SampleCoordinateUnit': 'pixel',
+                         'SampleCoordinateSystem': 'gaze-on-screen',
+                         'ScreenResolution': [1280, 1024],
+                         'EnvironmentCoordinates': 'top-left',
+                         'ScreenSize': [37, 29.5], 'ScreenDistance': 57}))
+    (dirpath/'dataset_description.json').write_text(json.dumps(
+                        {'Name': 'dataset', 'BIDSVersion': '1.8.1'}))
+    (dirpath/'S1.csv').write_text('\n'.join(','.join(r) for r in ROWS)+'\n')
+
+    return dirpath
+
+def test_chunks_dtypes(tmp_path):
+
+    (tmp_path/'data.tsv').write_text('a\tb\tc\td\n1\t1\t1\t\n2\t2\t2\t\n'
+                                     '3\t3.5\tx\t\n4\tNA\t4\t\n')
+
+    # the fields are kept as they are written
+    chunks = list(read_chunks('data.tsv', str(tmp_path), chunksize=2))
+    assert chunks[1]['b'].tolist()==['3.5', 'NA']
+    assert chunks[1]['d'].tolist()==['', '']
+
+    # the types are settled over the whole file, not over its first rows
+    save_chunks(chunks, 'data.tsv.gz', str(tmp_path))
+    gz_index = read_gz_index(str(tmp_path/'data.tsv.gz'))
+    assert [np.dtype(d) for d in gz_index['dtypes']]== \
+           [np.int64, np.float64, np.dtype(str), np.float64]
+
+@pytest.mark.parametrize('options', [dict(),
+                                     dict(masks=True, output_formats=['npy'])])
+def test_generic_fields_unchanged(tmp_path, data_directory, options,
+                                  monkeypatch):
+
+    # the data file is read once
+    reads = []
+    module = sys.modules[StandardisationProcessDataGeneric.__module__]
+    def read_chunks_(*args, **kwargs):
+        reads.append(args[0])
+        return read_chunks(*args, **kwargs)
+    monkeypatch.setattr(module, 'read_chunks', read_chunks_)
+    monkeypatch.setattr(File, 'read_chunks', read_chunks_)
+
+    DataStandardisation(path_oldData=str(data_directory),
+                        path_newData=str(tmp_path/'bids'),
+                        infofilesname='infoFiles.tsv',
+                        settingsfilename='settings.json',
+                        settingsEventsfilename='settingsEvents.json',
+                        datasetdescriptionfilename='dataset_description.json',
+                        eyetracktype='Other', dataformat='.csv',
+                        saved_events={}, StartMessage=None, EndMessage=None,
+                        **options)
+    assert reads==['S1.csv']
+
+    filepath = tmp_path/'bids'/'sub-001'/'eyetrack'
+    with gzip.open(filepath/'sub-001_eyetrack.tsv.gz', 'rt') as f:
+        lines = [l.split() for l in f]
+
+    if options.get('masks'):
+        assert [l[:-1] for l in lines]==ROWS
+        # the missing position and the position left of the screen
+        assert [l[-1] for l in lines]==['sample_flags', '0', '1', '0', '4',
+                                        '0']
+    else:
+        assert lines==ROWS
+
+    # the values are read with the types of the columns of the source file
+    data = DataReader(str(tmp_path/'bids')).read_data('sub-001')
+    assert data['eye_timestamp'].dtype==np.int64
+    np.testing.assert_array_equal(data['eye1_x_coordinate'],
+                                  [1.5, np.nan, 2, -0.1, 3])
+    assert data['trial'].tolist()==['007', '008', 'x', '009', '010']
+    assert data['code'].tolist()==[0, 1, 2, 3, 4]
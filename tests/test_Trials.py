@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+
+from BIDSification_eyetrackingData.Trials import pair_trials, assign_trials
+
+
+def pair_loop(starts, ends, stop):
+
+    # pairing of the first release: walk through the markers in order, the
+    #  recording stops at its last line, which may be an end marker
+    markers = sorted([(s, 'start') for s in starts if s<stop]+
+                     [(e, 'end') for e in (ends if ends is not None else [])])
+    trials, start = [], None
+    for position, marker in markers:
+        if start is None:
+            if marker=='start':
+                start = position
+        elif ends is None and marker=='start':
+            trials.append((start, position, True))
+            start = position
+        elif ends is not None and marker=='end':
+            trials.append((start, position, True))
+            start = None
+    if start is not None:
+        trials.append((start, stop, ends is None))
+
+    return trials
+
+@pytest.mark.parametrize('seed', range(20))
+@pytest.mark.parametrize('with_ends', [True, False])
+def test_pair_trials_loop(seed, with_ends):
+
+    rng = np.random.default_rng(seed)
+    positions = rng.permutation(151)[:40]
+    starts = np.sort(positions[:20])
+    ends = np.sort(positions[20:]) if with_ends else None
+
+    index, end, terminated = pair_trials(starts, ends, 150)
+    trials = list(zip(starts[index].tolist(), end.tolist(),
+                      terminated.tolist()))
+
+    assert trials==pair_loop(starts.tolist(),
+                             None if ends is None else ends.tolist(), 150)
+
+def test_pair_trials():
+
+    # the starts inside a trial are ignored, the last trial has no end
+    index, end, terminated = pair_trials([1, 3, 6, 9], [5, 7], stop=12)
+
+    assert index.tolist()==[0, 2, 3]
+    assert end.tolist()==[5, 7, 12]
+    assert terminated.tolist()==[True, True, False]
+
+def test_pair_trials_without_ends():
+
+    index, end, terminated = pair_trials([1, 3, 6, 20], stop=12)
+
+    assert index.tolist()==[0, 1, 2]
+    assert end.tolist()==[3, 6, 12]
+    assert terminated.tolist()==[True, True, True]
+
+def test_pair_trials_empty():
+
+    index, end, terminated = pair_trials([], [4], stop=12)
+
+    assert len(index)==len(end)==len(terminated)==0
+
+@pytest.mark.parametrize('closed, trial', [
+        (False, [-1, 0, 0, -1, -1, 1, -1]),
+        (True, [-1, 0, 0, 0, -1, 1, 1])])
+def test_assign_trials(closed, trial):
+
+    values = [0, 1, 2, 3, 4, 5, 7]
+
+    assert assign_trials(values, [1, 5], [3, 7], closed).tolist()==trial
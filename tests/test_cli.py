@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import gzip
+import json
+import pytest
+
+from BIDSification_eyetrackingData.cli import parse_args, main
+from asc_data import asc_lines, write_dataset, SETTINGS
+
+
+@pytest.fixture
+def data_directory(tmp_path):
+
+    dirpath = tmp_path/'data'
+    dirpath.mkdir()
+    write_dataset(dirpath, {'S1.asc': ('001', asc_lines(ntrials=2))})
+
+    return dirpath
+
+def test_settings_files(data_directory):
+
+    args = parse_args([str(data_directory), 'bids'])
+    assert args.settings=='settings.json'
+    assert args.settings_events is None
+
+    (data_directory/'settingsEvents.json').write_text('{}')
+    os.remove(data_directory/'settings.json')
+    args = parse_args([str(data_directory), 'bids'])
+    assert args.settings is None
+    assert args.settings_events=='settingsEvents.json'
+
+    args = parse_args([str(data_directory), 'bids', '--settings', 'x.json'])
+    assert args.settings=='x.json'
+
+def test_default_settings_files(tmp_path, data_directory):
+
+    bids = tmp_path/'bids'
+    eyetrack = bids/'sub-001'/'eyetrack'/'sub-001_run-1_eyetrack.json'
+
+    # settings.json is used if it exists and --settings is not given
+    assert main([str(data_directory), str(bids)])==0
+    assert json.loads(eyetrack.read_text())['TaskName']=='task'
+
+    (data_directory/'other.json').write_text(json.dumps(
+                                            dict(SETTINGS, TaskName='other')))
+    assert main([str(data_directory), str(bids), '--settings',
+                 'other.json'])==0
+    assert json.loads(eyetrack.read_text())['TaskName']=='other'
+
+def test_without_settings_file(tmp_path, data_directory):
+
+    os.remove(data_directory/'settings.json')
+
+    assert main([str(data_directory), str(tmp_path/'bids')])==0
+    assert os.path.isfile(tmp_path/'bids'/'sub-001'/'eyetrack'/
+                          'sub-001_run-1_eyetrack.tsv.gz')
+
+def test_incremental_options(tmp_path, data_directory):
+
+    bids = tmp_path/'bids'
+    data = bids/'sub-001'/'eyetrack'/'sub-001_run-1_eyetrack.tsv.gz'
+
+    assert main([str(data_directory), str(bids), '--incremental'])==0
+    mtime = os.stat(data).st_mtime_ns
+
+    # the files are up to date with the same options
+    assert main([str(data_directory), str(bids), '--incremental'])==0
+    assert os.stat(data).st_mtime_ns==mtime
+
+    # but not with other options
+    assert main([str(data_directory), str(bids), '--incremental',
+                 '--precision', '2'])==0
+    assert os.stat(data).st_mtime_ns!=mtime
+    with gzip.open(data, 'rt') as f:
+        x = f.readlines()[1].split()[1]
+    assert len(x.split('.')[1])==2
@@ -0,0 +1,39 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import subprocess
+import pytest
+
+import BIDSification_eyetrackingData
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# names of the package in its first release
+BASELINE_NAMES = ['DataStandardisation', 'File', 'InfoFilesError',
+                  'StandardisationProcess',
+                  'StandardisationProcessDataEyelink', 'np', 'open_file',
+                  'os', 'save_file', 'settingsEventsError', 'version__']
+
+
+@pytest.mark.parametrize('name', BASELINE_NAMES)
+def test_baseline_names(name):
+
+    assert name in dir(BIDSification_eyetrackingData)
+    assert getattr(BIDSification_eyetrackingData, name) is not None
+
+def test_star_import():
+
+    namespace = {}
+    exec('from BIDSification_eyetrackingData import *', namespace)
+
+    assert set(BASELINE_NAMES)-{'File', 'version__'}<=set(namespace)
+
+def test_lazy_import():
+
+    # importing the package does not import numpy
+    code = ('import sys, BIDSification_eyetrackingData; '
+            'assert "numpy" not in sys.modules')
+    subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=True)